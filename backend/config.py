@@ -21,6 +21,14 @@ SECRET_KEY = _secret_key
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 DB_PATH = os.getenv("DB_PATH", "/opt/cryptosignal-app/backend/cryptosignal.db")
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "/opt/cryptosignal-app/backend/data/candles")
+
+# Signal worker - skorlama process sayısı (0/1 = seri, event loop üzerinde)
+SIGNAL_SCORING_WORKERS = int(os.getenv("SIGNAL_SCORING_WORKERS", 0))
+
+# Backtest - sembol x timeframe simülasyon process sayısı (0/1 = API içinde thread;
+# sinyal replay bu durumda da tek bir ayrı process'te çalışır)
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", 0))
 
 # Redis
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
@@ -89,6 +97,12 @@ STABLECOINS = {
     'BFUSD', 'USDTB', 'USDAI', 'USDY', 'SUSDS', 'SUSDE'
 }
 
+# Fiat para birimleri (Binance EURUSDT, TRYUSDT vb. - coin değil)
+FIAT_CURRENCIES = {
+    'EUR', 'GBP', 'TRY', 'BRL', 'AUD', 'JPY', 'RUB', 'UAH', 'NGN',
+    'ZAR', 'PLN', 'ARS', 'MXN', 'COP', 'IDR', 'CZK', 'RON'
+}
+
 # Wrapped/Bridge tokenları - asıl varlıkla duplicate, sinyal verilmeyecek
 WRAPPED_TOKENS = {
     # Wrapped BTC variants
@@ -12,7 +12,7 @@ import secrets
 import redis
 from datetime import datetime, timedelta
 from contextlib import contextmanager
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterable, List, Any
 
 from config import DB_PATH, REDIS_HOST, REDIS_PORT, REDIS_PASSWORD, REDIS_DB
 
@@ -45,6 +45,15 @@ redis_client = RedisClientProxy()
 # SQLITE CONNECTION
 # =============================================================================
 
+SQL_IN_CHUNK = 500  # IN (...) başına parametre (SQLite limiti 999)
+
+
+def sql_chunks(values: Iterable) -> List[List]:
+    """IN (...) sorguları için parametre limitine göre bölünmüş değerler"""
+    values = list(dict.fromkeys(values))
+    return [values[i:i + SQL_IN_CHUNK] for i in range(0, len(values), SQL_IN_CHUNK)]
+
+
 @contextmanager
 def get_db():
     """SQLite bağlantısı context manager"""
@@ -302,6 +311,10 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_price_alerts_active
             ON price_alerts(is_active, triggered)
         """)
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_price_alerts_symbol
+            ON price_alerts(symbol, is_active, triggered)
+        """)
 
         # Default invites
         c.execute(
@@ -1315,16 +1328,30 @@ def get_user_price_alerts(user_id: str, active_only: bool = True) -> List[Dict]:
         return []
 
 
-def get_active_price_alerts() -> List[Dict]:
-    """Tüm aktif fiyat alarmlarını getir (worker için)"""
+def get_active_price_alerts(symbols: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Aktif fiyat alarmlarını getir (worker için)
+    symbols: sadece bu sembollerin alarmları (None = tümü, idx_price_alerts_symbol)
+    """
     try:
         with get_db() as conn:
             c = conn.cursor()
-            c.execute("""
-                SELECT * FROM price_alerts
-                WHERE is_active = 1 AND triggered = 0
-            """)
-            return [dict(row) for row in c.fetchall()]
+            if symbols is None:
+                c.execute("""
+                    SELECT * FROM price_alerts
+                    WHERE is_active = 1 AND triggered = 0
+                """)
+                return [dict(row) for row in c.fetchall()]
+
+            alerts = []
+            for chunk in sql_chunks(symbols):
+                c.execute(f"""
+                    SELECT * FROM price_alerts
+                    WHERE symbol IN ({",".join("?" * len(chunk))})
+                      AND is_active = 1 AND triggered = 0
+                """, chunk)
+                alerts.extend(dict(row) for row in c.fetchall())
+            return alerts
     except Exception as e:
         print(f"[DB] Active alerts get error: {e}")
         return []
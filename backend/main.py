@@ -51,7 +51,8 @@ from routers import (
     watchlist_router,
     price_alerts_router,
     dca_router,
-    backtesting_router
+    backtesting_router,
+    backtest_exit_router
 )
 
 # =============================================================================
@@ -132,6 +133,9 @@ app.include_router(dca_router)
 # Backtesting: /api/backtesting/*
 app.include_router(backtesting_router)
 
+# Exit strategy backtest: /api/backtest/*
+app.include_router(backtest_exit_router)
+
 # =============================================================================
 # STARTUP EVENT - WebSocket Price Broadcast
 # =============================================================================
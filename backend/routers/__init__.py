@@ -21,6 +21,7 @@ from .watchlist import router as watchlist_router
 from .price_alerts import router as price_alerts_router
 from .dca import router as dca_router
 from .backtesting import router as backtesting_router
+from .backtest_exit import router as backtest_exit_router
 
 __all__ = [
     'auth_router',
@@ -38,5 +39,6 @@ __all__ = [
     'watchlist_router',
     'price_alerts_router',
     'dca_router',
-    'backtesting_router'
+    'backtesting_router',
+    'backtest_exit_router'
 ]
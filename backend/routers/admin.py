@@ -7,7 +7,6 @@ CryptoSignal - Admin Router (Enhanced with LLM Analytics)
 
 from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import Optional
-import json
 import secrets
 from datetime import datetime, timedelta
 
@@ -19,6 +18,8 @@ from database import (
 )
 from dependencies import get_admin_user, get_current_user
 from models import CreateInviteRequest
+from services.snapshot_cache import snapshot_cache
+from services.ws_hub import ws_hub
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -210,11 +211,7 @@ async def run_portfolio_simulation(
         raise HTTPException(status_code=400, detail="Portfolio is empty")
 
     # Fiyat verilerini al
-    try:
-        prices_raw = redis_client.get("prices_data")
-        prices = json.loads(prices_raw) if prices_raw else {}
-    except:
-        prices = {}
+    prices = snapshot_cache.get("prices_data")
 
     # Simülasyon çalıştır
     if scenario_type == "market_drop":
@@ -523,4 +520,7 @@ async def get_system_health(user: dict = Depends(get_admin_user)):
             if health["overall"] in ["healthy", "warning"]:
                 health["overall"] = "degraded"
 
+    # WebSocket fan-out (bağlantı, kuyruk derinliği, atılan frame'ler)
+    health["websocket"] = ws_hub.stats()
+
     return health
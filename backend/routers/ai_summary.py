@@ -17,6 +17,8 @@ from database import (
 )
 from dependencies import get_current_user, check_llm_quota
 from services.llm_service import llm_service
+from services.signal_store import signal_store
+from services.snapshot_cache import snapshot_cache
 
 router = APIRouter(prefix="/api/ai-summary", tags=["AI Summary"])
 
@@ -140,11 +142,7 @@ async def generate_basic_summary(user: dict) -> dict:
         }
     
     # Fiyat verilerini al
-    try:
-        prices_raw = redis_client.get("prices_data")
-        prices = json.loads(prices_raw) if prices_raw else {}
-    except:
-        prices = {}
+    prices = snapshot_cache.get("prices_data")
     
     # Temel hesaplamalar
     total_value = 0
@@ -194,11 +192,7 @@ async def generate_basic_summary(user: dict) -> dict:
     risk_level = calculate_risk_level(holdings, holdings_data)
     
     # Market context
-    try:
-        fg_raw = redis_client.get("fear_greed")
-        fear_greed = json.loads(fg_raw) if fg_raw else {}
-    except:
-        fear_greed = {}
+    fear_greed = snapshot_cache.get("fear_greed")
     
     return {
         "success": True,
@@ -260,15 +254,9 @@ async def generate_full_analysis(user: dict) -> dict:
 
     # Market data
     try:
-        prices_raw = redis_client.get("prices_data")
-        prices = json.loads(prices_raw) if prices_raw else {}
-
-        signals_raw = redis_client.get("signals_data")
-        signals = json.loads(signals_raw) if signals_raw else {}
-
-        news_raw = redis_client.get("news_db")
-        news_dict = json.loads(news_raw) if news_raw else {}
-        all_news = list(news_dict.values())
+        prices = snapshot_cache.get("prices_data")
+        signals = snapshot_cache.get_or_load("signals_1d", "signals_updated", signal_store.get_signals)
+        all_news = list(snapshot_cache.get("news_db").values())
     except:
         prices = {}
         signals = {}
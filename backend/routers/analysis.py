@@ -5,11 +5,15 @@ CryptoSignal - Analysis Router
 /api/analyze, /api/digest endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from typing import Optional
 import json
 
 from database import redis_client, increment_llm_usage, today_str
+from services.price_store import price_store
+from services.signal_store import signal_store
+from services.snapshot_cache import snapshot_cache
+from services.response_cache import response_cache
 from dependencies import get_current_user, require_llm_quota, check_llm_quota
 from config import LLM_LIMITS
 
@@ -30,19 +34,13 @@ async def analyze_coin(
     
     try:
         # Fiyat verisi
-        prices_raw = redis_client.get("prices_data")
-        prices = json.loads(prices_raw) if prices_raw else {}
-        price_data = prices.get(symbol, {})
+        price_data = price_store.get_quote(symbol) or {}
         
         # Sinyal verisi
-        signals_raw = redis_client.get("signals_data")
-        signals = json.loads(signals_raw) if signals_raw else {}
-        signal_data = signals.get(symbol, {})
+        signal_data = signal_store.get_signal(symbol) or {}
         
         # Futures verisi
-        futures_raw = redis_client.get("futures_data")
-        futures = json.loads(futures_raw) if futures_raw else {}
-        futures_data = futures.get(symbol, {})
+        futures_data = snapshot_cache.get("futures_data").get(symbol, {})
         
         if not price_data and not signal_data:
             raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
@@ -91,7 +89,7 @@ async def get_market_digest(user: dict = Depends(require_llm_quota)):
     # Basit özet (gerçek LLM implementasyonu ayrı serviste)
     try:
         # Market verileri
-        fear_greed = json.loads(redis_client.get("fear_greed") or "{}")
+        fear_greed = snapshot_cache.get("fear_greed")
         signals_stats = json.loads(redis_client.get("signals_stats") or "{}")
         
         fg_value = fear_greed.get("value", 50)
@@ -132,27 +130,58 @@ Bu özet otomatik oluşturulmuştur. Detaylı analiz için AI Digest özelliğin
 
 
 @router.get("/prices")
-async def get_prices():
-    """Tüm fiyatları getir"""
+async def get_prices(
+    request: Request,
+    symbols: Optional[str] = Query(default=None, description="Virgülle ayrılmış semboller (BTC,ETH)"),
+    since: Optional[int] = Query(default=None, ge=0, description="Bu versiyondan sonra değişenler")
+):
+    """
+    Fiyatları getir
+
+    - Parametresiz: tüm fiyatlar
+    - symbols: sadece istenen semboller
+    - since: sadece verilen snapshot versiyonundan sonra değişenler (delta);
+      delist edilen semboller "removed" listesinde döner
+
+    Yanıt fiyat/fx versiyonuna göre cache'lenir (ETag + gzip/br).
+    """
     try:
-        prices_raw = redis_client.get("prices_data")
-        prices = json.loads(prices_raw) if prices_raw else {}
-        
-        fx_raw = redis_client.get("fx_rates")
-        fx = json.loads(fx_raw) if fx_raw else {"USD": 1, "TRY": 34.5, "EUR": 0.92}
-        
-        return {
-            "prices": prices,
-            "count": len(prices),
-            "fx": fx,
-            "updated_at": redis_client.get("prices_updated")
-        }
+        version = response_cache.version("prices_version", "prices_updated", "sentiment_updated")
+        return response_cache.respond(
+            request, "prices", version, (symbols, since),
+            lambda: _build_prices(symbols, since)
+        )
     except Exception as e:
         return {"prices": {}, "error": str(e)}
 
 
+def _build_prices(symbols: Optional[str], since: Optional[int]) -> dict:
+    removed = []
+    if since is not None:
+        version, prices, removed = price_store.get_changes_since(since)
+    else:
+        version = price_store.get_version()
+        if symbols:
+            wanted = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+            prices = price_store.get_quotes(wanted)
+        else:
+            prices = price_store.get_all()
+    
+    fx = dict(snapshot_cache.get("fx_rates")) or {"USD": 1, "TRY": 34.5, "EUR": 0.92}
+    
+    return {
+        "prices": prices,
+        "count": len(prices),
+        "version": version,
+        "delta": since is not None,
+        "removed": removed,
+        "fx": fx,
+        "updated_at": redis_client.get("prices_updated")
+    }
+
+
 @router.get("/coins")
-async def get_coins(limit: int = 500, search: str = None):
+async def get_coins(request: Request, limit: int = 500, search: str = None):
     """
     Coin listesi - portföy ve diğer seçiciler için
 
@@ -161,61 +190,67 @@ async def get_coins(limit: int = 500, search: str = None):
         search: Arama filtresi (symbol veya name içinde arar)
     """
     try:
-        prices_raw = redis_client.get("prices_data")
-        prices = json.loads(prices_raw) if prices_raw else {}
-
-        # Market cap'e göre sırala
-        coins = sorted(
-            prices.keys(),
-            key=lambda x: prices[x].get("market_cap", 0) or 0,
-            reverse=True
+        # Tick versiyonu (prices_version) her saniye değişir; liste için 30 sn'lik
+        # legacy blob versiyonu yeterli - body ve ETag bu aralıkta sabit kalır
+        version = response_cache.version("prices_data_updated")
+        return response_cache.respond(
+            request, "coins", version, (limit, search),
+            lambda: _build_coins(limit, search)
         )
-
-        # Arama filtresi uygula
-        if search:
-            search_lower = search.lower()
-            coins = [
-                c for c in coins
-                if search_lower in c.lower() or
-                   search_lower in (prices[c].get("name", "") or "").lower()
-            ]
-
-        # Limit uygula (max 1000)
-        limit = min(limit, 1000)
-        coins = coins[:limit]
-
-        details = []
-        for symbol in coins:
-            data = prices[symbol]
-            details.append({
-                "symbol": symbol,
-                "name": data.get("name", symbol),
-                "price": data.get("price", 0),
-                "change_24h": data.get("change_24h", 0),
-                "change_7d": data.get("change_7d", 0),
-                "market_cap": data.get("market_cap", 0),
-                "volume": data.get("volume_24h", 0),
-                "rank": data.get("rank", 0),
-                "image": data.get("image", "")
-            })
-
-        return {
-            "coins": coins,
-            "details": details,
-            "count": len(coins),
-            "total_available": len(prices)
-        }
     except Exception as e:
         return {"coins": [], "error": str(e)}
 
 
+def _build_coins(limit: int, search: Optional[str]) -> dict:
+    prices = price_store.get_all()
+
+    # Market cap'e göre sırala
+    coins = sorted(
+        prices.keys(),
+        key=lambda x: prices[x].get("market_cap", 0) or 0,
+        reverse=True
+    )
+
+    # Arama filtresi uygula
+    if search:
+        search_lower = search.lower()
+        coins = [
+            c for c in coins
+            if search_lower in c.lower() or
+               search_lower in (prices[c].get("name", "") or "").lower()
+        ]
+
+    # Limit uygula (max 1000)
+    limit = min(limit, 1000)
+    coins = coins[:limit]
+
+    details = []
+    for symbol in coins:
+        data = prices[symbol]
+        details.append({
+            "symbol": symbol,
+            "name": data.get("name", symbol),
+            "price": data.get("price", 0),
+            "change_24h": data.get("change_24h", 0),
+            "change_7d": data.get("change_7d", 0),
+            "market_cap": data.get("market_cap", 0),
+            "volume": data.get("volume_24h", 0),
+            "rank": data.get("rank", 0),
+            "image": data.get("image", "")
+        })
+
+    return {
+        "coins": coins,
+        "details": details,
+        "count": len(coins),
+        "total_available": len(prices)
+    }
+
+
 @router.get("/fear-greed")
 async def get_fear_greed():
     """Fear & Greed Index"""
     try:
-        fg_raw = redis_client.get("fear_greed")
-        if fg_raw:
-            return json.loads(fg_raw)
-        return {"value": 50, "classification": "Neutral"}
+        return dict(snapshot_cache.get("fear_greed")) or {"value": 50, "classification": "Neutral"}
     except:
         return {"value": 50, "classification": "Neutral"}
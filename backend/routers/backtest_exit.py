@@ -1,55 +1,227 @@
 # -*- coding: utf-8 -*-
-from fastapi import APIRouter, Query, Body
-from typing import List, Optional
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Query, Body, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import json
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.backtest_engine import BacktestEngine
+from dependencies import get_current_user
+from services.backtest_jobs import backtest_jobs
+from services.analysis_service import get_confidence_multipliers
+from services.signal_replay import HOLD_BARS, MAX_REPLAY_SYMBOLS
+from services.portfolio_sim import (
+    SIZING_RULES, PortfolioConfig, load_marks, load_tracking_tape, simulate_portfolio
+)
+from services.exit_sweep import (
+    DEFAULT_SL_MULTS, DEFAULT_TP_MULTS, DEFAULT_TRAIL_RATIOS, PRODUCTION_TRAIL_RATIO, SORT_KEYS,
+    make_grid
+)
 
 router = APIRouter(prefix="/api/backtest", tags=["Backtest"])
-_engine = None
 
-def get_engine():
-    global _engine
-    if _engine is None:
-        _engine = BacktestEngine()
-    return _engine
+MAX_SYMBOLS = 50
+BACKTEST_TIMEFRAMES = ("1d", "1w", "1m", "3m", "6m", "1y")  # get_timeframe_multipliers
+COMPARE_TIMEFRAMES = ["1d", "1w", "1m"]
+
+def ndjson_stream(events: AsyncIterator[Dict]) -> StreamingResponse:
+    """progress/result olaylarını satır satır JSON olarak akıt"""
+    async def body():
+        async for event in events:
+            yield json.dumps(event) + "\n"
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+def check_timeframes(timeframes: List[str]):
+    if not timeframes or any(tf not in BACKTEST_TIMEFRAMES for tf in timeframes):
+        raise HTTPException(status_code=400, detail=f"timeframe must be one of {', '.join(BACKTEST_TIMEFRAMES)}")
+
+async def job_response(job, stream: bool, background: bool):
+    """Job'u akıt, hemen job özetini dön ya da bitmesini bekleyip sonucu dön"""
+    if stream:
+        return ndjson_stream(backtest_jobs.events(job))
+    if background:
+        return job.to_dict(include_result=False)
+    await backtest_jobs.wait(job)
+    if job.error:
+        raise HTTPException(status_code=500, detail=job.error)
+    return job.result
 
 @router.get("/quick")
 async def quick_backtest(
     symbol: str = Query(default="BTC"),
     days: int = Query(default=30, ge=7, le=90),
-    timeframe: str = Query(default="1d")
+    timeframe: str = Query(default="1d"),
+    user: dict = Depends(get_current_user)
 ):
-    engine = get_engine()
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    return await engine.run_backtest([symbol.upper()], start_date, end_date, 24, timeframe)
+    """Tek sembol backtest (job kuyruğu: sonuç cache'i, aynı işe bağlanma)"""
+    check_timeframes([timeframe])
+    job = backtest_jobs.submit([symbol], days, timeframe)
+    return await job_response(job, stream=False, background=False)
 
 @router.post("/run")
 async def run_backtest(
     symbols: List[str] = Body(default=["BTC", "ETH", "SOL"], embed=True),
     days: int = Body(default=30, ge=7, le=90, embed=True),
-    timeframe: str = Body(default="1d", embed=True)
+    timeframe: str = Body(default="1d", embed=True),
+    stream: bool = Body(default=False, embed=True),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Job olarak çalıştırır (cache / devam eden aynı işe bağlanma dahil).
+    Bağlantıyı tutmaz: job özetini döner (cache'ten geldiyse sonuç dahil),
+    /jobs/{id} veya stream=true ile izlenir.
+    """
+    check_timeframes([timeframe])
+    job = backtest_jobs.submit(symbols[:MAX_SYMBOLS], days, timeframe)
+    if stream:
+        return ndjson_stream(backtest_jobs.events(job))
+    return job.to_dict()
+
+@router.post("/jobs")
+async def submit_backtest_job(
+    symbols: List[str] = Body(default=["BTC", "ETH", "SOL"], embed=True),
+    days: int = Body(default=30, ge=7, le=90, embed=True),
+    timeframe: str = Body(default="1d", embed=True),
+    confidence: int = Body(default=75, ge=0, le=100, embed=True),
+    category: str = Body(default="ALT", embed=True),
+    user: dict = Depends(get_current_user)
 ):
-    engine = get_engine()
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    return await engine.run_backtest(symbols, start_date, end_date, 24, timeframe)
+    """Backtest işi oluştur; hemen job_id döner"""
+    check_timeframes([timeframe])
+    job = backtest_jobs.submit(symbols[:MAX_SYMBOLS], days, timeframe, confidence, category)
+    return job.to_dict(include_result=False)
+
+@router.get("/jobs/{job_id}")
+async def get_backtest_job(job_id: str):
+    job = backtest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_backtest_job(job_id: str):
+    """NDJSON: her ilerlemede job durumu, son satır sonuçla birlikte"""
+    job = backtest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ndjson_stream(backtest_jobs.events(job))
 
 @router.get("/compare")
-async def compare_timeframes(symbol: str = Query(default="BTC"), days: int = Query(default=30)):
-    engine = get_engine()
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    results = {}
-    for tf in ["1d", "1w", "1m"]:
-        r = await engine.run_backtest([symbol.upper()], start_date, end_date, 24, tf)
-        if r["summary"]:
-            results[tf] = {"success_rate": r["summary"]["success_rate"],
-                          "total_return_pct": r["summary"]["total_return_pct"],
-                          "profit_factor": r["summary"]["profit_factor"]}
-    best = max(results.keys(), key=lambda x: results[x]["success_rate"]) if results else None
-    return {"symbol": symbol, "comparison": results, "best_timeframe": best}
+async def compare_timeframes(
+    symbol: str = Query(default="BTC"),
+    days: int = Query(default=30, ge=7, le=90),
+    symbols: Optional[str] = Query(default=None, description="Comma separated, overrides symbol"),
+    timeframes: str = Query(default=",".join(COMPARE_TIMEFRAMES)),
+    stream: bool = Query(default=False, description="NDJSON job status events, then the result"),
+    background: bool = Query(default=False, description="Hemen job_id dön (/jobs/{id})"),
+    user: dict = Depends(get_current_user)
+):
+    """Timeframe karşılaştırması (job kuyruğu: sonuç cache'i, aynı işe bağlanma)"""
+    tf_list = list(dict.fromkeys(tf.strip() for tf in timeframes.split(",") if tf.strip()))
+    check_timeframes(tf_list)
+    symbol_list = [s.strip().upper() for s in (symbols or symbol).split(",") if s.strip()][:MAX_SYMBOLS]
+    job = backtest_jobs.submit_compare(symbol_list, days, tf_list)
+    response = await job_response(job, stream, background)
+    if stream or background:
+        return response
+    return {"symbol": symbol, **response}
+
+@router.post("/sweep")
+async def sweep_exit_multipliers(
+    symbols: List[str] = Body(default=["BTC", "ETH", "SOL"], embed=True),
+    days: int = Body(default=60, ge=7, le=365, embed=True),
+    timeframe: str = Body(default="1d", embed=True),
+    confidence: int = Body(default=75, ge=0, le=100, embed=True),
+    category: str = Body(default="ALT", embed=True),
+    sl_mults: List[float] = Body(default=list(DEFAULT_SL_MULTS), embed=True),
+    tp_mults: List[float] = Body(default=list(DEFAULT_TP_MULTS), embed=True),
+    trail_ratios: List[float] = Body(default=list(DEFAULT_TRAIL_RATIOS), embed=True),
+    sort_by: str = Body(default="profit_factor", embed=True),
+    top: int = Body(default=50, ge=1, le=500, embed=True),
+    stream: bool = Body(default=False, embed=True),
+    background: bool = Body(default=False, embed=True, description="Hemen job_id dön (/jobs/{id})"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    SL/TP/trailing çarpan grid'i; sıralı profit factor / drawdown / win rate tablosu.
+    Job kuyruğu üzerinden çalışır (grid, sort_by ve top anahtara dahil).
+    """
+    check_timeframes([timeframe])
+    if sort_by not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {', '.join(SORT_KEYS)}")
+    sl_mult, tp_mult = get_confidence_multipliers(confidence)
+    try:
+        grid = make_grid(sl_mults, tp_mults, trail_ratios, include=(sl_mult, tp_mult, PRODUCTION_TRAIL_RATIO))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    symbols = [s.upper() for s in symbols][:MAX_SYMBOLS]
+    job = backtest_jobs.submit_sweep(symbols, days, grid, timeframe, confidence, category, sort_by, top)
+    return await job_response(job, stream, background)
+
+@router.post("/replay")
+async def replay_signals(
+    symbols: List[str] = Body(default=["BTC", "ETH", "SOL"], embed=True),
+    days: int = Body(default=90, ge=7, le=365, embed=True),
+    timeframe: str = Body(default="1d", embed=True),
+    fear_greed: int = Body(default=50, ge=0, le=100, embed=True),
+    max_signals: int = Body(default=50, ge=1, le=500, embed=True),
+    stream: bool = Body(default=True, embed=True),
+    background: bool = Body(default=False, embed=True, description="Hemen job_id dön (/jobs/{id})"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Üretim sinyal hattının (generate_signal + quality gate + top-N filtresi)
+    look-ahead'siz gün gün replay'i. Job kuyruğu üzerinden çalışır
+    (sonuç cache'i, aynı işe bağlanma).
+    """
+    if timeframe not in HOLD_BARS:
+        raise HTTPException(status_code=400, detail=f"timeframe must be one of {', '.join(HOLD_BARS)}")
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))[:MAX_REPLAY_SYMBOLS]
+    job = backtest_jobs.submit_replay(symbols, days, timeframe, fear_greed, max_signals)
+    return await job_response(job, stream, background)
+
+@router.post("/portfolio")
+async def portfolio_backtest(
+    source: str = Body(default="replay", embed=True, description="replay | tracking"),
+    symbols: List[str] = Body(default=["BTC", "ETH", "SOL"], embed=True,
+                              description="tracking için boş liste = tüm semboller"),
+    days: int = Body(default=90, ge=7, le=365, embed=True),
+    timeframe: str = Body(default="1d", embed=True),
+    initial_capital: float = Body(default=10_000, gt=0, embed=True),
+    sizing: str = Body(default="fixed_fraction", embed=True),
+    position_fraction: float = Body(default=0.1, gt=0, le=1, embed=True),
+    max_positions: int = Body(default=50, ge=1, le=500, embed=True),
+    max_exposure: float = Body(default=1.0, gt=0, le=1, embed=True),
+    fee_pct: float = Body(default=0.1, ge=0, le=5, embed=True),
+    stream: bool = Body(default=False, embed=True),
+    background: bool = Body(default=False, embed=True, description="Hemen job_id dön (/jobs/{id})"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Ortak sermayeyle eşzamanlı pozisyon simülasyonu: replay sinyalleri veya
+    signal_tracking geçmişi -> özsermaye eğrisi, drawdown, turnover.
+    replay kaynağı job kuyruğu üzerinden çalışır; tracking (DB sorgusu +
+    tek geçiş simülasyon) doğrudan hesaplanır.
+    """
+    if sizing not in SIZING_RULES:
+        raise HTTPException(status_code=400, detail=f"sizing must be one of {', '.join(SIZING_RULES)}")
+    config = PortfolioConfig(
+        initial_capital=initial_capital, sizing=sizing, position_fraction=position_fraction,
+        max_positions=max_positions, max_exposure=max_exposure, fee_pct=fee_pct
+    )
+
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))[:MAX_REPLAY_SYMBOLS]
+    if source == "tracking":
+        tape = await asyncio.to_thread(load_tracking_tape, days, timeframe, symbols or None)
+        marks = await asyncio.to_thread(load_marks, tape)
+        return await asyncio.to_thread(simulate_portfolio, tape, config, marks)
+    if source != "replay":
+        raise HTTPException(status_code=400, detail="source must be replay or tracking")
+    if timeframe not in HOLD_BARS:
+        raise HTTPException(status_code=400, detail=f"timeframe must be one of {', '.join(HOLD_BARS)}")
+
+    job = backtest_jobs.submit_replay(symbols, days, timeframe, max_signals=max_positions, portfolio=config)
+    return await job_response(job, stream, background)
@@ -9,9 +9,8 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
-import json
 
-from database import redis_client
+from services.price_store import price_store
 
 router = APIRouter(prefix="/api/dca", tags=["DCA Calculator"])
 
@@ -232,11 +231,8 @@ async def quick_dca_calc(
 def get_current_price(symbol: str) -> float:
     """Redis'ten mevcut fiyatı al"""
     try:
-        prices_raw = redis_client.get("prices_data")
-        if prices_raw:
-            prices = json.loads(prices_raw)
-            coin_data = prices.get(symbol.upper(), {})
-            return coin_data.get('price', 0)
+        coin_data = price_store.get_quote(symbol.upper()) or {}
+        return coin_data.get('price', 0)
     except:
         pass
     return 0
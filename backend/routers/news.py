@@ -7,9 +7,9 @@ CryptoSignal - News Router
 
 from fastapi import APIRouter, Query
 from typing import Optional
-import json
 
-from database import redis_client
+from services.news_index import sentiment_label
+from services.snapshot_cache import snapshot_cache
 
 router = APIRouter(prefix="/api", tags=["News"])
 
@@ -23,11 +23,10 @@ async def get_public_news(
 ):
     """Herkese açık haber listesi - Pagination destekli"""
     try:
-        news_raw = redis_client.get("news_db")
-        if not news_raw:
+        news_dict = snapshot_cache.get("news_db")
+        if not news_dict:
             return {"news": [], "total": 0, "stats": {"bullish": 0, "bearish": 0, "neutral": 0}}
         
-        news_dict = json.loads(news_raw)
         news_list = list(news_dict.values())
         
         # Sırala (en yeni önce)
@@ -74,12 +73,10 @@ async def get_public_news(
 async def get_news_coins():
     """Haberlerde geçen coinleri getir"""
     try:
-        news_raw = redis_client.get("news_db")
-        if not news_raw:
+        news_dict = snapshot_cache.get("news_db")
+        if not news_dict:
             return {"coins": []}
         
-        news_dict = json.loads(news_raw)
-        
         coin_counts = {}
         for news in news_dict.values():
             for coin in news.get('coins', []):
@@ -98,44 +95,25 @@ async def get_news_coins():
 
 
 @router.get("/news/sentiment")
-async def get_news_sentiment(coin: Optional[str] = None):
-    """Haber sentiment özeti"""
+async def get_news_sentiment(
+    coin: Optional[str] = None,
+    half_life_hours: Optional[float] = Query(default=None, gt=0, le=720)
+):
+    """Haber sentiment özeti (half_life_hours: zaman ağırlıklı skor)"""
     try:
-        news_raw = redis_client.get("news_db")
-        if not news_raw:
-            return {"sentiment": "neutral", "score": 0, "news_count": 0}
-        
-        news_dict = json.loads(news_raw)
-        news_list = list(news_dict.values())
-        
-        if coin:
-            coin_upper = coin.upper()
-            news_list = [n for n in news_list if coin_upper in (n.get('coins') or [])]
-        
-        if not news_list:
+        stats = snapshot_cache.news_index().sentiment(coin, half_life_hours=half_life_hours)
+        total = stats["news_count"]
+        if not total:
             return {"sentiment": "neutral", "score": 0, "news_count": 0}
         
-        bullish = sum(1 for n in news_list if n.get('sentiment') == 'bullish')
-        bearish = sum(1 for n in news_list if n.get('sentiment') == 'bearish')
-        total = len(news_list)
-        
-        score = (bullish - bearish) / total if total > 0 else 0
-        
-        if score > 0.2:
-            sentiment = "bullish"
-        elif score < -0.2:
-            sentiment = "bearish"
-        else:
-            sentiment = "neutral"
-        
         return {
-            "sentiment": sentiment,
-            "score": round(score, 3),
+            "sentiment": sentiment_label(stats["score"]),
+            "score": round(stats["score"], 3),
             "news_count": total,
-            "bullish_count": bullish,
-            "bearish_count": bearish,
-            "neutral_count": total - bullish - bearish
+            "bullish_count": stats["bullish"],
+            "bearish_count": stats["bearish"],
+            "neutral_count": stats["neutral"]
         }
     
     except Exception as e:
-        return {"sentiment": "neutral", "score": 0, "error": str(e)}
\ No newline at end of file
+        return {"sentiment": "neutral", "score": 0, "error": str(e)}
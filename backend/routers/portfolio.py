@@ -11,6 +11,8 @@ from datetime import datetime
 
 from models import PortfolioUpdate
 from database import redis_client, get_portfolio, save_portfolio, get_db
+from services.price_store import price_store
+from services.snapshot_cache import snapshot_cache
 from dependencies import get_current_user, require_llm_quota, check_llm_quota
 from config import LLM_LIMITS
 
@@ -22,17 +24,18 @@ prices_data = {}
 fx_rates = {"USD": 1, "TRY": 34.5, "EUR": 0.92, "GBP": 0.79}
 
 
-def load_prices():
-    """Redis'den fiyatları yükle"""
+def load_prices(symbols: list = None):
+    """Redis'den fiyatları yükle (symbols verilirse sadece onlar)"""
     global prices_data, fx_rates
     try:
-        prices_raw = redis_client.get("prices_data")
-        if prices_raw:
-            prices_data = json.loads(prices_raw)
+        if symbols is not None:
+            prices_data = price_store.get_quotes(symbols)
+        else:
+            prices_data = price_store.get_all()
         
-        fx_raw = redis_client.get("fx_rates")
-        if fx_raw:
-            fx_rates = json.loads(fx_raw)
+        fx_snapshot = snapshot_cache.get("fx_rates")
+        if fx_snapshot:
+            fx_rates = fx_snapshot
     except:
         pass
 
@@ -40,9 +43,8 @@ def load_prices():
 @router.get("/portfolio")
 async def get_user_portfolio(user: dict = Depends(get_current_user)):
     """Kullanıcı portföyünü getir"""
-    load_prices()
-    
     portfolio = get_portfolio(user["id"])
+    load_prices([h["coin"] for h in portfolio.get("holdings", [])])
     max_coins = 100 if user["tier"] == "admin" else 10
     
     holdings = []
@@ -173,10 +175,9 @@ async def analyze_portfolio(user: dict = Depends(require_llm_quota)):
     """
     from database import increment_llm_usage, today_str
     
-    load_prices()
-    
     portfolio = get_portfolio(user["id"])
     holdings = portfolio.get("holdings", [])
+    load_prices([h["coin"] for h in holdings])
     
     if not holdings:
         raise HTTPException(status_code=400, detail="Portfolio is empty")
@@ -212,8 +213,7 @@ async def analyze_portfolio(user: dict = Depends(require_llm_quota)):
     
     # Fear & Greed
     try:
-        fg_raw = redis_client.get("fear_greed")
-        fear_greed = json.loads(fg_raw).get("value", 50) if fg_raw else 50
+        fear_greed = snapshot_cache.get("fear_greed").get("value", 50)
     except:
         fear_greed = 50
     
@@ -5,23 +5,27 @@ CryptoSignal - Signals Router
 /api/signals endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
 import json
 
 from database import redis_client
 from config import TIMEFRAME_LABELS
+from services.signal_store import signal_store, ALL_GROUP
+from services.response_cache import response_cache
 
 router = APIRouter(prefix="/api", tags=["Signals"])
 
 
 @router.get("/signals")
 async def get_signals(
+    request: Request,
     timeframe: str = Query(default="1d", pattern="^(1d|1w|1m|3m|6m|1y)$"),
     limit: int = Query(default=500, ge=1, le=500),
     signal_filter: Optional[str] = Query(default=None, pattern="^(BUY|SELL|HOLD|ALL)$"),
     sort_by: str = Query(default="market_cap", pattern="^(market_cap|change_24h|confidence|score)$"),
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    offset: int = Query(default=0, ge=0)
 ):
     """
     Sinyalleri getir
@@ -32,69 +36,16 @@ async def get_signals(
     - signal_filter: BUY, SELL, HOLD veya ALL
     - sort_by: Sıralama kriteri
     - search: Coin arama
+    - offset: Sayfalama başlangıcı
+    
+    Yanıt signals_updated versiyonuna göre cache'lenir (ETag + gzip/br).
     """
     try:
-        # Tüm timeframe'leri kontrol et
-        all_tf_data = redis_client.get("signals_all_timeframes")
-        
-        if all_tf_data:
-            all_timeframes = json.loads(all_tf_data)
-            
-            if timeframe in all_timeframes:
-                tf_data = all_timeframes[timeframe]
-                signals = tf_data.get('signals', {})
-                stats = tf_data.get('stats', {})
-                risk_stats = tf_data.get('risk_stats', {})
-            else:
-                signals = json.loads(redis_client.get("signals_data") or "{}")
-                stats = json.loads(redis_client.get("signals_stats") or "{}")
-                risk_stats = json.loads(redis_client.get("signals_risk_stats") or "{}")
-        else:
-            signals = json.loads(redis_client.get("signals_data") or "{}")
-            stats = json.loads(redis_client.get("signals_stats") or "{}")
-            risk_stats = json.loads(redis_client.get("signals_risk_stats") or "{}")
-        
-        # List'e çevir
-        signals_list = list(signals.values())
-        
-        # Filtrele
-        if signal_filter and signal_filter != "ALL":
-            if signal_filter == "BUY":
-                signals_list = [s for s in signals_list if s.get('signal') in ['BUY', 'STRONG_BUY']]
-            elif signal_filter == "SELL":
-                signals_list = [s for s in signals_list if s.get('signal') in ['SELL', 'STRONG_SELL']]
-            elif signal_filter == "HOLD":
-                signals_list = [s for s in signals_list if s.get('signal') == 'HOLD']
-        
-        # Ara
-        if search:
-            search_lower = search.lower()
-            signals_list = [s for s in signals_list if search_lower in s.get('symbol', '').lower()]
-        
-        # Sırala
-        if sort_by == "market_cap":
-            signals_list.sort(key=lambda x: x.get('market_cap', 0) or 0, reverse=True)
-        elif sort_by == "change_24h":
-            signals_list.sort(key=lambda x: x.get('change_24h', 0) or 0, reverse=True)
-        elif sort_by == "confidence":
-            signals_list.sort(key=lambda x: x.get('confidence', 0), reverse=True)
-        elif sort_by == "score":
-            signals_list.sort(key=lambda x: x.get('score', 0), reverse=True)
-        
-        # Limit
-        signals_list = signals_list[:limit]
-        
-        return {
-            "success": True,
-            "timeframe": timeframe,
-            "timeframe_label": TIMEFRAME_LABELS.get(timeframe, timeframe),
-            "count": len(signals_list),
-            "total": len(signals),
-            "stats": stats,
-            "risk_stats": risk_stats,
-            "signals": signals_list,
-            "updated_at": redis_client.get("signals_updated")
-        }
+        params = (timeframe, limit, signal_filter, sort_by, search, offset)
+        return response_cache.respond(
+            request, "signals", response_cache.version("signals_updated"), params,
+            lambda: _build_signals(*params)
+        )
     
     except Exception as e:
         return {
@@ -106,15 +57,41 @@ async def get_signals(
         }
 
 
+def _build_signals(timeframe: str, limit: int, signal_filter: Optional[str],
+                   sort_by: str, search: Optional[str], offset: int) -> dict:
+    # Hazır sıralı indeksten sayfa (filtre = sinyal tipi indeksi), sadece sayfadaki kayıtlar okunur
+    symbols, total, tf_meta = signal_store.page(
+        timeframe,
+        sort_by=sort_by,
+        group=signal_filter or ALL_GROUP,
+        limit=limit,
+        offset=offset,
+        search=search
+    )
+    stats = tf_meta.get('stats', {})
+    risk_stats = tf_meta.get('risk_stats', {})
+    signals_list = signal_store.get_joined(timeframe, symbols, tf_meta.get('label'))
+    
+    return {
+        "success": True,
+        "timeframe": timeframe,
+        "timeframe_label": TIMEFRAME_LABELS.get(timeframe, timeframe),
+        "count": len(signals_list),
+        "total": total,
+        "stats": stats,
+        "risk_stats": risk_stats,
+        "signals": signals_list,
+        "updated_at": redis_client.get("signals_updated")
+    }
+
+
 @router.get("/signals/stats")
 async def get_signals_stats():
     """Tüm timeframe'ler için sinyal istatistikleri"""
     try:
-        all_tf_data = redis_client.get("signals_all_timeframes")
+        all_timeframes = signal_store.get_timeframes()
         
-        if all_tf_data:
-            all_timeframes = json.loads(all_tf_data)
-            
+        if all_timeframes:
             result = {}
             for tf, tf_data in all_timeframes.items():
                 stats = tf_data.get('stats', {})
@@ -163,39 +140,21 @@ async def get_signal_detail(
     symbol = symbol.upper()
     
     try:
-        all_tf_data = redis_client.get("signals_all_timeframes")
+        all_timeframes = signal_store.get_timeframes()
+        coin_signals = signal_store.get_coin_timeframes(symbol, list(all_timeframes))
         
-        if all_tf_data:
-            all_timeframes = json.loads(all_tf_data)
-            
-            coin_signals = {}
-            for tf, tf_data in all_timeframes.items():
-                signals = tf_data.get('signals', {})
-                if symbol in signals:
-                    coin_signals[tf] = signals[symbol]
-            
-            if not coin_signals:
-                raise HTTPException(status_code=404, detail=f"Signal not found for {symbol}")
-            
-            primary = coin_signals.get(timeframe, list(coin_signals.values())[0])
-            
-            return {
-                "success": True,
-                "symbol": symbol,
-                "primary_timeframe": timeframe,
-                "signal": primary,
-                "all_timeframes": coin_signals
-            }
-        else:
-            signals = json.loads(redis_client.get("signals_data") or "{}")
-            if symbol not in signals:
-                raise HTTPException(status_code=404, detail=f"Signal not found for {symbol}")
-            
-            return {
-                "success": True,
-                "symbol": symbol,
-                "signal": signals[symbol]
-            }
+        if not coin_signals:
+            raise HTTPException(status_code=404, detail=f"Signal not found for {symbol}")
+        
+        primary = coin_signals.get(timeframe, list(coin_signals.values())[0])
+        
+        return {
+            "success": True,
+            "symbol": symbol,
+            "primary_timeframe": timeframe,
+            "signal": primary,
+            "all_timeframes": coin_signals
+        }
     
     except HTTPException:
         raise
@@ -7,90 +7,113 @@ Real-time fiyat güncellemeleri
 
 import json
 import asyncio
-from typing import Set
+from typing import Dict, Set, Tuple
 from datetime import datetime
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from database import redis_client
+from services.price_store import price_store
+from services.event_bus import event_bus, EVENT_TICK
+from services.snapshot_cache import snapshot_cache
+from services.response_cache import response_cache, encode_json
+from services.ws_hub import ws_hub, WSClient, TOP_N
 
 router = APIRouter(tags=["WebSocket"])
 
-# Connected clients
-ws_clients: Set[WebSocket] = set()
+STREAM_BLOCK_MS = 5000  # Olay gelmezse bu sürede bir versiyon kontrolü
+
+# Init frame: bu anahtarlar değişmedikçe encode edilmiş frame paylaşılır.
+# Tick versiyonu (prices_version) her saniye değişir; fiyatlar için 30 sn'lik
+# legacy blob versiyonu kullanılır, aradaki değişiklikleri init'in hemen
+# ardından gönderilen hub snapshot'ı tamamlar
+INIT_VERSION_KEYS = ("prices_data_updated", "sentiment_updated", "signals_updated")
+INIT_MARKET_SIZE = 100
+
+_init_cache: Dict = {"version": None, "data": None, "frame": None}
 
 
 async def broadcast(message: dict):
-    """Tüm bağlı client'lara mesaj gönder"""
-    if not ws_clients:
-        return
-    
-    dead_clients = set()
-    msg = json.dumps(message)
-    
-    for client in ws_clients:
-        try:
-            await client.send_text(msg)
-        except:
-            dead_clients.add(client)
-    
-    # Ölü client'ları temizle
-    ws_clients.difference_update(dead_clients)
+    """Tüm bağlı client'lara mesaj gönder (kuyruğa alır, beklemez)"""
+    ws_hub.broadcast(message)
 
 
 @router.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
     """Ana WebSocket endpoint'i"""
     await ws.accept()
-    ws_clients.add(ws)
-    print(f"[WS] +1 ({len(ws_clients)} total)")
+    client = ws_hub.add(ws)
+    print(f"[WS] +1 ({len(ws_hub)} total)")
     
     try:
-        # İlk veriyi gönder
-        await send_initial_data(ws)
+        # Bağlanırken abonelik: /ws?coins=BTC,ETH[&channels=top] -> küçültülmüş init
+        coins = ws.query_params.get("coins")
+        if coins is not None:
+            channels = ws.query_params.get("channels")
+            client.subscribe(coins.split(","), channels.split(",") if channels is not None else None)
         
-        # Mesaj döngüsü
-        while True:
+        # İlk veriyi gönder (seq 0), ardından izlenen coinlerin güncel alanları
+        # (seq 1 - init frame 30 sn'ye kadar eski olabilir); delta'lar bundan sonra
+        send_initial_data(client, reduced=coins is not None)
+        ws_hub.send_snapshot(client)
+        
+        # Mesaj döngüsü (hub bağlantıyı kapattıysa çık - client mesaj göndermeye devam etse bile)
+        while not client.closing:
             try:
                 msg = await asyncio.wait_for(ws.receive_text(), timeout=30)
+                if client.closing:
+                    break
                 
                 try:
                     data = json.loads(msg)
                     msg_type = data.get("type")
                     
                     if msg_type == "ping":
-                        await ws.send_text(json.dumps({
+                        client.send({
                             "type": "pong",
                             "time": datetime.utcnow().isoformat()
-                        }))
+                        })
                     
                     elif msg_type == "subscribe":
-                        # Belirli coin'lere subscribe
-                        coins = data.get("coins", [])
-                        await ws.send_text(json.dumps({
+                        # Belirli coin'lere / kanallara subscribe
+                        client.subscribe(data.get("coins") or [], data.get("channels"))
+                        client.send({
                             "type": "subscribed",
-                            "coins": coins
-                        }))
+                            "coins": sorted(client.symbols),
+                            "channels": sorted(client.channels)
+                        })
+                        ws_hub.send_snapshot(client)
+                    
+                    elif msg_type == "unsubscribe":
+                        client.unsubscribe(data.get("coins") or [])
+                        client.send({
+                            "type": "unsubscribed",
+                            "coins": sorted(client.symbols),
+                            "channels": sorted(client.channels)
+                        })
                     
-                except json.JSONDecodeError:
+                    elif msg_type == "resync":
+                        # Client seq boşluğu gördü
+                        ws_hub.send_snapshot(client)
+                    
+                except (json.JSONDecodeError, AttributeError, TypeError):
                     pass
             
             except asyncio.TimeoutError:
-                # Keepalive ping
-                try:
-                    await ws.send_text(json.dumps({
-                        "type": "ping",
-                        "time": datetime.utcnow().isoformat()
-                    }))
-                except:
+                # Keepalive ping (writer task kapandıysa bağlantı da bitti)
+                if client.writer is None or client.writer.done():
                     break
+                client.send({
+                    "type": "ping",
+                    "time": datetime.utcnow().isoformat()
+                })
     
     except WebSocketDisconnect:
         pass
     except Exception as e:
         print(f"[WS] Error: {e}")
     finally:
-        ws_clients.discard(ws)
-        print(f"[WS] -1 ({len(ws_clients)} total)")
+        ws_hub.remove(client)
+        print(f"[WS] -1 ({len(ws_hub)} total)")
 
 
 @router.websocket("/ws/market")
@@ -105,52 +128,82 @@ async def ws_realtime(ws: WebSocket):
     await websocket_endpoint(ws)
 
 
-async def send_initial_data(ws: WebSocket):
-    """İlk bağlantıda verileri gönder"""
+def _load_init_data() -> Dict:
+    """Init frame içeriği (Redis'ten, versiyon başına bir kez)"""
+    prices = price_store.get_all()
+    
+    fx = dict(snapshot_cache.get("fx_rates")) or {"USD": 1, "TRY": 34.5, "EUR": 0.92}
+    fear_greed = dict(snapshot_cache.get("fear_greed")) or {"value": 50}
+    
+    signals_stats_raw = redis_client.get("signals_stats")
+    signals_stats = json.loads(signals_stats_raw) if signals_stats_raw else {}
+    
+    # Market overview
+    market = []
+    sorted_coins = sorted(
+        prices.keys(),
+        key=lambda x: prices[x].get("market_cap", 0) or 0,
+        reverse=True
+    )
+    
+    for symbol in sorted_coins[:INIT_MARKET_SIZE]:
+        p = prices[symbol]
+        market.append({
+            "symbol": symbol,
+            "name": p.get("name", symbol),
+            "price": p.get("price", 0),
+            "change_24h": p.get("change_24h", 0),
+            "change_instant": p.get("change_instant", 0),
+            "market_cap": p.get("market_cap", 0),
+            "rank": p.get("rank", 999)
+        })
+    
+    return {
+        "type": "init",
+        "seq": 0,
+        "prices": prices,
+        "market": market,
+        "fx": fx,
+        "fear_greed": fear_greed,
+        "signals_stats": signals_stats,
+        "coins_count": len(prices),
+        "time": datetime.utcnow().isoformat()
+    }
+
+
+def get_init_data() -> Tuple[Dict, str]:
+    """
+    Versiyon başına bir kez kurulan init verisi ve encode edilmiş frame'i.
+    Aynı versiyonda bağlanan tüm client'lar aynı string'i alır.
+    Returns: (init dict - değiştirilmemeli, frame)
+    """
+    version = response_cache.version(*INIT_VERSION_KEYS)
+    if _init_cache["version"] != version:
+        data = _load_init_data()
+        _init_cache.update(version=version, data=data, frame=encode_json(data).decode("utf-8"))
+    return _init_cache["data"], _init_cache["frame"]
+
+
+def build_reduced_init(data: Dict, symbols: Set[str]) -> str:
+    """Sadece verilen sembolleri içeren init frame'i (abonelikli bağlantılar)"""
+    return encode_json({
+        **data,
+        "prices": {s: q for s, q in data["prices"].items() if s in symbols},
+        "market": [m for m in data["market"] if m["symbol"] in symbols],
+        "reduced": True,
+    }).decode("utf-8")
+
+
+def send_initial_data(client: WSClient, reduced: bool = False):
+    """
+    İlk bağlantıda init frame'ini kuyruğa al.
+    reduced: sadece client'ın izlediği coinler (subscribe query parametreleri)
+    """
     try:
-        # Redis'den verileri al
-        prices_raw = redis_client.get("prices_data")
-        prices = json.loads(prices_raw) if prices_raw else {}
-        
-        fx_raw = redis_client.get("fx_rates")
-        fx = json.loads(fx_raw) if fx_raw else {"USD": 1, "TRY": 34.5, "EUR": 0.92}
-        
-        fear_greed_raw = redis_client.get("fear_greed")
-        fear_greed = json.loads(fear_greed_raw) if fear_greed_raw else {"value": 50}
-        
-        signals_stats_raw = redis_client.get("signals_stats")
-        signals_stats = json.loads(signals_stats_raw) if signals_stats_raw else {}
-        
-        # Market overview
-        market = []
-        sorted_coins = sorted(
-            prices.keys(),
-            key=lambda x: prices[x].get("market_cap", 0) or 0,
-            reverse=True
-        )
-        
-        for symbol in sorted_coins[:100]:
-            p = prices[symbol]
-            market.append({
-                "symbol": symbol,
-                "name": p.get("name", symbol),
-                "price": p.get("price", 0),
-                "change_24h": p.get("change_24h", 0),
-                "change_instant": p.get("change_instant", 0),
-                "market_cap": p.get("market_cap", 0),
-                "rank": p.get("rank", 999)
-            })
-        
-        await ws.send_text(json.dumps({
-            "type": "init",
-            "prices": prices,
-            "market": market,
-            "fx": fx,
-            "fear_greed": fear_greed,
-            "signals_stats": signals_stats,
-            "coins_count": len(prices),
-            "time": datetime.utcnow().isoformat()
-        }))
+        data, frame = get_init_data()
+        if reduced:
+            frame = build_reduced_init(data, client.interested(ws_hub.top_coins))
+        client.enqueue(frame)
     
     except Exception as e:
         print(f"[WS] Initial data error: {e}")
@@ -159,46 +212,50 @@ async def send_initial_data(ws: WebSocket):
 async def price_update_loop():
     """
     Fiyat güncelleme döngüsü
-    Worker'dan gelen güncellemeleri broadcast et
+    Price worker'ın tick olaylarında (events:prices) uyanır, değişenleri
+    price store versiyonundan çeker. Tur delta'sı bir kez hesaplanır, hub her
+    client'a sadece abone olduğu coinleri kuyruklar; yavaş client döngüyü bekletmez.
+    Olay gelmezse STREAM_BLOCK_MS sonunda versiyon yine kontrol edilir.
     """
-    last_update = None
+    last_version = None
+    last_event_id = None
+    market_caps = {}
     
     while True:
         try:
-            # Redis'den son güncelleme zamanını kontrol et
-            updated = redis_client.get("prices_updated")
+            if last_version is None:
+                # İlk tur: market cap sıralaması ve delta tabanı için tam liste
+                last_event_id = event_bus.last_id()
+                quotes = price_store.get_all()
+                last_version = price_store.get_version()
+                ws_hub.apply_quotes(quotes)
+                market_caps = {s: p.get("market_cap", 0) or 0 for s, p in quotes.items()}
+                ws_hub.top_coins = set(sorted(market_caps, key=market_caps.get, reverse=True)[:TOP_N])
             
-            if updated and updated != last_update:
-                last_update = updated
-                
-                # Fiyat verilerini al
-                prices_raw = redis_client.get("prices_data")
-                if prices_raw:
-                    prices = json.loads(prices_raw)
-                    
-                    # Sadece top 50 coin'i broadcast et
-                    top_coins = sorted(
-                        prices.keys(),
-                        key=lambda x: prices[x].get("market_cap", 0) or 0,
-                        reverse=True
-                    )[:50]
-                    
-                    update_data = {
-                        symbol: {
-                            "price": prices[symbol].get("price", 0),
-                            "change_24h": prices[symbol].get("change_24h", 0),
-                            "change_instant": prices[symbol].get("change_instant", 0)
-                        }
-                        for symbol in top_coins
-                    }
-                    
-                    await broadcast({
-                        "type": "price_update",
-                        "prices": update_data,
-                        "time": datetime.utcnow().isoformat()
-                    })
+            # Blocking XREAD ayrı thread'de (event loop bloklanmaz)
+            last_event_id, events = await asyncio.to_thread(
+                event_bus.read, last_event_id, STREAM_BLOCK_MS
+            )
+            if events and not any(e["type"] == EVENT_TICK for e in events):
+                continue
             
-            await asyncio.sleep(2)  # 2 saniyede bir kontrol
+            version, changed, removed = price_store.get_changes_since(last_version)
+            
+            if removed:
+                last_version = version
+                for symbol in removed:
+                    market_caps.pop(symbol, None)
+                ws_hub.top_coins = set(sorted(market_caps, key=market_caps.get, reverse=True)[:TOP_N])
+                ws_hub.remove_symbols(removed)
+            
+            if changed:
+                last_version = version
+                if any((p.get("market_cap", 0) or 0) != market_caps.get(s) for s, p in changed.items()):
+                    for symbol, p in changed.items():
+                        market_caps[symbol] = p.get("market_cap", 0) or 0
+                    ws_hub.top_coins = set(sorted(market_caps, key=market_caps.get, reverse=True)[:TOP_N])
+                
+                ws_hub.publish_prices(ws_hub.apply_quotes(changed))
         
         except Exception as e:
             print(f"[WS] Price update loop error: {e}")
@@ -207,4 +264,9 @@ async def price_update_loop():
 
 def get_connected_count() -> int:
     """Bağlı client sayısı"""
-    return len(ws_clients)
+    return len(ws_hub)
+
+
+def get_ws_metrics() -> Dict:
+    """Bağlantı, kuyruk derinliği ve atılan frame metrikleri"""
+    return ws_hub.stats()
@@ -18,6 +18,8 @@ from dataclasses import dataclass
 
 from database import redis_client
 from config import OPENAI_API_KEY
+from services.price_store import price_store
+from services.snapshot_cache import snapshot_cache
 
 # OpenAI client
 openai_client = None
@@ -127,17 +129,17 @@ class AISummaryService:
         ctx = MarketContext()
         
         try:
-            # Fiyat verileri
-            prices_raw = redis_client.get("prices")
-            if prices_raw:
-                prices = json.loads(prices_raw)
-                btc = prices.get("BTC", {})
-                eth = prices.get("ETH", {})
-                ctx.btc_price = btc.get("price", 0)
-                ctx.btc_change_24h = btc.get("change_24h", 0)
-                ctx.btc_change_7d = btc.get("change_7d", 0)
-                ctx.eth_price = eth.get("price", 0)
-                ctx.eth_change_24h = eth.get("change_24h", 0)
+            # Fiyat verileri (price store) + paylaşılan piyasa bağlamı
+            quotes = price_store.get_quotes(["BTC", "ETH"])
+            btc = quotes.get("BTC", {})
+            eth = quotes.get("ETH", {})
+            market_ctx = snapshot_cache.market_context(btc=btc)
+
+            ctx.btc_price = btc.get("price", 0)
+            ctx.btc_change_24h = market_ctx.btc_change_24h
+            ctx.btc_change_7d = market_ctx.btc_change_7d
+            ctx.eth_price = eth.get("price", 0)
+            ctx.eth_change_24h = eth.get("change_24h", 0)
             
             # Market cap
             market_raw = redis_client.get("market_data")
@@ -151,11 +153,8 @@ class AISummaryService:
                 ctx.btc_dominance = market.get("btc_dominance", 0)
             
             # Fear & Greed
-            fg_raw = redis_client.get("fear_greed")
-            if fg_raw:
-                fg = json.loads(fg_raw)
-                ctx.fear_greed_value = int(fg.get("value", 50))
-                ctx.fear_greed_label = fg.get("classification", "Neutral")
+            ctx.fear_greed_value = market_ctx.fear_greed
+            ctx.fear_greed_label = market_ctx.fear_greed_label
             
             # Teknik analiz (BTC)
             tech_raw = redis_client.get("technical_btc")
@@ -169,21 +168,17 @@ class AISummaryService:
                 macd = tech.get("macd", 0)
                 ctx.btc_macd = "positive" if macd and macd > 0 else "negative" if macd else "neutral"
             
-            # Futures
-            futures_raw = redis_client.get("futures_data")
-            if futures_raw:
-                futures = json.loads(futures_raw)
-                btc_fut = futures.get("BTCUSDT", {})
+            # Futures (futures_data anahtarları base symbol: "BTC")
+            btc_fut = market_ctx.futures_for("BTC")
+            if btc_fut:
                 ctx.btc_funding_rate = btc_fut.get("funding_rate", 0)
                 ctx.btc_long_short_ratio = btc_fut.get("long_short_ratio", 1)
                 oi = btc_fut.get("open_interest", 0)
                 ctx.btc_open_interest = f"${oi/1e9:.1f}B" if oi else ""
             
             # Haber sentiment
-            news_raw = redis_client.get("news_db")
-            if news_raw:
-                news = json.loads(news_raw)
-                news_list = list(news.values())
+            if market_ctx.news:
+                news_list = list(market_ctx.news.values())
                 total = len(news_list) or 1
                 bullish = sum(1 for n in news_list if n.get("sentiment") == "bullish")
                 bearish = sum(1 for n in news_list if n.get("sentiment") == "bearish")
@@ -355,13 +350,10 @@ JSON formatında yanıt ver:
     async def _get_portfolio_news(self, coins: List[str]) -> List[Dict]:
         """Portföy coinleri için haber analizi"""
         try:
-            news_raw = redis_client.get("news_db")
-            if not news_raw:
+            news_list = list(snapshot_cache.get("news_db").values())
+            if not news_list:
                 return []
             
-            news_dict = json.loads(news_raw)
-            news_list = list(news_dict.values())
-            
             portfolio_news = []
             for coin in coins[:10]:  # Max 10 coin
                 coin_news = [n for n in news_list if coin in (n.get("coins") or [])]
@@ -408,13 +400,10 @@ JSON formatında yanıt ver:
             return json.loads(cached)
         
         try:
-            news_raw = redis_client.get("news_db")
-            if not news_raw:
+            news_list = list(snapshot_cache.get("news_db").values())
+            if not news_list:
                 return None
             
-            news_dict = json.loads(news_raw)
-            news_list = list(news_dict.values())
-            
             # Portföy coinleriyle ilgili haberleri topla
             relevant_news = []
             for n in news_list:
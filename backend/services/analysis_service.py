@@ -22,6 +22,10 @@ from typing import Optional, Dict, List, Any, Tuple
 from datetime import datetime, timedelta
 
 from database import redis_client
+from services.candle_aggregator import get_recent_candles
+from services.candle_store import candle_store
+from services.indicator_engine import build_close_matrix, compute_indicators
+from services.indicator_state import IndicatorState
 from config import STABLECOINS, MEGA_CAP_COINS, LARGE_CAP_COINS, HIGH_RISK_COINS
 
 
@@ -170,36 +174,36 @@ class AnalysisService:
                 return self.ohlcv_cache[cache_key]
 
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.get(
-                    "https://api.binance.com/api/v3/klines",
-                    params={
-                        "symbol": f"{symbol}USDT",
-                        "interval": "1d",
-                        "limit": min(days, 365)
+            # Yerel candle store - sadece son kayıttan sonrası Binance'ten çekilir
+            klines = await candle_store.get_klines(symbol, "1d", min(days, 365))
+            if len(klines):
+                ohlcv = [
+                    {
+                        "timestamp": int(k["open_time"]),
+                        "open": float(k["open"]),
+                        "high": float(k["high"]),
+                        "low": float(k["low"]),
+                        "close": float(k["close"]),
+                        "volume": float(k["volume"])
                     }
-                )
-                if resp.status_code == 200:
-                    raw_klines = resp.json()
-                    ohlcv = [
-                        {
-                            "timestamp": k[0],
-                            "open": float(k[1]),
-                            "high": float(k[2]),
-                            "low": float(k[3]),
-                            "close": float(k[4]),
-                            "volume": float(k[5])
-                        }
-                        for k in raw_klines
-                    ]
-                    self.ohlcv_cache[cache_key] = ohlcv
-                    self.ohlcv_cache_time[cache_key] = datetime.utcnow()
-                    return ohlcv
+                    for k in klines
+                ]
+                self.ohlcv_cache[cache_key] = ohlcv
+                self.ohlcv_cache_time[cache_key] = datetime.utcnow()
+                return ohlcv
         except Exception as e:
             print(f"[Analysis] OHLCV fetch error for {symbol}: {e}")
 
         return []
 
+    def get_local_ohlcv(self, symbol: str, interval: str = "1h", limit: int = 100,
+                        include_open: bool = False) -> List[Dict]:
+        """
+        Price worker'ın WebSocket tick'lerinden ürettiği mumlar (OHLC, hacimsiz).
+        interval: 1m, 5m, 1h, 1d (açık mum sadece 1h/1d için yayınlanır)
+        """
+        return get_recent_candles(redis_client, symbol, interval, limit, include_open)
+
     def calc_true_atr(self, ohlcv: List[Dict], period: int = 14) -> Tuple[Optional[float], Optional[float]]:
         """
         Calculate TRUE ATR using High/Low/Close data.
@@ -303,165 +307,76 @@ class AnalysisService:
         """Public wrapper for technical indicator calculation."""
         return self._calculate_indicators(prices, volumes or [])
 
+    def calculate_indicators_batch(self, series_by_symbol: Dict[str, List]) -> Dict[str, Dict]:
+        """
+        Tüm coinler için indikatörleri tek vektörel geçişte hesapla.
+        Çıktı her coin için calculate_indicators() ile aynı dict yapısındadır.
+        """
+        symbols = [s for s, prices in series_by_symbol.items() if prices]
+        if not symbols:
+            return {}
+
+        close, lengths = build_close_matrix([series_by_symbol[s] for s in symbols])
+        ind = {k: v.tolist() for k, v in compute_indicators(close, lengths).items()}
+
+        return {
+            symbol: self._format_indicators({k: column[i] for k, column in ind.items()})
+            for i, symbol in enumerate(symbols)
+        }
+
     def _calculate_indicators(self, prices: List, volumes: List) -> Dict:
-        """Teknik indikatörleri hesapla"""
-        current_price = prices[-1][1] if prices else 0
-        
-        def get_change(days_ago):
-            if len(prices) > days_ago:
-                old = prices[-(days_ago+1)][1]
-                return ((current_price - old) / old * 100) if old > 0 else 0
-            return None
-        
-        def calc_rsi(period=14):
-            if len(prices) < period + 1:
-                return None
-            gains, losses = [], []
-            for i in range(-period, 0):
-                change = prices[i][1] - prices[i-1][1]
-                if change > 0:
-                    gains.append(change)
-                    losses.append(0)
-                else:
-                    gains.append(0)
-                    losses.append(abs(change))
-            avg_gain = sum(gains) / period
-            avg_loss = sum(losses) / period
-            if avg_loss == 0:
-                return 100
-            rs = avg_gain / avg_loss
-            return 100 - (100 / (1 + rs))
-        
-        def calc_ma(period):
-            if len(prices) < period:
-                return None
-            return sum(p[1] for p in prices[-period:]) / period
-        
-        def calc_ema(period):
-            if len(prices) < period:
-                return None
-            price_list = [p[1] for p in prices]
-            multiplier = 2 / (period + 1)
-            ema = price_list[0]
-            for price in price_list[1:]:
-                ema = (price * multiplier) + (ema * (1 - multiplier))
-            return ema
-        
-        def calc_macd():
-            ema_12 = calc_ema(12)
-            ema_26 = calc_ema(26)
-            if not ema_12 or not ema_26:
-                return None, None, None
-            macd_line = ema_12 - ema_26
-            return macd_line, None, None
-        
-        def calc_bollinger(period=20, num_std=2):
-            if len(prices) < period:
-                return None, None, None, None
-            recent_prices = [p[1] for p in prices[-period:]]
-            sma = sum(recent_prices) / period
-            variance = sum((p - sma) ** 2 for p in recent_prices) / period
-            std_dev = variance ** 0.5
-            upper = sma + (num_std * std_dev)
-            lower = sma - (num_std * std_dev)
-            if upper - lower > 0:
-                position = (current_price - lower) / (upper - lower) * 100
-            else:
-                position = 50
-            return upper, sma, lower, position
-        
-        def calc_volatility(days):
-            if len(prices) < days:
-                return None
-            recent = prices[-days:]
-            returns = []
-            for i in range(1, len(recent)):
-                if recent[i-1][1] > 0:
-                    ret = (recent[i][1] - recent[i-1][1]) / recent[i-1][1] * 100
-                    returns.append(ret)
-            if returns:
-                avg = sum(returns) / len(returns)
-                variance = sum((r - avg) ** 2 for r in returns) / len(returns)
-                return variance ** 0.5
-            return None
-        
-        # ============================================
-        # ATR HESAPLAMA - v3.0 (FIXED!)
-        # ============================================
-        def calc_atr(period=14):
-            """
-            Average True Range calculation.
-
-            NOTE: This version works with close-only data by estimating
-            the true range. For accurate ATR, use calc_true_atr() with OHLCV data.
-
-            Estimation method: Use price changes with volatility adjustment
-            """
-            if len(prices) < period + 1:
-                return None, None
-
-            # Calculate daily returns for volatility estimation
-            returns = []
-            for i in range(-period - 5, 0):
-                if i - 1 >= -len(prices):
-                    prev_price = prices[i-1][1]
-                    curr_price = prices[i][1]
-                    if prev_price > 0:
-                        daily_return = abs(curr_price - prev_price) / prev_price
-                        returns.append(daily_return)
-
-            if not returns:
-                return None, None
-
-            # Use average daily range as ATR proxy
-            avg_daily_range = sum(returns) / len(returns)
-
-            # ATR = average daily range * current price
-            atr = avg_daily_range * current_price
-            atr_percent = avg_daily_range * 100
-
-            return atr, atr_percent
-        
-        # Calculate all indicators
-        rsi = calc_rsi()
-        macd_line, macd_signal, macd_hist = calc_macd()
-        bb_upper, bb_middle, bb_lower, bb_position = calc_bollinger()
-        ma_20 = calc_ma(20)
-        ma_50 = calc_ma(50)
-        ma_200 = calc_ma(200)
-        volatility_7d = calc_volatility(7)
-        volatility_30d = calc_volatility(30)
-        atr, atr_percent = calc_atr(14)
-        
+        """Teknik indikatörleri hesapla (streaming IndicatorState üzerinden)"""
+        return self.calculate_indicators_from_state(IndicatorState.from_prices(prices))
+
+    def calculate_indicators_from_state(self, state: IndicatorState) -> Dict:
+        """Artımlı güncellenen IndicatorState'ten indikatör dict'i"""
+        return self._format_indicators(state.snapshot())
+
+    def _format_indicators(self, raw: Dict) -> Dict:
+        """
+        Ham indikatör değerlerini (IndicatorState.snapshot / indicator_engine)
+        API dict yapısına çevir. NaN ve None hesaplanamayan değer demektir.
+        """
+        def value(key):
+            x = raw.get(key)
+            return None if x is None or x != x else x
+
+        def rounded(key, digits):
+            x = value(key)
+            return round(x, digits) if x else None
+
+        current_price = raw.get("current_price", 0)
+        ma_20, ma_50, ma_200 = value("ma_20"), value("ma_50"), value("ma_200")
+
         return {
             "current_price": current_price,
-            "change_24h": get_change(1),
-            "change_7d": get_change(7),
-            "change_30d": get_change(30),
-            "change_90d": get_change(90),
-            "change_365d": get_change(365),
-            "rsi": round(rsi, 2) if rsi else None,
-            "macd": round(macd_line, 6) if macd_line else None,
+            "change_24h": value("change_1d"),
+            "change_7d": value("change_7d"),
+            "change_30d": value("change_30d"),
+            "change_90d": value("change_90d"),
+            "change_365d": value("change_365d"),
+            "rsi": rounded("rsi", 2),
+            "macd": rounded("macd", 6),
             "bollinger": {
-                "upper": round(bb_upper, 2) if bb_upper else None,
-                "middle": round(bb_middle, 2) if bb_middle else None,
-                "lower": round(bb_lower, 2) if bb_lower else None,
-                "position": round(bb_position, 2) if bb_position else None
+                "upper": rounded("bb_upper", 2),
+                "middle": rounded("bb_middle", 2),
+                "lower": rounded("bb_lower", 2),
+                "position": rounded("bb_position", 2)
             },
             "ma": {
-                "ma_20": round(ma_20, 2) if ma_20 else None,
-                "ma_50": round(ma_50, 2) if ma_50 else None,
-                "ma_200": round(ma_200, 2) if ma_200 else None
+                "ma_20": rounded("ma_20", 2),
+                "ma_50": rounded("ma_50", 2),
+                "ma_200": rounded("ma_200", 2)
             },
             "volatility": {
-                "7d": round(volatility_7d, 2) if volatility_7d else None,
-                "30d": round(volatility_30d, 2) if volatility_30d else None,
-                "atr": round(atr, 4) if atr else None,
-                "atr_percent": round(atr_percent, 2) if atr_percent else None
+                "7d": rounded("volatility_7d", 2),
+                "30d": rounded("volatility_30d", 2),
+                "atr": rounded("atr", 4),
+                "atr_percent": rounded("atr_percent", 2)
             },
             "trend": self._determine_trend(current_price, ma_20, ma_50, ma_200)
         }
-    
+
     def _determine_trend(self, price, ma_20, ma_50, ma_200) -> str:
         """Trend belirleme"""
         if not all([ma_20, ma_50]):
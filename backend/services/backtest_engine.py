@@ -7,20 +7,48 @@ v2.0 Changes:
 - Proper ATR calculation with OHLCV data
 - Configurable confidence/category for accurate backtesting
 - Cleaner cache management to prevent look-ahead bias
+- Each symbol's range is loaded once per run (KlineSeries); entries are
+  simulated on in-memory windows instead of one kline fetch per entry
+- Vectorized exit search (find_exits): all entries of a run at once
+  (exit multiplier grid search: services/exit_sweep.py)
+- Symbol x timeframe tasks run off the event loop (BACKTEST_WORKERS process
+  pool, or a thread) on the shared memory-mapped candle store; progress is
+  streamed as each task finishes. Signal replay always uses a process
+  (run_in_process), a single spawn worker when BACKTEST_WORKERS is unset
 """
 
 import asyncio
-import httpx
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+import httpx
+import numpy as np
+
 # Import shared multiplier functions from analysis_service
 from services.analysis_service import (
     get_confidence_multipliers,
     get_category_adjustments,
     get_timeframe_multipliers
 )
+from services.candle_store import BinanceRateLimited, candle_store, INTERVAL_MS
+from config import BACKTEST_WORKERS
+
+# Window around each simulated entry (ATR history before, exit search after)
+ENTRY_LOOKBACK = timedelta(days=20)
+ENTRY_LOOKAHEAD = timedelta(days=10)
+MAX_WINDOW_BARS = 1000
+MAX_HOLD_BARS = 168
+
+EXIT_REASONS = ("STOP_LOSS", "TRAILING_STOP", "TAKE_PROFIT", "TIME_EXPIRED", "INCOMPLETE")
+EXIT_CHUNK = 2048  # Entries per vectorized block (rows x MAX_HOLD_BARS matrix)
+LONG_SIGNALS = ("BUY", "AL", "STRONG_BUY", "GÜÇLÜ AL")
+
+BACKTEST_INTERVAL = "1h"
+PRELOAD_CONCURRENCY = 4  # Eşzamanlı candle store sync (Binance rate limit)
 
 
 @dataclass
@@ -59,6 +87,253 @@ class BacktestSummary:
     actual_rr_ratio: float = 0.0  # Added actual R:R tracking
 
 
+class KlineSeries:
+    """
+    One symbol/interval range loaded once per run as column arrays.
+    Entries are simulated on index windows - no refetch per entry.
+    """
+
+    def __init__(self, symbol: str, interval: str, candles: np.ndarray,
+                 start_ms: int = 0, end_ms: int = 0):
+        self.symbol = symbol
+        self.interval = interval
+        self.step = INTERVAL_MS.get(interval, INTERVAL_MS["1h"])
+        self.start_ms = start_ms  # Requested range (data may be shorter)
+        self.end_ms = end_ms
+        self.times = np.array(candles["open_time"], dtype=np.int64)
+        self.open = np.array(candles["open"], dtype=np.float64)
+        self.high = np.array(candles["high"], dtype=np.float64)
+        self.low = np.array(candles["low"], dtype=np.float64)
+        self.close = np.array(candles["close"], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def covers(self, start_ms: int, end_ms: int) -> bool:
+        return self.start_ms <= start_ms and end_ms <= self.end_ms
+
+    def open_time(self, index: int) -> datetime:
+        return datetime.fromtimestamp(int(self.times[index]) / 1000)
+
+    def close_time(self, index: int) -> datetime:
+        return datetime.fromtimestamp((int(self.times[index]) + self.step - 1) / 1000)
+
+    def entry_windows(self, entry_dates: List[datetime]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per entry: window [lo, hi) = open_time in [entry - 20d, entry + 10d]
+        (max MAX_WINDOW_BARS bars) and the first bar at/after entry_date.
+        Returns: (lo, hi, entry_index) index arrays
+        """
+        entry_ms = np.array([int(d.timestamp() * 1000) for d in entry_dates], dtype=np.int64)
+        start_ms = np.array([int((d - ENTRY_LOOKBACK).timestamp() * 1000) for d in entry_dates], dtype=np.int64)
+        end_ms = np.array([int((d + ENTRY_LOOKAHEAD).timestamp() * 1000) for d in entry_dates], dtype=np.int64)
+        lo = np.searchsorted(self.times, start_ms, side="left")
+        hi = np.minimum(np.searchsorted(self.times, end_ms, side="right"), lo + MAX_WINDOW_BARS)
+        entry = np.maximum(np.searchsorted(self.times, entry_ms, side="left"), lo)
+        return lo, hi, entry
+
+
+def find_exits(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    entries: np.ndarray,
+    ends: np.ndarray,
+    entry_prices: np.ndarray,
+    stop_losses: np.ndarray,
+    take_profits: np.ndarray,
+    trailing_stops: np.ndarray,
+    is_long: np.ndarray,
+    max_bars: int = MAX_HOLD_BARS
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized exit search for many entries on one price series.
+
+    Bars entries[k]+1 .. entries[k]+max_bars (before ends[k]) form one row.
+    The trailing stop follows the running high (long) / low (short), so
+    per bar: trail = max(initial, cummax(high) * (1 - pct)) once price has
+    moved past entry. First bar hitting SL / trailing / TP wins (checked
+    in that order, as in find_exit_point); no hit -> TIME_EXPIRED at
+    entry + max_bars, or INCOMPLETE at the window's last bar.
+
+    Returns: (exit_index, exit_price, reason_code) - reason = EXIT_REASONS[code]
+    """
+    count = len(entries)
+    exit_index = np.empty(count, dtype=np.int64)
+    exit_price = np.empty(count, dtype=np.float64)
+    reasons = np.empty(count, dtype=np.int8)
+    if count == 0 or len(high) == 0:
+        return exit_index, exit_price, reasons
+
+    offsets = np.arange(1, max_bars + 1)
+    last = len(high) - 1
+
+    for lo in range(0, count, EXIT_CHUNK):
+        sl = slice(lo, lo + EXIT_CHUNK)
+        entry = entries[sl][:, None]
+        end = ends[sl]
+        long_ = is_long[sl][:, None]
+        price = entry_prices[sl][:, None]
+        stop = stop_losses[sl][:, None]
+        target = take_profits[sl][:, None]
+        trail0 = trailing_stops[sl][:, None]
+        pct = np.abs(entry_prices[sl] - trailing_stops[sl])[:, None] / price
+
+        idx = entry + offsets
+        valid = idx < end[:, None]
+        bar = np.minimum(idx, last)
+        highs, lows = high[bar], low[bar]
+
+        # Running extreme since entry (invalid tail bars come after all valid ones)
+        run_high = np.maximum.accumulate(highs, axis=1)
+        run_low = np.minimum.accumulate(lows, axis=1)
+        trail = np.where(
+            long_,
+            np.where(run_high > price, np.maximum(trail0, run_high * (1 - pct)), trail0),
+            np.where(run_low < price, np.minimum(trail0, run_low * (1 + pct)), trail0),
+        )
+
+        hit_sl = np.where(long_, lows <= stop, highs >= stop) & valid
+        hit_trail = np.where(long_, (lows <= trail) & (trail > stop), (highs >= trail) & (trail < stop)) & valid
+        hit_tp = np.where(long_, highs >= target, lows <= target) & valid
+
+        hit = hit_sl | hit_trail | hit_tp
+        has_hit = hit.any(axis=1)
+        first = hit.argmax(axis=1)
+        rows = np.arange(len(first))
+
+        code = np.where(hit_sl[rows, first], 0, np.where(hit_trail[rows, first], 1, 2))
+        price_at_hit = np.where(
+            code == 0, stop[:, 0], np.where(code == 1, trail[rows, first], target[:, 0])
+        )
+
+        expire_at = entries[sl] + max_bars
+        expired = expire_at < end
+        no_hit_index = np.where(expired, expire_at, end - 1)
+
+        exit_index[sl] = np.where(has_hit, entries[sl] + 1 + first, no_hit_index)
+        exit_price[sl] = np.where(has_hit, price_at_hit, close[np.minimum(no_hit_index, last)])
+        reasons[sl] = np.where(has_hit, code, np.where(expired, 3, 4))
+
+    return exit_index, exit_price, reasons
+
+
+def entry_schedule(start_date: datetime, end_date: datetime, signal_frequency_hours: int) -> List[datetime]:
+    """Simulated entry times: every signal_frequency_hours in [start_date, end_date)"""
+    dates = []
+    current_date = start_date
+    while current_date < end_date:
+        dates.append(current_date)
+        current_date += timedelta(hours=signal_frequency_hours)
+    return dates
+
+
+def simulate_task(
+    symbol: str,
+    start_ms: int,
+    end_ms: int,
+    entry_dates: List[datetime],
+    timeframe: str,
+    confidence: int,
+    category: str
+) -> List[BacktestResult]:
+    """
+    One symbol x timeframe task (pool worker or thread).
+    Reads the memory-mapped candle store the caller already synced -
+    workers share the file through the page cache, nothing is pickled.
+    """
+    candles = candle_store.read_range(symbol, BACKTEST_INTERVAL, start_ms, end_ms)
+    series = KlineSeries(symbol, BACKTEST_INTERVAL, candles, start_ms, end_ms)
+    if not len(series):
+        return []
+    simulated = BacktestEngine().simulate_entries(
+        series, entry_dates, "BUY", timeframe, confidence, category
+    )
+    return [r for r in simulated if r and r.exit_reason != "INCOMPLETE"]
+
+
+def store_covers(symbol: str, start_ms: int, end_ms: int) -> bool:
+    """
+    Candle store holds the whole run range for symbol: first bar at/before
+    start_ms and the last closed bar reaching end_ms (a failed or rate
+    limited sync leaves a gap, so the report must not be cached).
+    """
+    first = candle_store.first_timestamp(symbol, BACKTEST_INTERVAL)
+    last = candle_store.last_timestamp(symbol, BACKTEST_INTERVAL)
+    step = INTERVAL_MS[BACKTEST_INTERVAL]
+    return first is not None and first <= start_ms + step and last >= end_ms - step
+
+
+backtest_pool: Optional[ProcessPoolExecutor] = None
+fallback_pool: Optional[ProcessPoolExecutor] = None
+FALLBACK_POOL_WORKERS = 1  # BACKTEST_WORKERS yokken pure-Python işler (replay) için
+
+
+def _spawn_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn: API process'inin thread'leri/event loop'u fork edilmez
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def get_backtest_pool() -> Optional[ProcessPoolExecutor]:
+    """BACKTEST_WORKERS > 1 ise lazy oluşturulan process pool (yoksa thread)"""
+    global backtest_pool
+    if BACKTEST_WORKERS <= 1:
+        return None
+    if backtest_pool is None:
+        backtest_pool = _spawn_pool(BACKTEST_WORKERS)
+    return backtest_pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Her zaman bir process pool: BACKTEST_WORKERS pool'u ya da tek process'lik spawn pool"""
+    global fallback_pool
+    pool = get_backtest_pool()
+    if pool is not None:
+        return pool
+    if fallback_pool is None:
+        fallback_pool = _spawn_pool(FALLBACK_POOL_WORKERS)
+    return fallback_pool
+
+
+async def run_off_loop(func, *args):
+    """func(*args) on the backtest pool (or a thread); broken pool -> thread"""
+    global backtest_pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_backtest_pool(), func, *args)
+    except BrokenProcessPool as e:
+        print(f"[Backtest] Process pool broken, running in thread: {e}")
+        backtest_pool = None
+        return await asyncio.to_thread(func, *args)
+
+
+async def run_in_process(func, *args):
+    """
+    func(*args) always in a separate process, never in an API thread.
+    For long pure-Python loops (signal replay) that would hold the GIL and
+    starve the event loop; broken pool -> recreated once.
+    """
+    global backtest_pool, fallback_pool
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_process_pool(), func, *args)
+    except BrokenProcessPool as e:
+        print(f"[Backtest] Process pool broken, recreating: {e}")
+        backtest_pool = fallback_pool = None
+        return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def compare_metrics(summary: Optional[BacktestSummary]) -> Optional[Dict]:
+    """Karşılaştırma tablosu satırı"""
+    if summary is None:
+        return None
+    return {
+        "success_rate": summary.success_rate,
+        "total_return_pct": summary.total_return_pct,
+        "profit_factor": summary.profit_factor,
+        "total_signals": summary.total_signals,
+    }
+
+
 class BacktestEngine:
     """
     Backtesting engine that uses the SAME multipliers as production.
@@ -66,75 +341,42 @@ class BacktestEngine:
 
     def __init__(self):
         self.binance_base = "https://api.binance.com/api/v3"
-        self.cache: Dict[str, List[dict]] = {}
-        self.cache_timestamps: Dict[str, datetime] = {}
+        self.series: Dict[str, KlineSeries] = {}  # Per-run loaded ranges
         self.atr_period = 14
         self.max_hold_days = 7
-        self.cache_duration = 3600  # 1 hour cache
 
     def clear_cache(self):
-        """Clear all cached data to prevent look-ahead bias between runs."""
-        self.cache.clear()
-        self.cache_timestamps.clear()
+        """Clear loaded ranges to prevent look-ahead bias between runs."""
+        self.series.clear()
 
-    async def fetch_historical_klines(
+    async def load_series(
         self,
         symbol: str,
-        interval: str = "1h",
-        start_date: datetime = None,
-        end_date: datetime = None,
-        limit: int = 1000
-    ) -> List[dict]:
+        interval: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> KlineSeries:
         """
-        Fetch historical klines with proper cache management.
+        Load [start_date, end_date] for a symbol once: one incremental
+        candle store sync (paginated Binance fetch only for missing candles),
+        then a single in-memory copy reused by every entry of the run.
         """
-        # Create cache key WITHOUT end_date to prevent look-ahead
-        cache_key = f"{symbol}_{interval}_{start_date.strftime('%Y%m%d') if start_date else 'none'}"
-
-        # Check cache validity
-        if cache_key in self.cache:
-            cache_time = self.cache_timestamps.get(cache_key)
-            if cache_time and (datetime.utcnow() - cache_time).total_seconds() < self.cache_duration:
-                # Filter cached data to only include up to end_date
-                cached = self.cache[cache_key]
-                if end_date:
-                    return [k for k in cached if k["open_time"] <= end_date]
-                return cached
-
-        trading_symbol = f"{symbol.upper()}USDT"
-        params = {"symbol": trading_symbol, "interval": interval, "limit": limit}
-
-        if start_date:
-            params["startTime"] = int(start_date.timestamp() * 1000)
-        if end_date:
-            params["endTime"] = int(end_date.timestamp() * 1000)
+        key = f"{symbol}_{interval}"
+        start_ms = int(start_date.timestamp() * 1000)
+        end_ms = int(end_date.timestamp() * 1000)
+        series = self.series.get(key)
+        if series is not None and series.covers(start_ms, end_ms):
+            return series
 
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.get(f"{self.binance_base}/klines", params=params)
-                if resp.status_code != 200:
-                    return []
-                raw_klines = resp.json()
-                klines = []
-                for k in raw_klines:
-                    klines.append({
-                        "open_time": datetime.fromtimestamp(k[0] / 1000),
-                        "open": float(k[1]),
-                        "high": float(k[2]),
-                        "low": float(k[3]),
-                        "close": float(k[4]),
-                        "volume": float(k[5]),
-                        "close_time": datetime.fromtimestamp(k[6] / 1000)
-                    })
-
-                # Cache the full dataset
-                self.cache[cache_key] = klines
-                self.cache_timestamps[cache_key] = datetime.utcnow()
-                return klines
-
+            await candle_store.sync_binance(symbol, interval, start=start_date)
+            candles = candle_store.read_range(symbol, interval, start_ms, end_ms)
         except Exception as e:
-            print(f"[Backtest] Kline fetch error: {e}")
-            return []
+            print(f"[Backtest] Kline load error: {e}")
+            candles = candle_store.read_range(symbol, interval, start_ms, end_ms)
+
+        series = self.series[key] = KlineSeries(symbol, interval, candles, start_ms, end_ms)
+        return series
 
     def calculate_atr(self, klines: List[dict], period: int = 14) -> float:
         """
@@ -225,55 +467,24 @@ class BacktestEngine:
         take_profit: float,
         trailing_stop: float,
         signal_type: str,
-        max_bars: int = 168
+        max_bars: int = MAX_HOLD_BARS
     ) -> Tuple[int, float, str]:
         """
-        Find exit point with trailing stop support.
+        Find exit point with trailing stop support (single entry, see find_exits).
         """
-        is_long = signal_type.upper() in ["BUY", "AL", "STRONG_BUY", "GÜÇLÜ AL"]
-        highest_price = entry_price
-        lowest_price = entry_price
-        current_trailing = trailing_stop
-        trailing_pct = abs(entry_price - trailing_stop) / entry_price
-
-        for i in range(entry_index + 1, min(entry_index + max_bars + 1, len(klines))):
-            high = klines[i]["high"]
-            low = klines[i]["low"]
-
-            if is_long:
-                # Update highest price and trailing stop
-                if high > highest_price:
-                    highest_price = high
-                    new_trailing = highest_price * (1 - trailing_pct)
-                    if new_trailing > current_trailing:
-                        current_trailing = new_trailing
-
-                # Check exits in order: SL first (worst case), then trailing, then TP
-                if low <= stop_loss:
-                    return i, stop_loss, "STOP_LOSS"
-                if low <= current_trailing and current_trailing > stop_loss:
-                    return i, current_trailing, "TRAILING_STOP"
-                if high >= take_profit:
-                    return i, take_profit, "TAKE_PROFIT"
-            else:
-                # SHORT position
-                if low < lowest_price:
-                    lowest_price = low
-                    new_trailing = lowest_price * (1 + trailing_pct)
-                    if new_trailing < current_trailing:
-                        current_trailing = new_trailing
-
-                if high >= stop_loss:
-                    return i, stop_loss, "STOP_LOSS"
-                if high >= current_trailing and current_trailing < stop_loss:
-                    return i, current_trailing, "TRAILING_STOP"
-                if low <= take_profit:
-                    return i, take_profit, "TAKE_PROFIT"
-
-        # Time expired
-        if entry_index + max_bars < len(klines):
-            return entry_index + max_bars, klines[entry_index + max_bars]["close"], "TIME_EXPIRED"
-        return len(klines) - 1, klines[-1]["close"], "INCOMPLETE"
+        exit_index, exit_price, reason = find_exits(
+            np.array([k["high"] for k in klines], dtype=np.float64),
+            np.array([k["low"] for k in klines], dtype=np.float64),
+            np.array([k["close"] for k in klines], dtype=np.float64),
+            np.array([entry_index]), np.array([len(klines)]),
+            np.array([entry_price], dtype=np.float64),
+            np.array([stop_loss], dtype=np.float64),
+            np.array([take_profit], dtype=np.float64),
+            np.array([trailing_stop], dtype=np.float64),
+            np.array([signal_type.upper() in LONG_SIGNALS]),
+            max_bars
+        )
+        return int(exit_index[0]), float(exit_price[0]), EXIT_REASONS[reason[0]]
 
     async def backtest_signal(
         self,
@@ -287,67 +498,157 @@ class BacktestEngine:
         """
         Backtest a single signal with configurable confidence and category.
         """
-        start_date = entry_date - timedelta(days=20)
-        end_date = entry_date + timedelta(days=10)
-        klines = await self.fetch_historical_klines(symbol, "1h", start_date, end_date)
-
-        if len(klines) < 20:
-            return None
-
-        # Find entry point
-        entry_index, entry_price = None, None
-        for i, k in enumerate(klines):
-            if k["open_time"] >= entry_date:
-                entry_index, entry_price = i, k["open"]
-                break
-
-        if entry_index is None:
-            return None
-
-        # Calculate ATR from candles BEFORE entry (no look-ahead)
-        atr_klines = klines[max(0, entry_index - 15):entry_index]
-        atr = self.calculate_atr(atr_klines, self.atr_period)
-        if atr == 0:
-            atr = entry_price * 0.02
-
-        # Calculate exit levels using SHARED multipliers
-        stop_loss, take_profit, trailing_stop = self.calculate_exit_levels(
-            entry_price, atr, signal_type, timeframe, confidence, category
+        series = await self.load_series(
+            symbol, "1h", entry_date - ENTRY_LOOKBACK, entry_date + ENTRY_LOOKAHEAD
         )
+        return self.simulate_entries(series, [entry_date], signal_type, timeframe, confidence, category)[0]
 
-        # Find exit
-        exit_index, exit_price, exit_reason = self.find_exit_point(
-            klines, entry_index, entry_price, stop_loss, take_profit,
-            trailing_stop, signal_type
+    def simulate_entries(
+        self,
+        series: KlineSeries,
+        entry_dates: List[datetime],
+        signal_type: str,
+        timeframe: str = "1d",
+        confidence: int = 75,
+        category: str = "ALT"
+    ) -> List[Optional[BacktestResult]]:
+        """
+        Simulate many entries on one loaded series.
+        Each entry uses the same window the per-entry fetch used (-20 / +10 days);
+        exit levels are computed per entry, exits are found in one vectorized pass.
+        Returns one result (or None if there is not enough data) per entry date.
+        """
+        results: List[Optional[BacktestResult]] = [None] * len(entry_dates)
+        if not entry_dates or not len(series):
+            return results
+
+        is_long = signal_type.upper() in LONG_SIGNALS
+        lo, hi, entry = series.entry_windows(entry_dates)
+
+        rows, prices, stops, targets, trails = [], [], [], [], []
+        for k in range(len(entry_dates)):
+            if hi[k] - lo[k] < 20 or entry[k] >= hi[k]:
+                continue
+
+            entry_index = int(entry[k])
+            entry_price = float(series.open[entry_index])
+
+            # Calculate ATR from candles BEFORE entry (no look-ahead)
+            atr_lo = max(int(lo[k]), entry_index - 15)
+            atr_klines = [
+                {"high": h, "low": l, "close": c}
+                for h, l, c in zip(series.high[atr_lo:entry_index].tolist(),
+                                   series.low[atr_lo:entry_index].tolist(),
+                                   series.close[atr_lo:entry_index].tolist())
+            ]
+            atr = self.calculate_atr(atr_klines, self.atr_period)
+            if atr == 0:
+                atr = entry_price * 0.02
+
+            # Calculate exit levels using SHARED multipliers
+            stop_loss, take_profit, trailing_stop = self.calculate_exit_levels(
+                entry_price, atr, signal_type, timeframe, confidence, category
+            )
+            rows.append(k)
+            prices.append(entry_price)
+            stops.append(stop_loss)
+            targets.append(take_profit)
+            trails.append(trailing_stop)
+
+        if not rows:
+            return results
+
+        exit_indexes, exit_prices, reasons = find_exits(
+            series.high, series.low, series.close,
+            entry[rows], hi[rows],
+            np.array(prices), np.array(stops), np.array(targets), np.array(trails),
+            np.full(len(rows), is_long)
         )
 
-        # Calculate P/L
-        is_long = signal_type.upper() in ["BUY", "AL", "STRONG_BUY", "GÜÇLÜ AL"]
-        if is_long:
-            profit_loss_pct = ((exit_price - entry_price) / entry_price) * 100
-        else:
-            profit_loss_pct = ((entry_price - exit_price) / entry_price) * 100
-
-        hold_duration = klines[exit_index]["close_time"] - klines[entry_index]["open_time"]
-
-        return BacktestResult(
-            symbol=symbol,
-            entry_date=entry_date.strftime("%Y-%m-%d %H:%M"),
-            entry_price=entry_price,
-            signal_type=signal_type,
-            stop_loss=stop_loss,
-            take_profit=take_profit,
-            exit_date=klines[exit_index]["close_time"].strftime("%Y-%m-%d %H:%M"),
-            exit_price=exit_price,
-            exit_reason=exit_reason,
-            profit_loss_pct=round(profit_loss_pct, 2),
-            is_successful=(exit_reason in ["TAKE_PROFIT", "TRAILING_STOP"] and profit_loss_pct > 0),
-            hold_duration_hours=int(hold_duration.total_seconds() / 3600),
-            confidence=confidence,
-            category=category
-        )
+        for n, k in enumerate(rows):
+            entry_index = int(entry[k])
+            exit_index = int(exit_indexes[n])
+            entry_price = prices[n]
+            exit_price = float(exit_prices[n])
+            exit_reason = EXIT_REASONS[reasons[n]]
 
-    async def run_backtest(
+            # Calculate P/L
+            if is_long:
+                profit_loss_pct = ((exit_price - entry_price) / entry_price) * 100
+            else:
+                profit_loss_pct = ((entry_price - exit_price) / entry_price) * 100
+
+            exit_time = series.close_time(exit_index)
+            hold_duration = exit_time - series.open_time(entry_index)
+
+            results[k] = BacktestResult(
+                symbol=series.symbol,
+                entry_date=entry_dates[k].strftime("%Y-%m-%d %H:%M"),
+                entry_price=entry_price,
+                signal_type=signal_type,
+                stop_loss=stops[n],
+                take_profit=targets[n],
+                exit_date=exit_time.strftime("%Y-%m-%d %H:%M"),
+                exit_price=exit_price,
+                exit_reason=exit_reason,
+                profit_loss_pct=round(profit_loss_pct, 2),
+                is_successful=(exit_reason in ["TAKE_PROFIT", "TRAILING_STOP"] and profit_loss_pct > 0),
+                hold_duration_hours=int(hold_duration.total_seconds() / 3600),
+                confidence=confidence,
+                category=category
+            )
+        return results
+
+    async def preload(self, symbols: List[str], start_date: datetime, end_date: datetime):
+        """Sync each symbol's candle range once (shared by every task of the run)"""
+        semaphore = asyncio.Semaphore(PRELOAD_CONCURRENCY)
+        async with httpx.AsyncClient(timeout=30) as client:
+            async def sync(symbol: str):
+                async with semaphore:
+                    try:
+                        await candle_store.sync_binance(symbol, BACKTEST_INTERVAL, start=start_date, client=client)
+                    except BinanceRateLimited as e:
+                        # Continue with partial data; store_covers fails so the report is not cached
+                        print(f"[Backtest] {symbol} preload skipped: {e}")
+            await asyncio.gather(*(sync(symbol) for symbol in symbols))
+
+    async def iter_tasks(
+        self,
+        symbols: List[str],
+        timeframes: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        signal_frequency_hours: int = 24,
+        confidence: int = 75,
+        category: str = "ALT"
+    ) -> AsyncIterator[Tuple[str, str, List[BacktestResult]]]:
+        """
+        Run every symbol x timeframe task off the event loop.
+        Yields (symbol, timeframe, results) in completion order.
+        """
+        range_start = start_date - ENTRY_LOOKBACK
+        range_end = end_date + ENTRY_LOOKAHEAD
+        await self.preload(symbols, range_start, range_end)
+
+        start_ms = int(range_start.timestamp() * 1000)
+        end_ms = int(range_end.timestamp() * 1000)
+        entry_dates = entry_schedule(start_date, end_date, signal_frequency_hours)
+
+        async def run(symbol: str, timeframe: str):
+            try:
+                results = await run_off_loop(
+                    simulate_task, symbol, start_ms, end_ms, entry_dates, timeframe, confidence, category
+                )
+            except Exception as e:
+                print(f"[Backtest] {symbol} {timeframe} simulation error: {e}")
+                results = []
+            return symbol, timeframe, results
+
+        tasks = [run(symbol, tf) for symbol in symbols for tf in timeframes]
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+
+    async def stream_backtest(
         self,
         symbols: List[str],
         start_date: datetime,
@@ -356,30 +657,34 @@ class BacktestEngine:
         timeframe: str = "1d",
         confidence: int = 75,
         category: str = "ALT"
-    ) -> Dict:
-        """Run backtest across multiple symbols."""
+    ) -> AsyncIterator[Dict]:
+        """
+        run_backtest as a stream: one "progress" event per finished symbol,
+        then a "result" event with the full report.
+        """
         print(f"[Backtest] Starting: {len(symbols)} symbols, {timeframe}, conf={confidence}")
 
-        # Clear cache before new backtest run
-        self.clear_cache()
-
-        results: List[BacktestResult] = []
-        for symbol in symbols:
-            current_date = start_date
-            while current_date < end_date:
-                try:
-                    result = await self.backtest_signal(
-                        symbol, current_date, "BUY", timeframe, confidence, category
-                    )
-                    if result and result.exit_reason != "INCOMPLETE":
-                        results.append(result)
-                except Exception as e:
-                    pass
-                current_date += timedelta(hours=signal_frequency_hours)
-            await asyncio.sleep(0.3)
+        by_symbol: Dict[str, List[BacktestResult]] = {}
+        done = 0
+        async for symbol, _, results in self.iter_tasks(
+            symbols, [timeframe], start_date, end_date, signal_frequency_hours, confidence, category
+        ):
+            by_symbol[symbol] = results
+            done += 1
+            yield {
+                "type": "progress",
+                "done": done,
+                "total": len(symbols),
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "metrics": compare_metrics(self.calculate_summary(results)),
+            }
 
+        # Same order as the serial loop: symbols as given, entries in time order
+        results = [r for symbol in symbols for r in by_symbol.get(symbol, [])]
         summary = self.calculate_summary(results)
-        return {
+        yield {
+            "type": "result",
             "summary": asdict(summary) if summary else None,
             "results": [asdict(r) for r in results[-50:]],
             "total_results": len(results),
@@ -393,6 +698,78 @@ class BacktestEngine:
             }
         }
 
+    async def run_backtest(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        signal_frequency_hours: int = 24,
+        timeframe: str = "1d",
+        confidence: int = 75,
+        category: str = "ALT"
+    ) -> Dict:
+        """Run backtest across multiple symbols."""
+        report = {}
+        async for event in self.stream_backtest(
+            symbols, start_date, end_date, signal_frequency_hours, timeframe, confidence, category
+        ):
+            report = event
+        report.pop("type", None)
+        return report
+
+    async def compare_timeframes(
+        self,
+        symbols: List[str],
+        timeframes: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        signal_frequency_hours: int = 24,
+        confidence: int = 75,
+        category: str = "ALT"
+    ) -> AsyncIterator[Dict]:
+        """
+        Symbols x timeframes comparison as a stream: "progress" events with
+        per-task metrics, then a "result" event (per timeframe over all
+        symbols, per symbol, best timeframe by success rate).
+        """
+        total = len(symbols) * len(timeframes)
+        by_task: Dict[Tuple[str, str], List[BacktestResult]] = {}
+        async for symbol, tf, results in self.iter_tasks(
+            symbols, timeframes, start_date, end_date, signal_frequency_hours, confidence, category
+        ):
+            by_task[(symbol, tf)] = results
+            yield {
+                "type": "progress",
+                "done": len(by_task),
+                "total": total,
+                "symbol": symbol,
+                "timeframe": tf,
+                "metrics": compare_metrics(self.calculate_summary(results)),
+            }
+
+        comparison = {}
+        for tf in timeframes:
+            results = [r for symbol in symbols for r in by_task.get((symbol, tf), [])]
+            metrics = compare_metrics(self.calculate_summary(results))
+            if metrics:
+                comparison[tf] = metrics
+
+        by_symbol = {
+            symbol: {
+                tf: compare_metrics(self.calculate_summary(by_task.get((symbol, tf), [])))
+                for tf in timeframes
+            }
+            for symbol in symbols
+        }
+        best = max(comparison.keys(), key=lambda x: comparison[x]["success_rate"]) if comparison else None
+        yield {
+            "type": "result",
+            "symbols": symbols,
+            "comparison": comparison,
+            "by_symbol": by_symbol,
+            "best_timeframe": best,
+        }
+
     def calculate_summary(self, results: List[BacktestResult]) -> Optional[BacktestSummary]:
         """Calculate backtest summary with actual R:R ratio."""
         if not results:
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Backtest Jobs
+============================
+Arka planda çalışan backtest / sinyal replay işleri + parametre hash'li
+sonuç cache'i.
+
+- submit() hemen job döner; işler kuyruktan JOB_CONCURRENCY worker task'ı
+  ile çalışır (simülasyon engine'in process pool'unda / thread'de)
+- İş türleri: "backtest" (stream_backtest), "compare" (timeframe
+  karşılaştırması), "sweep" (SL/TP/trailing çarpan grid'i), "replay"
+  (stream_replay, opsiyonel portföy simülasyonu dahil)
+- Cache anahtarı: (tür, parametreler, data_version)
+  data_version = son kapanmış saatlik mum; bitiş zamanı bu saate yuvarlanır,
+  böylece aynı saatte aynı parametreler birebir aynı sonucu verir
+- Aynı anahtarla gelen ikinci istek devam eden işe bağlanır (yeni iş açılmaz)
+- Sonuç sadece tüm sembollerin mumları candle store'da [start, end]
+  aralığını kapsıyorsa cache'lenir (store_covers); Binance hatası / rate
+  limit yüzünden eksik kalan veriyle üretilen rapor paylaşılan anahtara
+  yazılmaz. Aralığın ortasında listelenen coinler de bu yüzden cache'lenmez.
+- Sonuçlar Redis'te (API instance'ları arasında paylaşılır), job durumları
+  process içinde tutulur
+
+Redis anahtarları:
+- backtest_result:{hash} : STRING sonuç JSON (RESULT_TTL)
+"""
+
+import asyncio
+import hashlib
+import json
+import secrets
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from database import redis_client
+import numpy as np
+
+from services.backtest_engine import BacktestEngine, store_covers
+from services.exit_sweep import stream_sweep
+from services.portfolio_sim import PortfolioConfig
+from services.signal_replay import HISTORY_DAYS, MARKET_SYMBOL, stream_replay
+
+RESULT_KEY_PREFIX = "backtest_result"
+RESULT_TTL = 7200            # Veri versiyonu saatlik değişir; 2 saat yeterli
+JOB_CONCURRENCY = 2          # Aynı anda çalışan iş
+MAX_JOBS = 500               # Bellekte tutulan iş kaydı
+JOB_RETENTION = 3600         # Bitmiş işler bu süre sonra silinebilir (saniye)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+KIND_BACKTEST = "backtest"
+KIND_COMPARE = "compare"
+KIND_SWEEP = "sweep"
+KIND_REPLAY = "replay"
+
+
+def data_version(now: Optional[datetime] = None) -> datetime:
+    """Son kapanmış saatlik mumun bitişi (backtest bitiş zamanı)"""
+    now = now or datetime.now()
+    return now.replace(minute=0, second=0, microsecond=0)
+
+
+def job_key(params: Dict, version: datetime) -> str:
+    """Parametreler + veri versiyonu -> sonuç cache anahtarı"""
+    payload = json.dumps({**params, "data_version": version.isoformat()}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+@dataclass
+class BacktestJob:
+    id: str
+    key: str
+    params: Dict
+    end_date: datetime
+    status: str = STATUS_QUEUED
+    done: int = 0
+    total: int = 0
+    cached: bool = False
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    finished_at: Optional[str] = None
+    _updated: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (STATUS_DONE, STATUS_FAILED)
+
+    def notify(self):
+        """Durum değişti - bekleyen stream'leri uyandır"""
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        out = {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total},
+            "cached": self.cached,
+            "params": self.params,
+            "data_version": self.end_date.isoformat(),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error:
+            out["error"] = self.error
+        if include_result and self.status == STATUS_DONE:
+            out["result"] = self.result
+        return out
+
+
+class BacktestJobQueue:
+    """Process içi iş kuyruğu; sonuçlar Redis'te cache'lenir"""
+
+    def __init__(self, client, engine: Optional[BacktestEngine] = None,
+                 concurrency: int = JOB_CONCURRENCY):
+        self.r = client
+        self.engine = engine or BacktestEngine()
+        self.concurrency = concurrency
+        self.jobs: Dict[str, BacktestJob] = {}
+        self.inflight: Dict[str, BacktestJob] = {}  # key -> queued/running job
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    # ============================================
+    # SUBMIT / LOOKUP
+    # ============================================
+
+    def submit(self, symbols: List[str], days: int, timeframe: str = "1d",
+               confidence: int = 75, category: str = "ALT") -> BacktestJob:
+        """Backtest işi (stream_backtest)"""
+        return self.submit_job({
+            "kind": KIND_BACKTEST,
+            "symbols": [s.upper() for s in symbols],
+            "days": days,
+            "timeframe": timeframe,
+            "confidence": confidence,
+            "category": category,
+        })
+
+    def submit_compare(self, symbols: List[str], days: int, timeframes: List[str],
+                       confidence: int = 75, category: str = "ALT") -> BacktestJob:
+        """Sembol x timeframe karşılaştırma işi (compare_timeframes)"""
+        return self.submit_job({
+            "kind": KIND_COMPARE,
+            "symbols": [s.upper() for s in symbols],
+            "days": days,
+            "timeframes": list(timeframes),
+            "confidence": confidence,
+            "category": category,
+        })
+
+    def submit_sweep(self, symbols: List[str], days: int, grid: np.ndarray, timeframe: str = "1d",
+                     confidence: int = 75, category: str = "ALT", sort_by: str = "profit_factor",
+                     top: int = 50) -> BacktestJob:
+        """Çıkış çarpanı grid taraması (grid: make_grid çıktısı, anahtara dahil)"""
+        return self.submit_job({
+            "kind": KIND_SWEEP,
+            "symbols": [s.upper() for s in symbols],
+            "days": days,
+            "grid": np.asarray(grid, dtype=np.float64).tolist(),
+            "timeframe": timeframe,
+            "confidence": confidence,
+            "category": category,
+            "sort_by": sort_by,
+            "top": top,
+        })
+
+    def submit_replay(self, symbols: List[str], days: int, timeframe: str = "1d",
+                      fear_greed: int = 50, max_signals: int = 50,
+                      portfolio: Optional[PortfolioConfig] = None) -> BacktestJob:
+        """Sinyal replay işi (portfolio verilirse ortak sermaye simülasyonu da)"""
+        return self.submit_job({
+            "kind": KIND_REPLAY,
+            "symbols": list(dict.fromkeys(s.upper() for s in symbols)),
+            "days": days,
+            "timeframe": timeframe,
+            "fear_greed": fear_greed,
+            "max_signals": max_signals,
+            "portfolio": asdict(portfolio) if portfolio else None,
+        })
+
+    def submit_job(self, params: Dict) -> BacktestJob:
+        """
+        İş oluştur (bekletmez).
+        Cache'te sonuç varsa iş 'done' olarak, aynı iş çalışıyorsa o iş döner.
+        """
+        version = data_version()
+        key = job_key(params, version)
+
+        job = self.inflight.get(key)
+        if job is not None:
+            return job
+
+        job = BacktestJob(id=secrets.token_hex(8), key=key, params=params, end_date=version)
+        self._remember(job)
+
+        cached = self._load_result(key)
+        if cached is not None:
+            job.status, job.cached, job.result = STATUS_DONE, True, cached
+            job.finished_at = job.created_at
+            return job
+
+        self.inflight[key] = job
+        self._ensure_workers()
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[BacktestJob]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job: BacktestJob) -> BacktestJob:
+        """İş bitene kadar bekle"""
+        while not job.finished:
+            await job._updated.wait()
+        return job
+
+    async def events(self, job: BacktestJob) -> AsyncIterator[Dict]:
+        """Her durum değişiminde job özeti (sonuç dahil son olay)"""
+        while True:
+            updated = job._updated
+            yield job.to_dict(include_result=job.finished)
+            if job.finished:
+                return
+            await updated.wait()
+
+    def _remember(self, job: BacktestJob):
+        self.jobs[job.id] = job
+        if len(self.jobs) <= MAX_JOBS:
+            return
+        # Eski bitmiş işleri temizle (çalışanlara dokunma)
+        cutoff = (datetime.utcnow() - timedelta(seconds=JOB_RETENTION)).isoformat()
+        for job_id, old in list(self.jobs.items()):
+            if len(self.jobs) <= MAX_JOBS:
+                break
+            if old.finished and (old.finished_at or "") < cutoff:
+                del self.jobs[job_id]
+
+    # ============================================
+    # RESULT CACHE
+    # ============================================
+
+    def _load_result(self, key: str) -> Optional[Dict]:
+        try:
+            raw = self.r.get(f"{RESULT_KEY_PREFIX}:{key}")
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            print(f"[BacktestJobs] Cache read error: {e}")
+            return None
+
+    def _store_result(self, key: str, result: Dict):
+        try:
+            self.r.set(f"{RESULT_KEY_PREFIX}:{key}", json.dumps(result), ex=RESULT_TTL)
+        except Exception as e:
+            print(f"[BacktestJobs] Cache write error: {e}")
+
+    # ============================================
+    # WORKERS
+    # ============================================
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _events(self, job: BacktestJob, start_date: datetime) -> AsyncIterator[Dict]:
+        params = job.params
+        if params["kind"] == KIND_REPLAY:
+            portfolio = params["portfolio"]
+            return stream_replay(
+                params["symbols"], start_date, job.end_date, params["timeframe"],
+                params["fear_greed"], params["max_signals"],
+                PortfolioConfig(**portfolio) if portfolio else None
+            )
+        if params["kind"] == KIND_SWEEP:
+            return stream_sweep(
+                params["symbols"], start_date, job.end_date, np.array(params["grid"]).reshape(-1, 3),
+                24, params["timeframe"], params["confidence"], params["category"],
+                params["sort_by"], params["top"]
+            )
+        if params["kind"] == KIND_COMPARE:
+            return self.engine.compare_timeframes(
+                params["symbols"], params["timeframes"], start_date, job.end_date, 24,
+                params["confidence"], params["category"]
+            )
+        return self.engine.stream_backtest(
+            params["symbols"], start_date, job.end_date, 24,
+            params["timeframe"], params["confidence"], params["category"]
+        )
+
+    @staticmethod
+    def _data_range(job: BacktestJob, start_date: datetime) -> Tuple[List[str], datetime]:
+        """Sonucun dayandığı semboller ve veri başlangıcı (cache'lenebilirlik kontrolü)"""
+        params = job.params
+        if params["kind"] == KIND_REPLAY:
+            # Replay indikatör geçmişi + BTC rejimi için daha eskiden okur
+            return [MARKET_SYMBOL, *params["symbols"]], start_date - timedelta(days=HISTORY_DAYS + 1)
+        return params["symbols"], start_date
+
+    async def _run(self, job: BacktestJob):
+        params = job.params
+        job.status = STATUS_RUNNING
+        job.total = len(params["symbols"])
+        job.notify()
+
+        try:
+            start_date = job.end_date - timedelta(days=params["days"])
+            result: Dict[str, Any] = {}
+            async for event in self._events(job, start_date):
+                if event["type"] == "progress":
+                    job.done = event["done"]
+                    job.total = event.get("total", job.total)
+                    job.notify()
+                else:
+                    result = event
+            result.pop("type", None)
+
+            symbols, data_start = self._data_range(job, start_date)
+            start_ms = int(data_start.timestamp() * 1000)
+            end_ms = int(job.end_date.timestamp() * 1000)
+            missing = [s for s in symbols if not store_covers(s, start_ms, end_ms)]
+            if missing:
+                print(f"[BacktestJobs] Job {job.id}: incomplete data for {len(missing)} symbols, not cached")
+            else:
+                self._store_result(job.key, result)
+            job.result = result
+            job.status = STATUS_DONE
+        except Exception as e:
+            print(f"[BacktestJobs] Job {job.id} failed: {e}")
+            job.status = STATUS_FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow().isoformat()
+            self.inflight.pop(job.key, None)
+            job.notify()
+
+
+# Singleton instance (API process)
+backtest_jobs = BacktestJobQueue(redis_client)
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Candle Aggregator
+================================
+WebSocket tick'lerinden çoklu çözünürlükte OHLC mumları üretir.
+
+- Her sembol/interval için sabit boyutlu, array-backed ring buffer
+- Kapanan mumlar Redis'e yayınlanır (candles:{interval}:{symbol} LIST)
+- Açık (henüz kapanmamış) mumlar candles_open:{interval} HASH'inde tutulur
+- Okuyucular get_recent_candles() ile REST'e gitmeden mum alır
+
+Mum formatı: {"timestamp": ms, "open", "high", "low", "close"}
+
+NOT: Ticker stream'i mum bazlı hacim vermez (24 saatlik rolling quote hacmi
+mumun işlem hacmi değildir, birimi de klines'taki base hacimden farklıdır).
+Bu yüzden mumlar hacim taşımaz; hacim gereken okuyucular candle store'u
+(Binance klines) kullanır.
+
+Worker başladıktan sonraki ilk mum interval ortasında açıldıysa (kısmi)
+yayınlanmaz. Worker kapalıyken kaybolan mumlar boşluk bırakır; okuyucular
+get_contiguous_candles() ile sadece kesintisiz ve güncel seriyi kullanır.
+"""
+
+import json
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# Interval -> süre (saniye)
+CANDLE_INTERVALS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+# Interval -> ring buffer kapasitesi (mum sayısı)
+CANDLE_RING_SIZES = {
+    "1m": 720,   # 12 saat
+    "5m": 576,   # 2 gün
+    "1h": 720,   # 30 gün
+    "1d": 365,   # 1 yıl
+}
+
+# Kapanmış mum: (open_time_ms, open, high, low, close)
+Candle = Tuple[int, float, float, float, float]
+
+
+def candle_key(symbol: str, interval: str) -> str:
+    """Redis anahtarı"""
+    return f"candles:{interval}:{symbol}"
+
+
+def open_candle_key(interval: str) -> str:
+    """Açık mumların Redis hash anahtarı (field = symbol)"""
+    return f"candles_open:{interval}"
+
+
+def candle_to_dict(candle: Candle) -> Dict:
+    """Tuple mumu OHLC dict formatına çevir"""
+    return {
+        "timestamp": candle[0],
+        "open": candle[1],
+        "high": candle[2],
+        "low": candle[3],
+        "close": candle[4],
+    }
+
+
+class CandleRing:
+    """Sabit boyutlu OHLC ring buffer (kolon başına bir array)"""
+
+    __slots__ = ("size", "open_time", "open", "high", "low", "close", "_head", "_count")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.open_time = array("q", bytes(8 * size))
+        self.open = array("d", bytes(8 * size))
+        self.high = array("d", bytes(8 * size))
+        self.low = array("d", bytes(8 * size))
+        self.close = array("d", bytes(8 * size))
+        self._head = 0   # Bir sonraki yazılacak slot
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, candle: Candle):
+        """Mumu ekle - doluysa en eskisinin üzerine yazar"""
+        i = self._head
+        (self.open_time[i], self.open[i], self.high[i],
+         self.low[i], self.close[i]) = candle[:5]
+        self._head = (i + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def last(self, n: Optional[int] = None) -> List[Candle]:
+        """Son n mum (eskiden yeniye)"""
+        n = self._count if n is None else min(n, self._count)
+        start = (self._head - n) % self.size
+        out = []
+        for k in range(n):
+            i = (start + k) % self.size
+            out.append((self.open_time[i], self.open[i], self.high[i],
+                        self.low[i], self.close[i]))
+        return out
+
+
+class _OpenCandle:
+    """Henüz kapanmamış mum"""
+
+    __slots__ = ("open_time", "open", "high", "low", "close", "partial")
+
+    def __init__(self, open_time: int, price: float, partial: bool = False):
+        self.open_time = open_time
+        self.open = self.high = self.low = self.close = price
+        self.partial = partial  # Interval başındaki tick'ler kaçırıldı
+
+    def as_tuple(self) -> Candle:
+        return (self.open_time, self.open, self.high, self.low, self.close)
+
+
+class CandleAggregator:
+    """Tick -> OHLC mum toplayıcı (process içi)"""
+
+    def __init__(self, intervals: Dict[str, int] = None, ring_sizes: Dict[str, int] = None):
+        self.intervals = intervals or CANDLE_INTERVALS
+        self.ring_sizes = ring_sizes or CANDLE_RING_SIZES
+        self.rings: Dict[str, Dict[str, CandleRing]] = {}
+        self.open_candles: Dict[str, Dict[str, _OpenCandle]] = {}
+        self.pending: List[Tuple[str, str, Candle]] = []  # Yayınlanmayı bekleyen kapanmış mumlar
+
+    def on_tick(self, symbol: str, price: float, ts_ms: int):
+        """Tek bir fiyat tick'ini tüm interval'lere uygula"""
+        if price <= 0:
+            return
+
+        open_by_interval = self.open_candles.get(symbol)
+        if open_by_interval is None:
+            open_by_interval = self.open_candles[symbol] = {}
+            self.rings[symbol] = {
+                iv: CandleRing(self.ring_sizes.get(iv, 500)) for iv in self.intervals
+            }
+
+        for interval, seconds in self.intervals.items():
+            bucket = ts_ms - ts_ms % (seconds * 1000)
+            candle = open_by_interval.get(interval)
+
+            if candle is None:
+                open_by_interval[interval] = _OpenCandle(bucket, price, partial=ts_ms > bucket)
+                continue
+
+            if bucket > candle.open_time:
+                # Interval sınırı geçildi - mumu kapat (kısmi ilk mum atılır)
+                if not candle.partial:
+                    closed = candle.as_tuple()
+                    self.rings[symbol][interval].append(closed)
+                    self.pending.append((symbol, interval, closed))
+                candle = open_by_interval[interval] = _OpenCandle(bucket, price)
+            elif bucket < candle.open_time:
+                # Geç gelen tick - kapanmış muma dokunma
+                continue
+
+            if price > candle.high:
+                candle.high = price
+            if price < candle.low:
+                candle.low = price
+            candle.close = price
+
+    def get_candles(self, symbol: str, interval: str, limit: Optional[int] = None,
+                    include_open: bool = False) -> List[Dict]:
+        """Sembolün mumları (eskiden yeniye)"""
+        ring = self.rings.get(symbol, {}).get(interval)
+        if ring is None:
+            return []
+        candles = ring.last(limit)
+        if include_open:
+            candle = self.open_candles[symbol].get(interval)
+            if candle is not None and not candle.partial:
+                candles.append(candle.as_tuple())
+                if limit is not None:
+                    candles = candles[-limit:]
+        return [candle_to_dict(c) for c in candles]
+
+    def get_open_candle(self, symbol: str, interval: str) -> Optional[Candle]:
+        """Sembolün henüz kapanmamış mumu (kısmi ilk mum dönmez)"""
+        candle = self.open_candles.get(symbol, {}).get(interval)
+        return candle.as_tuple() if candle is not None and not candle.partial else None
+
+    def drain_closed(self) -> List[Tuple[str, str, Candle]]:
+        """Yayınlanmamış kapanmış mumları al ve kuyruğu boşalt"""
+        closed, self.pending = self.pending, []
+        return closed
+
+
+def publish_closed_candles(client, closed: List[Tuple[str, str, Candle]],
+                           ring_sizes: Dict[str, int] = None) -> int:
+    """Kapanmış mumları Redis listelerine yaz (interval kapasitesi kadar tutulur)"""
+    if not closed:
+        return 0
+
+    ring_sizes = ring_sizes or CANDLE_RING_SIZES
+    pipe = client.pipeline(transaction=False)
+    trimmed = set()
+    for symbol, interval, candle in closed:
+        key = candle_key(symbol, interval)
+        pipe.rpush(key, json.dumps(candle))
+        trimmed.add((key, interval))
+    for key, interval in trimmed:
+        pipe.ltrim(key, -ring_sizes.get(interval, 500), -1)
+    pipe.execute()
+    return len(closed)
+
+
+def publish_open_candles(client, aggregator: CandleAggregator, symbols,
+                         intervals: Tuple[str, ...] = ("1h", "1d")) -> None:
+    """Verilen sembollerin açık mumlarını Redis hash'lerine yaz"""
+    pipe = client.pipeline(transaction=False)
+    for interval in intervals:
+        mapping = {}
+        for symbol in symbols:
+            candle = aggregator.get_open_candle(symbol, interval)
+            if candle is not None:
+                mapping[symbol] = json.dumps(candle)
+        if mapping:
+            pipe.hset(open_candle_key(interval), mapping=mapping)
+    pipe.execute()
+
+
+def get_recent_candles(client, symbol: str, interval: str, limit: int = 100,
+                       include_open: bool = False) -> List[Dict]:
+    """
+    Redis'ten son mumlar (eskiden yeniye)
+    include_open=True: Binance REST klines gibi son eleman açık mum olur
+    """
+    try:
+        if include_open:
+            pipe = client.pipeline(transaction=False)
+            pipe.lrange(candle_key(symbol, interval), -limit, -1)
+            pipe.hget(open_candle_key(interval), symbol)
+            raws, open_raw = pipe.execute()
+        else:
+            raws, open_raw = client.lrange(candle_key(symbol, interval), -limit, -1), None
+    except Exception:
+        return []
+
+    candles = [candle_to_dict(json.loads(raw)) for raw in raws]
+    if open_raw:
+        current = candle_to_dict(json.loads(open_raw))
+        if not candles or current["timestamp"] > candles[-1]["timestamp"]:
+            candles.append(current)
+            candles = candles[-limit:]
+    return candles
+
+
+def is_contiguous(candles: List[Dict], interval: str, now_ms: Optional[int] = None) -> bool:
+    """
+    Mumlar interval aralığıyla kesintisiz mi ve son mum güncel mi
+    (son mum şu anki ya da bir önceki interval'e ait olmalı)
+    """
+    if not candles:
+        return False
+    step = CANDLE_INTERVALS[interval] * 1000
+    times = [c["timestamp"] for c in candles]
+    if any(b - a != step for a, b in zip(times, times[1:])):
+        return False
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    return now_ms - times[-1] < 2 * step
+
+
+def get_contiguous_candles(client, symbol: str, interval: str, limit: int = 100,
+                           include_open: bool = False) -> List[Dict]:
+    """
+    get_recent_candles, ama seri boşluklu (worker kesintisi) veya eskiyse boş döner.
+    Çağıran bu durumda candle store / REST'e düşer.
+    """
+    candles = get_recent_candles(client, symbol, interval, limit, include_open)
+    return candles if is_contiguous(candles, interval) else []
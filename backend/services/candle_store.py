@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Candle Store
+===========================
+Kalıcı, append-only, memory-mapped OHLCV deposu.
+
+- Her sembol/interval için tek binary dosya: {CANDLE_STORE_DIR}/{interval}/{SYMBOL}.bin
+- Sabit genişlikli kayıt (48 byte): open_time(ms) + open/high/low/close/volume
+- Okumalar np.memmap üzerinden zero-copy (kolonlar: arr["close"] vs.)
+- Sadece kapanmış mumlar saklanır, son kayıttan sonrası artımlı çekilir
+- Binance 429/418 döndürürse BinanceRateLimited (Retry-After ile) yükselir;
+  çağıran provider cooldown'ını buna göre ayarlar
+- Yazıcılar (append / _prepend) ayrı bir {SYMBOL}.bin.lock dosyasında flock
+  alır; _prepend veri dosyasını os.replace ile değiştirdiği için kilit veri
+  dosyasının inode'una bağlanmaz
+
+Signal worker, AnalysisService ve BacktestEngine aynı depoyu paylaşır;
+worker restart'larında geçmiş veri yeniden indirilmez.
+"""
+
+import os
+import fcntl
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from config import CANDLE_STORE_DIR
+
+CANDLE_DTYPE = np.dtype([
+    ("open_time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+    "1w": 604_800_000,
+}
+
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+BINANCE_KLINES_LIMIT = 1000
+BINANCE_RATE_LIMIT_STATUSES = (418, 429)  # 418: rate limit sonrası IP ban
+BINANCE_DEFAULT_RETRY_AFTER = 60  # Retry-After başlığı yoksa (saniye)
+
+# _fetch_klines sonucu
+FETCH_OK = "ok"        # Veri geldi, sayfalama normal bitti
+FETCH_EMPTY = "empty"  # Binance 200 + boş liste: aralıkta veri yok
+FETCH_ERROR = "error"  # Bir sayfa 200 dönmedi, sonuç eksik olabilir
+
+EMPTY_CANDLES = np.zeros(0, dtype=CANDLE_DTYPE)
+
+
+class BinanceRateLimited(Exception):
+    """Binance 429/418 - retry_after saniye istek atılmamalı"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Binance rate limited, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def klines_to_array(raw_klines: List[list]) -> np.ndarray:
+    """Binance klines cevabını CANDLE_DTYPE array'ine çevir"""
+    arr = np.empty(len(raw_klines), dtype=CANDLE_DTYPE)
+    for i, k in enumerate(raw_klines):
+        arr[i] = (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+    return arr
+
+
+class CandleStore:
+    """Sembol/interval başına memory-mapped mum dosyaları"""
+
+    def __init__(self, base_dir: str = CANDLE_STORE_DIR):
+        self.base_dir = base_dir
+        self._maps: Dict[str, Tuple[int, np.ndarray]] = {}  # path -> (size, memmap)
+        self._history_start: Dict[str, int] = {}  # path -> daha eskisi olmayan start_ms (listeleme öncesi)
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.base_dir, interval, f"{symbol.upper()}.bin")
+
+    # ============================================
+    # READ
+    # ============================================
+
+    def read(self, symbol: str, interval: str) -> np.ndarray:
+        """Tüm mumlar (read-only memmap, zero-copy)"""
+        path = self._path(symbol, interval)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return EMPTY_CANDLES
+
+        count = size // CANDLE_DTYPE.itemsize  # Yarım yazılmış son kayıt yok sayılır
+        if count == 0:
+            return EMPTY_CANDLES
+
+        cached = self._maps.get(path)
+        if cached is None or cached[0] != size:
+            mm = np.memmap(path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))
+            cached = self._maps[path] = (size, mm)
+        return cached[1]
+
+    def read_range(self, symbol: str, interval: str,
+                   start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> np.ndarray:
+        """open_time aralığındaki mumlar [start_ms, end_ms] (view)"""
+        arr = self.read(symbol, interval)
+        if len(arr) == 0:
+            return arr
+        times = arr["open_time"]
+        lo = int(np.searchsorted(times, start_ms, side="left")) if start_ms is not None else 0
+        hi = int(np.searchsorted(times, end_ms, side="right")) if end_ms is not None else len(arr)
+        return arr[lo:hi]
+
+    def read_last(self, symbol: str, interval: str, limit: int) -> np.ndarray:
+        """Son 'limit' mum (view)"""
+        arr = self.read(symbol, interval)
+        return arr[-limit:] if limit else arr
+
+    def first_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        arr = self.read(symbol, interval)
+        return int(arr["open_time"][0]) if len(arr) else None
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        arr = self.read(symbol, interval)
+        return int(arr["open_time"][-1]) if len(arr) else None
+
+    # ============================================
+    # WRITE
+    # ============================================
+
+    @contextmanager
+    def _write_lock(self, path: str):
+        """Sembol/interval başına process'ler arası yazma kilidi"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_f:
+            fcntl.flock(lock_f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_file(path: str) -> np.ndarray:
+        """Dosyanın güncel içeriği (kilit altında, memmap cache'i kullanmadan)"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return EMPTY_CANDLES
+        usable = len(data) - len(data) % CANDLE_DTYPE.itemsize
+        return np.frombuffer(data[:usable], dtype=CANDLE_DTYPE)
+
+    def append(self, symbol: str, interval: str, candles: np.ndarray) -> int:
+        """
+        Son kayıttan yeni mumları dosyaya ekle.
+        Returns: eklenen mum sayısı
+        """
+        if len(candles) == 0:
+            return 0
+
+        path = self._path(symbol, interval)
+        with self._write_lock(path), open(path, "ab") as f:
+            # Kilit altında son timestamp'i tekrar oku (başka process yazmış olabilir)
+            size = f.seek(0, os.SEEK_END)
+            usable = size - size % CANDLE_DTYPE.itemsize
+            if usable != size:
+                f.truncate(usable)
+            last = None
+            if usable:
+                with open(path, "rb") as rf:
+                    rf.seek(usable - CANDLE_DTYPE.itemsize)
+                    last = int(np.frombuffer(rf.read(CANDLE_DTYPE.itemsize), dtype=CANDLE_DTYPE)["open_time"][0])
+
+            new = candles if last is None else candles[candles["open_time"] > last]
+            if len(new):
+                f.write(np.ascontiguousarray(new, dtype=CANDLE_DTYPE).tobytes())
+                f.flush()
+            return len(new)
+
+    def _prepend(self, symbol: str, interval: str, candles: np.ndarray) -> int:
+        """
+        İlk kayıttan eski mumları ekle (dosyayı atomik olarak yeniden yazar).
+        Okuma, kopya ve os.replace aynı kilit altında: eşzamanlı append kaybolmaz.
+        """
+        path = self._path(symbol, interval)
+        with self._write_lock(path):
+            existing = self._read_file(path)
+            first = int(existing["open_time"][0]) if len(existing) else None
+            older = candles if first is None else candles[candles["open_time"] < first]
+            if len(older) == 0:
+                return 0
+
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(np.ascontiguousarray(older, dtype=CANDLE_DTYPE).tobytes())
+                f.write(existing.tobytes())
+            os.replace(tmp_path, path)
+        self._maps.pop(path, None)
+        return len(older)
+
+    # ============================================
+    # INCREMENTAL BINANCE SYNC
+    # ============================================
+
+    async def _fetch_klines(self, client: httpx.AsyncClient, symbol: str, interval: str,
+                            start_ms: int, end_ms: Optional[int] = None) -> Tuple[np.ndarray, Optional[np.ndarray], str]:
+        """
+        start_ms'ten itibaren sayfalı kline çek.
+        Returns: (kapanmış mumlar, açık mum veya None, FETCH_OK / FETCH_EMPTY / FETCH_ERROR)
+        Raises: BinanceRateLimited (429/418)
+        """
+        now_ms = int(time.time() * 1000)
+        chunks = []
+        open_candle = None
+        cursor = start_ms
+        status = FETCH_EMPTY
+
+        while True:
+            params = {
+                "symbol": f"{symbol.upper()}USDT",
+                "interval": interval,
+                "startTime": cursor,
+                "limit": BINANCE_KLINES_LIMIT,
+            }
+            if end_ms is not None:
+                params["endTime"] = end_ms
+            resp = await client.get(BINANCE_KLINES_URL, params=params)
+            if resp.status_code in BINANCE_RATE_LIMIT_STATUSES:
+                try:
+                    retry_after = float(resp.headers.get("Retry-After", BINANCE_DEFAULT_RETRY_AFTER))
+                except ValueError:
+                    retry_after = BINANCE_DEFAULT_RETRY_AFTER
+                raise BinanceRateLimited(retry_after)
+            if resp.status_code != 200:
+                print(f"[CandleStore] {symbol} {interval} klines HTTP {resp.status_code}")
+                status = FETCH_ERROR
+                break
+            raw = resp.json()
+            if not raw:
+                break
+            status = FETCH_OK
+
+            # close_time geçmişte olanlar kapanmıştır
+            closed = [k for k in raw if int(k[6]) < now_ms]
+            if len(closed) < len(raw):
+                open_candle = klines_to_array(raw[len(closed):])
+            if closed:
+                chunks.append(klines_to_array(closed))
+
+            if len(raw) < BINANCE_KLINES_LIMIT or open_candle is not None:
+                break
+            cursor = int(raw[-1][0]) + 1
+
+        closed_arr = np.concatenate(chunks) if chunks else EMPTY_CANDLES
+        return closed_arr, open_candle, status
+
+    async def sync_binance(self, symbol: str, interval: str = "1d",
+                           start: Optional[datetime] = None,
+                           client: Optional[httpx.AsyncClient] = None) -> Optional[np.ndarray]:
+        """
+        Depoyu Binance'ten artımlı güncelle.
+        - Dosya boşsa: start'tan (yoksa 1000 mum geriden) itibaren çek
+        - start ilk kayıttan eskiyse: eksik baş kısmı doldur
+        - Sonra sadece son kayıttan sonraki mumları çek
+        Returns: açık (kapanmamış) son mum veya None
+        Raises: BinanceRateLimited (diğer hatalar loglanır, None döner)
+        """
+        step = INTERVAL_MS.get(interval, INTERVAL_MS["1d"])
+        now_ms = int(time.time() * 1000)
+        start_ms = int(start.timestamp() * 1000) if start else now_ms - step * BINANCE_KLINES_LIMIT
+
+        own_client = client is None
+        if own_client:
+            client = httpx.AsyncClient(timeout=30)
+
+        try:
+            path = self._path(symbol, interval)
+            first = self.first_timestamp(symbol, interval)
+            last = self.last_timestamp(symbol, interval)
+
+            if (first is not None and start_ms < first - step
+                    and start_ms < self._history_start.get(path, first)):
+                older, _, status = await self._fetch_klines(client, symbol, interval, start_ms, first - 1)
+                self._prepend(symbol, interval, older)
+                if status == FETCH_EMPTY:
+                    # Binance bu aralık için 200 + boş liste döndü: daha eski veri yok, tekrar sorma
+                    self._history_start[path] = start_ms
+
+            fetch_from = last + 1 if last is not None else start_ms
+            closed, open_candle, _ = await self._fetch_klines(client, symbol, interval, fetch_from)
+            self.append(symbol, interval, closed)
+            return open_candle
+        except BinanceRateLimited:
+            raise
+        except Exception as e:
+            print(f"[CandleStore] {symbol} {interval} sync error: {e}")
+            return None
+        finally:
+            if own_client:
+                await client.aclose()
+
+    async def get_klines(self, symbol: str, interval: str = "1d", limit: int = 90,
+                         client: Optional[httpx.AsyncClient] = None) -> np.ndarray:
+        """
+        Binance /klines gibi son 'limit' mum (son eleman açık mum).
+        Sadece son kayıttan sonrası ağdan çekilir.
+        """
+        step = INTERVAL_MS.get(interval, INTERVAL_MS["1d"])
+        start = datetime.fromtimestamp((time.time() * 1000 - step * limit) / 1000)
+        open_candle = await self.sync_binance(symbol, interval, start=start, client=client)
+
+        closed = self.read_last(symbol, interval, limit)
+        if open_candle is None or len(open_candle) == 0:
+            return closed
+        return np.concatenate([closed, open_candle])[-limit:]
+
+
+# Singleton instance
+candle_store = CandleStore()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Event Bus
+========================
+Worker'lar ile API arasında Redis Stream tabanlı olay akışı.
+
+Price worker her sync'te bir "tick" olayı (snapshot versiyonu + değişen
+semboller), legacy blob yazınca bir "snapshot" olayı ekler. Okuyucular
+anahtarları periyodik yoklamak yerine stream'de bloklanır:
+
+- API broadcaster: XREAD (her API process'i tüm olayları görür)
+- price alerts, signal tracker: consumer group (XREADGROUP + XACK);
+  restart sonrası onaylanmamış olaylar tekrar okunur, kayıp olmaz.
+  Tick'ler saniyede bir gelir; bu worker'lar değişen sembolleri
+  SymbolBatcher ile biriktirip en fazla birkaç saniyede bir DB turu yapar
+
+Olaylar sadece bildirimdir; fiyatların kendisi price store'dadır.
+Stream MAXLEN ile kırpılır, uzun süre kapalı kalan consumer'lar
+başlangıçta tam kontrol yapmalıdır.
+
+Redis anahtarları:
+- events:prices : STREAM  {type, version, symbols | name}
+"""
+
+import socket
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import redis
+
+from database import redis_client
+
+PRICES_STREAM = "events:prices"
+STREAM_MAXLEN = 3600         # ~1 saat (saniyede bir tick), yaklaşık kırpma
+
+EVENT_TICK = "tick"
+EVENT_SNAPSHOT = "snapshot"
+
+
+def _parse(entry_id: str, fields: Dict) -> Dict:
+    event = {"id": entry_id, "type": fields.get("type"), "version": int(fields.get("version") or 0)}
+    if event["type"] == EVENT_TICK:
+        symbols = fields.get("symbols")
+        event["symbols"] = symbols.split(",") if symbols else []
+    else:
+        event["name"] = fields.get("name")
+    return event
+
+
+def changed_symbols(events: Iterable[Dict]) -> Set[str]:
+    """Tick olaylarındaki değişen sembollerin birleşimi"""
+    symbols: Set[str] = set()
+    for event in events:
+        if event["type"] == EVENT_TICK:
+            symbols.update(event["symbols"])
+    return symbols
+
+
+class SymbolBatcher:
+    """
+    Tick'lerdeki değişen sembolleri biriktirir, en fazla 'interval' saniyede
+    bir toplu teslim eder (her tick'te DB turu yapılmaz).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.pending: Set[str] = set()
+        self._last = float("-inf")
+
+    def add(self, events: Iterable[Dict]):
+        self.pending.update(changed_symbols(events))
+
+    def block_ms(self, default_ms: int) -> int:
+        """Sonraki okumanın bloklanma süresi (bekleyen sembol varsa teslim zamanına kadar)"""
+        if not self.pending:
+            return default_ms
+        remaining = self._last + self.interval - time.monotonic()
+        return max(1, min(default_ms, int(remaining * 1000)))
+
+    def take(self) -> Set[str]:
+        """Teslim zamanı geldiyse biriken semboller (yoksa boş küme)"""
+        now = time.monotonic()
+        if not self.pending or now - self._last < self.interval:
+            return set()
+        symbols, self.pending = self.pending, set()
+        self._last = now
+        return symbols
+
+
+class EventBus:
+    """Tek stream üzerinde yayın / okuma"""
+
+    def __init__(self, client, stream: str = PRICES_STREAM):
+        self.r = client
+        self.stream = stream
+
+    # ============================================
+    # PRODUCER (price worker)
+    # ============================================
+
+    def publish_tick(self, version: int, symbols: Iterable[str]) -> str:
+        """Yeni price store versiyonu ve değişen semboller"""
+        return self.r.xadd(
+            self.stream,
+            {"type": EVENT_TICK, "version": str(version), "symbols": ",".join(symbols)},
+            maxlen=STREAM_MAXLEN, approximate=True
+        )
+
+    def publish_snapshot(self, name: str, version) -> str:
+        """Blob snapshot'ı (ör. prices_data) yeni versiyonla yazıldı"""
+        return self.r.xadd(
+            self.stream,
+            {"type": EVENT_SNAPSHOT, "name": name, "version": str(version)},
+            maxlen=STREAM_MAXLEN, approximate=True
+        )
+
+    # ============================================
+    # BROADCAST READER (API)
+    # ============================================
+
+    def last_id(self) -> str:
+        """Stream'deki son olayın id'si (boşsa 0-0)"""
+        entries = self.r.xrevrange(self.stream, count=1)
+        return entries[0][0] if entries else "0-0"
+
+    def read(self, last_id: str, block_ms: int = 5000, count: int = 500) -> Tuple[str, List[Dict]]:
+        """
+        last_id'den sonraki olaylar (yoksa block_ms kadar bekler).
+        Returns: (yeni last_id, olaylar)
+        """
+        response = self.r.xread({self.stream: last_id}, count=count, block=block_ms)
+        if not response:
+            return last_id, []
+        entries = response[0][1]
+        return entries[-1][0], [_parse(entry_id, fields) for entry_id, fields in entries]
+
+
+class GroupReader:
+    """
+    Consumer group okuyucusu.
+    İlk okumalarda bu consumer'ın onaylanmamış (PEL) olayları döner,
+    bitince yeni olaylar beklenir. İşlenen olaylar ack() ile onaylanmalı.
+    """
+
+    def __init__(self, bus: EventBus, group: str, consumer: Optional[str] = None):
+        self.bus = bus
+        self.group = group
+        self.consumer = consumer or socket.gethostname()  # Sabit isim: restart'ta PEL devralınır
+        self._replay_pending = True
+        self._ensure_group()
+
+    def _ensure_group(self):
+        try:
+            # Yeni grup sadece bundan sonraki olayları görür (geçmiş tam kontrolle kapsanır)
+            self.bus.r.xgroup_create(self.bus.stream, self.group, id="$", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _read(self, start: str, block_ms: Optional[int], count: int) -> List[Dict]:
+        response = self.bus.r.xreadgroup(
+            self.group, self.consumer, {self.bus.stream: start}, count=count, block=block_ms
+        )
+        if not response:
+            return []
+        entries = response[0][1]
+        # MAXLEN ile kırpılmış PEL kayıtları (fields boş) onaylanıp atlanır
+        trimmed = [entry_id for entry_id, fields in entries if not fields]
+        if trimmed:
+            self.bus.r.xack(self.bus.stream, self.group, *trimmed)
+        return [_parse(entry_id, fields) for entry_id, fields in entries if fields]
+
+    def read(self, block_ms: int = 5000, count: int = 500) -> List[Dict]:
+        if self._replay_pending:
+            events = self._read("0", None, count)
+            if events:
+                return events
+            self._replay_pending = False
+        try:
+            return self._read(">", block_ms, count)
+        except redis.ResponseError as e:
+            # Stream/grup silinmiş (ör. FLUSHALL) - yeniden oluştur
+            if "NOGROUP" not in str(e):
+                raise
+            self._ensure_group()
+            return []
+
+    def ack(self, events: List[Dict]):
+        if events:
+            self.bus.r.xack(self.bus.stream, self.group, *(e["id"] for e in events))
+
+
+# Singleton instance (API process)
+event_bus = EventBus(redis_client)
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Exit Multiplier Sweep
+====================================
+SL / TP / trailing çarpanlarını grid üzerinde tarayıp sıralı tablo döner.
+
+Backtest engine ile aynı kurallar (calculate_exit_levels: ATR% clamp,
+kategori + timeframe çarpanları, timeframe limitleri, min 1:2 R:R) ama:
+- Her sembol bir kez yüklenir; giriş pencereleri, giriş fiyatları ve
+  ATR% dizileri bir kez hesaplanır
+- Tüm kombinasyonların seviyeleri tek numpy işlemiyle üretilir ve
+  (kombinasyon x giriş) satırları tek find_exits çağrısına verilir
+- Metrikler (profit factor, max drawdown, win rate) kombinasyon
+  ekseninde vektörel hesaplanır
+
+Grid'deki sl_mult / tp_mult, get_confidence_multipliers'ın yerini alır;
+trail_ratio trailing stop mesafesinin SL mesafesine oranıdır (üretimde 0.8).
+Sadece long (BUY) girişler simüle edilir - run_backtest ile aynı.
+"""
+
+import asyncio
+from datetime import datetime
+from itertools import product
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.analysis_service import (
+    get_confidence_multipliers,
+    get_category_adjustments,
+    get_timeframe_multipliers
+)
+from services.backtest_engine import (
+    BACKTEST_INTERVAL,
+    ENTRY_LOOKAHEAD,
+    ENTRY_LOOKBACK,
+    KlineSeries,
+    BacktestEngine,
+    entry_schedule,
+    find_exits,
+    run_off_loop,
+)
+from services.candle_store import candle_store
+
+DEFAULT_SL_MULTS = (1.5, 1.8, 2.0, 2.5, 3.0)
+DEFAULT_TP_MULTS = (1.5, 2.0, 2.2, 2.5, 3.0)
+DEFAULT_TRAIL_RATIOS = (0.6, 0.8, 1.0)
+PRODUCTION_TRAIL_RATIO = 0.8
+MAX_COMBOS = 500
+ATR_PERIOD = 14
+MIN_RR_RATIO = 2.0
+
+SORT_KEYS = ("profit_factor", "total_return_pct", "win_rate", "max_drawdown")
+CODE_INCOMPLETE = 4
+WIN_CODES = (1, 2)  # TRAILING_STOP, TAKE_PROFIT (summary success_rate ile aynı)
+
+
+def make_grid(
+    sl_mults: Sequence[float] = DEFAULT_SL_MULTS,
+    tp_mults: Sequence[float] = DEFAULT_TP_MULTS,
+    trail_ratios: Sequence[float] = DEFAULT_TRAIL_RATIOS,
+    include: Optional[Tuple[float, float, float]] = None
+) -> np.ndarray:
+    """(combos, 3) dizisi: sl_mult, tp_mult, trail_ratio (include eksikse eklenir)"""
+    combos = list(dict.fromkeys(product(sl_mults, tp_mults, trail_ratios)))
+    if include is not None and include not in combos:
+        combos.append(include)
+    if len(combos) > MAX_COMBOS:
+        raise ValueError(f"Grid too large: {len(combos)} > {MAX_COMBOS}")
+    return np.array(combos, dtype=np.float64).reshape(-1, 3)
+
+
+def entry_atr_percent(series: KlineSeries, lo: np.ndarray, entry: np.ndarray,
+                      entry_prices: np.ndarray) -> np.ndarray:
+    """
+    simulate_entries ile aynı ATR: girişten önceki 14 true range ortalaması
+    (pencerede 15 mum yoksa / ATR 0 ise fiyatın %2'si), % olarak [1.5, 10].
+    """
+    high, low, close = series.high, series.low, series.close
+    prev_close = np.r_[close[:1], close[:-1]]
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    atr = np.zeros(len(entry))
+    has_history = entry - (ATR_PERIOD + 1) >= lo
+    if len(tr) >= ATR_PERIOD and has_history.any():
+        windows = sliding_window_view(tr, ATR_PERIOD)
+        atr[has_history] = windows[entry[has_history] - ATR_PERIOD].sum(axis=1) / ATR_PERIOD
+    atr = np.where(atr == 0, entry_prices * 0.02, atr)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        atr_percent = np.where(entry_prices > 0, atr / entry_prices * 100, 3.0)
+    return np.clip(atr_percent, 1.5, 10.0)
+
+
+def exit_levels(
+    entry_prices: np.ndarray,
+    atr_percent: np.ndarray,
+    grid: np.ndarray,
+    timeframe: str = "1d",
+    category: str = "ALT"
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    calculate_exit_levels'ın (long) vektörel hali.
+    Returns: (stop_loss, take_profit, trailing_stop) - her biri (combos, entries)
+    """
+    cat_sl_adj, cat_tp_adj = get_category_adjustments(category)
+    tf_sl_mult, tf_tp_mult, _ = get_timeframe_multipliers(timeframe)
+
+    sl_mult = grid[:, 0:1] * cat_sl_adj * tf_sl_mult
+    tp_mult = grid[:, 1:2] * cat_tp_adj * tf_tp_mult
+    trail_ratio = grid[:, 2:3]
+
+    stop_loss_pct = atr_percent * sl_mult
+    take_profit_pct = atr_percent * tp_mult
+    if timeframe == "1d":
+        stop_loss_pct = np.clip(stop_loss_pct, 1.0, 8.0)
+        take_profit_pct = np.clip(take_profit_pct, 2.0, 20.0)
+    elif timeframe == "1w":
+        stop_loss_pct = np.clip(stop_loss_pct, 3.0, 15.0)
+        take_profit_pct = np.clip(take_profit_pct, 6.0, 35.0)
+    take_profit_pct = np.maximum(take_profit_pct, stop_loss_pct * MIN_RR_RATIO)
+
+    stop_loss = np.round(entry_prices * (1 - stop_loss_pct / 100), 8)
+    take_profit = np.round(entry_prices * (1 + take_profit_pct / 100), 8)
+    trailing_stop = np.round(entry_prices * (1 - stop_loss_pct * trail_ratio / 100), 8)
+    return stop_loss, take_profit, trailing_stop
+
+
+def sweep_series(
+    series: KlineSeries,
+    entry_dates: List[datetime],
+    grid: np.ndarray,
+    timeframe: str = "1d",
+    category: str = "ALT"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bir sembolün tüm girişleri x tüm kombinasyonlar.
+    Returns: (profit_loss_pct, reason_code) - (combos, entries); INCOMPLETE
+    girişler kodla işaretlenir, metriklerde sayılmaz.
+    """
+    combos = len(grid)
+    if not entry_dates or not len(series):
+        return np.zeros((combos, 0)), np.zeros((combos, 0), dtype=np.int8)
+
+    lo, hi, entry = series.entry_windows(entry_dates)
+    usable = (hi - lo >= 20) & (entry < hi)
+    lo, hi, entry = lo[usable], hi[usable], entry[usable]
+    count = len(entry)
+    if not count:
+        return np.zeros((combos, 0)), np.zeros((combos, 0), dtype=np.int8)
+
+    prices = series.open[entry]
+    atr_percent = entry_atr_percent(series, lo, entry, prices)
+    stops, targets, trails = exit_levels(prices, atr_percent, grid, timeframe, category)
+
+    # (combos x entries) satırları tek find_exits çağrısında
+    tiled_prices = np.tile(prices, combos)
+    _, exit_prices, reasons = find_exits(
+        series.high, series.low, series.close,
+        np.tile(entry, combos), np.tile(hi, combos),
+        tiled_prices, stops.ravel(), targets.ravel(), trails.ravel(),
+        np.ones(combos * count, dtype=bool)
+    )
+    profit_loss_pct = np.round((exit_prices - tiled_prices) / tiled_prices * 100, 2)
+    return profit_loss_pct.reshape(combos, count), reasons.reshape(combos, count)
+
+
+def sweep_task(
+    symbol: str,
+    start_ms: int,
+    end_ms: int,
+    entry_dates: List[datetime],
+    grid: np.ndarray,
+    timeframe: str,
+    category: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pool worker: memory-mapped candle store'dan oku, sembolü tara"""
+    candles = candle_store.read_range(symbol, BACKTEST_INTERVAL, start_ms, end_ms)
+    series = KlineSeries(symbol, BACKTEST_INTERVAL, candles, start_ms, end_ms)
+    return sweep_series(series, entry_dates, grid, timeframe, category)
+
+
+def grid_metrics(profit_loss_pct: np.ndarray, reasons: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    calculate_summary metrikleri, kombinasyon başına (satır = kombinasyon).
+    Sıra: sembol sırası, sonra giriş tarihi (run_backtest results ile aynı).
+    """
+    counted = reasons != CODE_INCOMPLETE
+    pnl = np.where(counted, profit_loss_pct, 0.0)
+    trades = counted.sum(axis=1)
+    wins = (np.isin(reasons, WIN_CODES) & counted).sum(axis=1)
+
+    gross_profit = np.where(pnl > 0, pnl, 0).sum(axis=1)
+    gross_loss = -np.where(pnl < 0, pnl, 0).sum(axis=1)
+    gross_loss = np.where((pnl < 0).any(axis=1), gross_loss, 1.0)
+
+    equity = np.cumprod(1 + pnl / 100, axis=1)
+    if equity.shape[1]:
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+        max_drawdown = ((peak - equity) / peak * 100).max(axis=1)
+        total_return = (equity[:, -1] - 1) * 100
+    else:
+        max_drawdown = total_return = np.zeros(len(pnl))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(trades > 0, wins / trades * 100, 0.0)
+        profit_factor = np.where(gross_loss > 0, gross_profit / gross_loss, 0.0)
+
+    return {
+        "trades": trades,
+        "win_rate": np.round(win_rate, 1),
+        "profit_factor": np.round(profit_factor, 2),
+        "max_drawdown": np.round(max_drawdown, 2),
+        "total_return_pct": np.round(total_return, 2),
+    }
+
+
+def rank_grid(grid: np.ndarray, metrics: Dict[str, np.ndarray], sort_by: str = "profit_factor",
+              min_trades: int = 1) -> List[Dict]:
+    """Sıralı tablo (max_drawdown küçükten büyüğe, diğerleri büyükten küçüğe)"""
+    rows = []
+    for i, (sl_mult, tp_mult, trail_ratio) in enumerate(grid.tolist()):
+        if metrics["trades"][i] < min_trades:
+            continue
+        rows.append({
+            "sl_mult": sl_mult,
+            "tp_mult": tp_mult,
+            "trail_ratio": trail_ratio,
+            **{name: values[i].item() for name, values in metrics.items()},
+        })
+    rows.sort(key=lambda row: row[sort_by], reverse=sort_by != "max_drawdown")
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+async def stream_sweep(
+    symbols: List[str],
+    start_date: datetime,
+    end_date: datetime,
+    grid: np.ndarray,
+    signal_frequency_hours: int = 24,
+    timeframe: str = "1d",
+    confidence: int = 75,
+    category: str = "ALT",
+    sort_by: str = "profit_factor",
+    top: int = 50
+) -> AsyncIterator[Dict]:
+    """
+    Her sembol bitince "progress", sonunda sıralı tabloyla "result" olayı.
+    Semboller engine pool'unda (veya thread'de) paralel taranır.
+    """
+    range_start = start_date - ENTRY_LOOKBACK
+    range_end = end_date + ENTRY_LOOKAHEAD
+    await BacktestEngine().preload(symbols, range_start, range_end)
+
+    start_ms = int(range_start.timestamp() * 1000)
+    end_ms = int(range_end.timestamp() * 1000)
+    entry_dates = entry_schedule(start_date, end_date, signal_frequency_hours)
+
+    async def run(symbol: str):
+        try:
+            matrices = await run_off_loop(
+                sweep_task, symbol, start_ms, end_ms, entry_dates, grid, timeframe, category
+            )
+        except Exception as e:
+            print(f"[Sweep] {symbol} error: {e}")
+            matrices = None
+        return symbol, matrices
+
+    by_symbol = {}
+    for finished in asyncio.as_completed([run(symbol) for symbol in symbols]):
+        symbol, matrices = await finished
+        by_symbol[symbol] = matrices
+        yield {"type": "progress", "done": len(by_symbol), "total": len(symbols), "symbol": symbol}
+
+    parts = [by_symbol[s] for s in symbols if by_symbol.get(s) is not None]
+    if parts:
+        profit_loss_pct = np.hstack([p for p, _ in parts])
+        reasons = np.hstack([r for _, r in parts])
+    else:
+        profit_loss_pct, reasons = np.zeros((len(grid), 0)), np.zeros((len(grid), 0), dtype=np.int8)
+    table = rank_grid(grid, grid_metrics(profit_loss_pct, reasons), sort_by)
+
+    sl_mult, tp_mult = get_confidence_multipliers(confidence)
+    baseline = next(
+        (row for row in table
+         if (row["sl_mult"], row["tp_mult"], row["trail_ratio"]) == (sl_mult, tp_mult, PRODUCTION_TRAIL_RATIO)),
+        None
+    )
+    yield {
+        "type": "result",
+        "table": table[:top],
+        "combos": len(grid),
+        "baseline": baseline,
+        "config": {
+            "symbols": symbols,
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+            "timeframe": timeframe,
+            "confidence": confidence,
+            "category": category,
+            "sort_by": sort_by,
+        },
+    }
@@ -11,6 +11,7 @@ from typing import Optional, Dict, List
 from datetime import datetime, timedelta
 
 from database import redis_client
+from services.snapshot_cache import snapshot_cache
 
 # Binance Futures symbol mapping
 FUTURES_SYMBOLS = {
@@ -151,11 +152,7 @@ class FuturesService:
         
         # Redis'den dene
         try:
-            futures_raw = redis_client.get("futures_data")
-            if futures_raw:
-                import json
-                all_futures = json.loads(futures_raw)
-                return all_futures.get(symbol)
+            return snapshot_cache.get("futures_data").get(symbol)
         except:
             pass
         
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Vectorized Indicator Engine
+==========================================
+Tüm coin evreni için teknik indikatörleri tek seferde hesaplar.
+
+- Girdi: (coin x gün) kapanış matrisi, sağa hizalı (eksik geçmiş NaN ile doldurulur)
+- Çıktı: her indikatör için coin boyutunda numpy array (hesaplanamayan = NaN)
+
+Formüller AnalysisService._calculate_indicators ile birebir aynıdır:
+- RSI: son 14 değişimin basit ortalaması
+- EMA: ilk fiyatla başlatılır (MACD sadece çizgi)
+- Bollinger: popülasyon standart sapması
+- ATR: close-only proxy (son 19 getirinin ortalaması)
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# change_365d için en az 366 kolon
+MIN_MATRIX_WIDTH = 366
+
+CHANGE_PERIODS = (1, 7, 30, 90, 365)
+MA_PERIODS = (20, 50, 200)
+EMA_PERIODS = (12, 26)
+VOLATILITY_PERIODS = (7, 30)
+
+
+def build_close_matrix(series_list: Sequence[List]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    [[timestamp, price], ...] listelerinden sağa hizalı kapanış matrisi.
+    Returns: (close[coins, days], lengths[coins])
+    """
+    lengths = np.array([len(s) for s in series_list], dtype=np.int64)
+    width = max(int(lengths.max()) if len(lengths) else 0, MIN_MATRIX_WIDTH)
+    close = np.full((len(series_list), width), np.nan)
+    for i, series in enumerate(series_list):
+        if series:
+            close[i, width - len(series):] = [p[1] for p in series]
+    return close, lengths
+
+
+def _ema(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """
+    İlk fiyatla başlatılan EMA - tüm coinler ve periyotlar için tek geçiş.
+    Returns: [len(periods), coins]
+    """
+    multipliers = np.array([2 / (p + 1) for p in periods])[:, None]
+    keep = 1 - multipliers
+    ema = np.full((len(periods), close.shape[0]), np.nan)
+    for t in range(close.shape[1]):
+        col = close[:, t]
+        ema = np.where(np.isnan(ema), col, (col * multipliers) + (ema * keep))
+    return ema
+
+
+def _volatility(close: np.ndarray, days: int) -> np.ndarray:
+    """Son 'days' fiyattaki günlük getirilerin popülasyon std'si (%)"""
+    recent = close[:, -days:]
+    prev, curr = recent[:, :-1], recent[:, 1:]
+    valid = prev > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.where(valid, (curr - prev) / prev * 100, 0.0)
+        count = valid.sum(axis=1)
+        avg = returns.sum(axis=1) / count
+        variance = np.where(valid, (returns - avg[:, None]) ** 2, 0.0).sum(axis=1) / count
+    return np.where(count > 0, variance ** 0.5, np.nan)
+
+
+def compute_indicators(close: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Tüm indikatörleri vektörel hesapla.
+    Yetersiz geçmişi olan coinler için değer NaN'dır.
+    """
+    current = close[:, -1]
+    out: Dict[str, np.ndarray] = {"current_price": current}
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Fiyat değişimleri
+        for days in CHANGE_PERIODS:
+            old = close[:, -(days + 1)]
+            change = np.where(old > 0, (current - old) / old * 100, 0.0)
+            out[f"change_{days}d"] = np.where(lengths > days, change, np.nan)
+
+        # RSI (14) - basit ortalama
+        diffs = close[:, -14:] - close[:, -15:-1]
+        avg_gain = np.where(diffs > 0, diffs, 0.0).sum(axis=1) / 14
+        avg_loss = np.where(diffs > 0, 0.0, -diffs).sum(axis=1) / 14
+        rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+        out["rsi"] = np.where(lengths >= 15, rsi, np.nan)
+
+        # Hareketli ortalamalar
+        for period in MA_PERIODS:
+            ma = close[:, -period:].sum(axis=1) / period
+            out[f"ma_{period}"] = np.where(lengths >= period, ma, np.nan)
+
+        # MACD çizgisi
+        ema = _ema(close, EMA_PERIODS)
+        ema_12 = np.where(lengths >= 12, ema[0], np.nan)
+        ema_26 = np.where(lengths >= 26, ema[1], np.nan)
+        valid_macd = (ema_12 != 0) & (ema_26 != 0)
+        out["macd"] = np.where(valid_macd, ema_12 - ema_26, np.nan)
+
+        # Bollinger (20, 2)
+        window = close[:, -20:]
+        sma = window.sum(axis=1) / 20
+        std = (((window - sma[:, None]) ** 2).sum(axis=1) / 20) ** 0.5
+        upper, lower = sma + 2 * std, sma - 2 * std
+        width = upper - lower
+        position = np.where(width > 0, (current - lower) / width * 100, 50.0)
+        has_bb = lengths >= 20
+        out["bb_upper"] = np.where(has_bb, upper, np.nan)
+        out["bb_middle"] = np.where(has_bb, sma, np.nan)
+        out["bb_lower"] = np.where(has_bb, lower, np.nan)
+        out["bb_position"] = np.where(has_bb, position, np.nan)
+
+        # Volatilite
+        for days in VOLATILITY_PERIODS:
+            out[f"volatility_{days}d"] = np.where(lengths >= days, _volatility(close, days), np.nan)
+
+        # ATR proxy (son 19 günlük mutlak getiri)
+        recent = close[:, -20:]
+        prev, curr = recent[:, :-1], recent[:, 1:]
+        valid = prev > 0
+        daily_range = np.where(valid, np.abs(curr - prev) / prev, 0.0)
+        count = valid.sum(axis=1)
+        avg_range = daily_range.sum(axis=1) / count
+        has_atr = (lengths >= 15) & (count > 0)
+        out["atr"] = np.where(has_atr, avg_range * current, np.nan)
+        out["atr_percent"] = np.where(has_atr, avg_range * 100, np.nan)
+
+    return out
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Streaming Indicator State
+========================================
+Sembol/timeframe başına artımlı (streaming) indikatör durumu.
+
+- Yeni mum: append, açık mum güncellemesi: revise - ikisi de O(1)
+- EMA-12/26 kayan pencere üzerinde O(1) güncellenir
+  (pencere başındaki tohum fiyat düşerken düzeltme terimi eklenir)
+- MA-50/200 kayan toplamlarla, kısa pencereler (RSI 14, BB 20,
+  volatilite 30, ATR 19) sabit boyutlu kuyruk üzerinden hesaplanır
+- to_dict()/from_dict() ile JSON olarak Redis'te saklanır
+
+Pencere içeriği aynı olduğunda çıktı, fiyat listesinden sıfırdan
+hesaplananla aynıdır (basit ortalamalı RSI, ilk fiyatla başlatılan EMA,
+popülasyon std'li Bollinger, close-only ATR proxy).
+"""
+
+import json
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_WINDOW = 90
+EMA_PERIODS = (12, 26)
+ROLLING_MA_PERIODS = (50, 200)
+TAIL_SIZE = 31            # En uzun kısa pencere: volatility_30d (30 fiyat) + 1
+RESYNC_EVERY = 1000       # Kayan toplam/EMA float sapmasını sıfırlama aralığı
+
+STATE_KEY_PREFIX = "indicator_state"
+
+
+def state_key(timeframe: str) -> str:
+    """Redis hash anahtarı (field = symbol)"""
+    return f"{STATE_KEY_PREFIX}:{timeframe}"
+
+
+class IndicatorState:
+    """Tek sembol/timeframe için kayan pencere indikatör durumu"""
+
+    __slots__ = ("window", "closes", "last_ts", "ema", "ema_base", "ma_sums", "_updates")
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = max(int(window), 1)
+        self.closes: deque = deque(maxlen=self.window)
+        self.last_ts: Optional[int] = None
+        self.ema: Dict[int, Optional[float]] = {p: None for p in EMA_PERIODS}
+        self.ema_base: Dict[int, float] = {p: 0.0 for p in EMA_PERIODS}  # ema - m * son fiyat
+        self.ma_sums: Dict[int, float] = {p: 0.0 for p in ROLLING_MA_PERIODS}
+        self._updates = 0
+
+    @classmethod
+    def from_prices(cls, prices: List, window: Optional[int] = None) -> "IndicatorState":
+        """[[timestamp, price], ...] listesinden durum oluştur (pencere = liste uzunluğu)"""
+        state = cls(window or len(prices) or DEFAULT_WINDOW)
+        for point in prices:
+            state.update(int(point[0]), float(point[1]))
+        return state
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    # ============================================
+    # UPDATE
+    # ============================================
+
+    def update(self, timestamp: int, close: float) -> bool:
+        """
+        Mum kapanışı uygula.
+        - Yeni timestamp: pencereye ekle (doluysa en eski düşer)
+        - Aynı timestamp: son mumu revize et (açık mum)
+        - Eski timestamp: yok say
+        Returns: durum değişti mi
+        """
+        if self.last_ts is not None and self.closes:
+            if timestamp < self.last_ts:
+                return False
+            if timestamp == self.last_ts:
+                self._revise_last(close)
+                return True
+
+        self._append(close)
+        self.last_ts = timestamp
+        self._updates += 1
+        if self._updates % RESYNC_EVERY == 0:
+            self._resync()
+        return True
+
+    def update_series(self, prices: List) -> bool:
+        """
+        Yeni fiyat serisini uygula (sadece son mumdan itibarenki noktalar).
+        Seri pencereyle örtüşmüyorsa (boşluk, farklı hizalama) False döner,
+        bu durumda çağıran from_prices() ile yeniden oluşturmalı.
+        """
+        if not prices or self.last_ts is None:
+            return False
+        if int(prices[0][0]) > self.last_ts:
+            return False  # Arada kaçırılmış mumlar var
+
+        # Sondan geriye: sadece son mumdan itibarenki noktalar (O(yeni mum))
+        start = len(prices)
+        while start > 0 and int(prices[start - 1][0]) >= self.last_ts:
+            start -= 1
+        for point in prices[start:]:
+            self.update(int(point[0]), float(point[1]))
+
+        # Pencere, serinin son 'window' noktasıyla hizalı olmalı
+        expected = prices[-self.window:]
+        return (len(self.closes) == len(expected)
+                and self.closes[0] == float(expected[0][1])
+                and self.closes[-1] == float(expected[-1][1]))
+
+    def _append(self, close: float):
+        closes = self.closes
+        n = len(closes)
+        full = n == self.window
+        dropped = closes[0] if full else None
+
+        for p in ROLLING_MA_PERIODS:
+            if n >= p:
+                self.ma_sums[p] -= closes[-p]
+            elif full:
+                self.ma_sums[p] -= dropped
+            self.ma_sums[p] += close
+
+        closes.append(close)
+
+        for p in EMA_PERIODS:
+            m = 2 / (p + 1)
+            ema = self.ema[p]
+            if ema is None:
+                self.ema[p] = close
+                continue
+            base = ema * (1 - m)
+            if full:
+                # Düşen tohum fiyatın ağırlığını yeni ilk fiyata devret
+                base += (1 - m) ** self.window * (closes[0] - dropped)
+            self.ema_base[p] = base
+            self.ema[p] = (close * m) + base
+
+    def _revise_last(self, close: float):
+        closes = self.closes
+        old = closes[-1]
+        closes[-1] = close
+
+        for p in ROLLING_MA_PERIODS:
+            self.ma_sums[p] += close - old
+
+        for p in EMA_PERIODS:
+            if len(closes) == 1:
+                self.ema[p] = close
+            else:
+                self.ema[p] = (close * (2 / (p + 1))) + self.ema_base[p]
+
+    def _resync(self):
+        """Kayan toplamları ve EMA'yı pencereden yeniden hesapla (amortize O(1))"""
+        closes = list(self.closes)
+        for p in ROLLING_MA_PERIODS:
+            self.ma_sums[p] = sum(closes[-p:])
+        for p in EMA_PERIODS:
+            m = 2 / (p + 1)
+            ema = closes[0]
+            base = 0.0
+            for price in closes[1:]:
+                base = ema * (1 - m)
+                ema = (price * m) + base
+            self.ema[p] = ema
+            self.ema_base[p] = base
+
+    # ============================================
+    # SNAPSHOT
+    # ============================================
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """
+        Ham indikatör değerleri (hesaplanamayan = None).
+        Anahtarlar indicator_engine.compute_indicators ile aynıdır.
+        """
+        closes = self.closes
+        n = len(closes)
+        current = closes[-1] if n else 0
+        tail = list(islice(closes, max(n - TAIL_SIZE, 0), n))
+
+        out: Dict[str, Optional[float]] = {"current_price": current}
+
+        for days in (1, 7, 30, 90, 365):
+            if n > days:
+                old = closes[-(days + 1)]
+                out[f"change_{days}d"] = ((current - old) / old * 100) if old > 0 else 0
+            else:
+                out[f"change_{days}d"] = None
+
+        out["rsi"] = _rsi(tail) if n >= 15 else None
+
+        ma_20 = sum(tail[-20:]) / 20 if n >= 20 else None
+        out["ma_20"] = ma_20
+        for p in ROLLING_MA_PERIODS:
+            out[f"ma_{p}"] = self.ma_sums[p] / p if n >= p else None
+
+        ema_12 = self.ema[12] if n >= 12 else None
+        ema_26 = self.ema[26] if n >= 26 else None
+        out["macd"] = ema_12 - ema_26 if ema_12 and ema_26 else None
+
+        bb = _bollinger(tail, current) if n >= 20 else (None, None, None, None)
+        out["bb_upper"], out["bb_middle"], out["bb_lower"], out["bb_position"] = bb
+
+        out["volatility_7d"] = _volatility(tail[-7:]) if n >= 7 else None
+        out["volatility_30d"] = _volatility(tail[-30:]) if n >= 30 else None
+
+        atr_range = _avg_daily_range(tail[-20:]) if n >= 15 else None
+        out["atr"] = atr_range * current if atr_range is not None else None
+        out["atr_percent"] = atr_range * 100 if atr_range is not None else None
+        return out
+
+    # ============================================
+    # SERIALIZATION
+    # ============================================
+
+    def to_dict(self) -> Dict:
+        return {
+            "window": self.window,
+            "closes": list(self.closes),
+            "last_ts": self.last_ts,
+            "ema": {str(p): v for p, v in self.ema.items()},
+            "ema_base": {str(p): v for p, v in self.ema_base.items()},
+            "ma_sums": {str(p): v for p, v in self.ma_sums.items()},
+            "updates": self._updates,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IndicatorState":
+        state = cls(data["window"])
+        state.closes.extend(data["closes"])
+        state.last_ts = data["last_ts"]
+        state.ema = {p: data["ema"].get(str(p)) for p in EMA_PERIODS}
+        state.ema_base = {p: data["ema_base"].get(str(p), 0.0) for p in EMA_PERIODS}
+        state.ma_sums = {p: data["ma_sums"].get(str(p), 0.0) for p in ROLLING_MA_PERIODS}
+        state._updates = data.get("updates", 0)
+        return state
+
+
+# ============================================
+# KISA PENCERE HESAPLARI (sabit boyutlu kuyruk)
+# ============================================
+
+def _rsi(tail: List[float], period: int = 14) -> float:
+    """Son 'period' değişimin basit ortalamalı RSI'ı"""
+    gains, losses = [], []
+    for i in range(-period, 0):
+        change = tail[i] - tail[i - 1]
+        if change > 0:
+            gains.append(change)
+            losses.append(0)
+        else:
+            gains.append(0)
+            losses.append(abs(change))
+    avg_gain = sum(gains) / period
+    avg_loss = sum(losses) / period
+    if avg_loss == 0:
+        return 100
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def _bollinger(tail: List[float], current: float, period: int = 20, num_std: int = 2):
+    recent = tail[-period:]
+    sma = sum(recent) / period
+    variance = sum((p - sma) ** 2 for p in recent) / period
+    std_dev = variance ** 0.5
+    upper = sma + (num_std * std_dev)
+    lower = sma - (num_std * std_dev)
+    if upper - lower > 0:
+        position = (current - lower) / (upper - lower) * 100
+    else:
+        position = 50
+    return upper, sma, lower, position
+
+
+def _volatility(recent: List[float]) -> Optional[float]:
+    returns = []
+    for i in range(1, len(recent)):
+        if recent[i - 1] > 0:
+            returns.append((recent[i] - recent[i - 1]) / recent[i - 1] * 100)
+    if returns:
+        avg = sum(returns) / len(returns)
+        variance = sum((r - avg) ** 2 for r in returns) / len(returns)
+        return variance ** 0.5
+    return None
+
+
+def _avg_daily_range(recent: List[float]) -> Optional[float]:
+    """ATR proxy: ortalama mutlak günlük getiri"""
+    returns = []
+    for i in range(1, len(recent)):
+        if recent[i - 1] > 0:
+            returns.append(abs(recent[i] - recent[i - 1]) / recent[i - 1])
+    if not returns:
+        return None
+    return sum(returns) / len(returns)
+
+
+# ============================================
+# REDIS PERSISTENCE
+# ============================================
+
+class IndicatorStateStore:
+    """Redis hash'inde sembol başına JSON durum (indicator_state:{timeframe})"""
+
+    def __init__(self, client, timeframe: str = "1d"):
+        self.r = client
+        self.key = state_key(timeframe)
+
+    def load(self, symbols: Iterable[str]) -> Dict[str, IndicatorState]:
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        states = {}
+        try:
+            raws = self.r.hmget(self.key, symbols)
+        except Exception as e:
+            print(f"[IndicatorState] Load error: {e}")
+            return {}
+        for symbol, raw in zip(symbols, raws):
+            if not raw:
+                continue
+            try:
+                states[symbol] = IndicatorState.from_dict(json.loads(raw))
+            except (ValueError, KeyError, TypeError):
+                continue
+        return states
+
+    def save(self, states: Dict[str, IndicatorState]):
+        if not states:
+            return
+        try:
+            self.r.hset(self.key, mapping={s: json.dumps(st.to_dict()) for s, st in states.items()})
+        except Exception as e:
+            print(f"[IndicatorState] Save error: {e}")
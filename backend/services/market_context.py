@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Market Context
+=============================
+Döngü başına bir kez oluşturulan, değiştirilemez piyasa bağlamı.
+
+- Fear & Greed, piyasa rejimi, BTC 24s/7g değişimi
+- Futures haritası, haber veritabanı (salt okunur) ve coin -> haber indeksi
+- Tek Redis pipeline ile yüklenir; coin başına Redis okuması yapılmaz
+
+Kullananlar: worker_signals (skorlama), worker_ai_analyst, ai_summary_service
+"""
+
+import json
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from services.analysis_service import get_market_regime
+from services.news_index import NewsIndex
+from services.price_store import PriceStore
+
+EMPTY_MAPPING: Mapping = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class MarketContext:
+    """Bir sinyal döngüsünün tüm coinler için ortak girdileri"""
+
+    fear_greed: int = 50
+    fear_greed_label: str = "Neutral"
+    btc_price: float = 0
+    btc_change_24h: float = 0
+    btc_change_7d: float = 0
+    market_regime: str = "NEUTRAL"
+    futures: Mapping[str, Dict] = field(default_factory=lambda: EMPTY_MAPPING, repr=False)
+    news: Mapping[str, Dict] = field(default_factory=lambda: EMPTY_MAPPING, repr=False)
+    news_index: Optional[NewsIndex] = field(default=None, repr=False, compare=False)
+    built_at: str = ""
+
+    @classmethod
+    def build(cls, fear_greed: Optional[Mapping] = None, btc: Optional[Dict] = None,
+              futures: Optional[Mapping] = None, news: Optional[Mapping] = None,
+              news_index: Optional[NewsIndex] = None) -> "MarketContext":
+        """
+        Ham Redis verilerinden bağlam oluştur.
+        news_index verilirse haberler onun üzerinden paylaşılır (kopyalanmaz).
+        """
+        fear_greed = fear_greed or {}
+        btc = btc or {}
+        fg_value = int(fear_greed.get("value", 50))
+        btc_change_7d = btc.get("change_7d", 0) or 0
+        if news_index is None:
+            news_index = NewsIndex(MappingProxyType(dict(news or {})))
+        return cls(
+            fear_greed=fg_value,
+            fear_greed_label=fear_greed.get("classification", "Neutral"),
+            btc_price=btc.get("price", 0) or 0,
+            btc_change_24h=btc.get("change_24h", 0) or 0,
+            btc_change_7d=btc_change_7d,
+            market_regime=get_market_regime(btc_change_7d, fg_value),
+            futures=MappingProxyType(dict(futures or {})),
+            news=news_index.news,
+            news_index=news_index,
+            built_at=datetime.utcnow().isoformat(),
+        )
+
+    def futures_for(self, symbol: str) -> Optional[Dict]:
+        """Coin futures kaydı (futures verisi hiç yoksa None)"""
+        return self.futures.get(symbol, {}) if self.futures else None
+
+    def fear_greed_dict(self) -> Dict:
+        """Redis'teki fear_greed kaydı formatında"""
+        return {"value": self.fear_greed, "classification": self.fear_greed_label}
+
+    def news_sentiment_for(self, symbol: str) -> Optional[Dict]:
+        """Son 24 saatin coin + GENERAL haber sentiment'i (indeks üzerinden)"""
+        return self.news_index.signal_sentiment(symbol) if self.news_index else None
+
+    def market_data(self) -> Dict:
+        """should_emit_signal'in beklediği piyasa verisi"""
+        return {"btc_change_24h": self.btc_change_24h, "fear_greed": self.fear_greed}
+
+    def compact(self) -> "MarketContext":
+        """Futures/haber olmadan kopya (process pool'a gönderilecek)"""
+        return replace(self, futures=EMPTY_MAPPING, news=EMPTY_MAPPING, news_index=None)
+
+    def __reduce__(self):
+        # MappingProxyType pickle edilemez - düz dict olarak taşı, indeks yeniden kurulur
+        return (_rebuild_context, (
+            self.fear_greed, self.fear_greed_label, self.btc_price, self.btc_change_24h,
+            self.btc_change_7d, self.market_regime, dict(self.futures), dict(self.news), self.built_at
+        ))
+
+
+def _rebuild_context(fear_greed, fear_greed_label, btc_price, btc_change_24h, btc_change_7d,
+                     market_regime, futures, news, built_at) -> MarketContext:
+    return MarketContext(
+        fear_greed=fear_greed,
+        fear_greed_label=fear_greed_label,
+        btc_price=btc_price,
+        btc_change_24h=btc_change_24h,
+        btc_change_7d=btc_change_7d,
+        market_regime=market_regime,
+        futures=MappingProxyType(futures),
+        news=MappingProxyType(news),
+        news_index=NewsIndex(news) if news else None,
+        built_at=built_at,
+    )
+
+
+def load_market_context(client, btc: Optional[Dict] = None,
+                        include_news: bool = True) -> MarketContext:
+    """
+    Redis'ten bağlamı tek pipeline ile yükle.
+    btc verilmezse price store'dan okunur.
+    """
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.get("fear_greed")
+        pipe.get("futures_data")
+        if include_news:
+            pipe.get("news_db")
+        raws = pipe.execute()
+        fg_raw, futures_raw = raws[0], raws[1]
+        news_raw = raws[2] if include_news else None
+
+        if btc is None:
+            btc = PriceStore(client).get_quote("BTC")
+
+        return MarketContext.build(
+            fear_greed=json.loads(fg_raw) if fg_raw else None,
+            btc=btc,
+            futures=json.loads(futures_raw) if futures_raw else None,
+            news=json.loads(news_raw) if news_raw else None,
+        )
+    except Exception as e:
+        print(f"[MarketContext] Load error: {e}")
+        return MarketContext.build(btc=btc)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - News Index
+=========================
+news_db üzerinde coin -> haber ters indeksi.
+
+- crawled_at bir kez parse edilir (epoch saniye)
+- Coin başına haber id'leri yeniden eskiye sıralı; crawled_at'i olmayan
+  (parse edilemeyen) haberler coin listelerinin sonunda yer alır, zaman
+  pencereli sorgulara (ids_since, signal_sentiment) girmez
+- "GENERAL" haberler ayrı tutulur; 24 saatlik toplamları önceden hesaplanır
+- Zaman ağırlıklı (yarı ömürlü) sentiment toplamları
+
+Kullananlar: worker_signals (MarketContext üzerinden), API (snapshot_cache.news_index())
+"""
+
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Optional, Tuple
+
+GENERAL = "GENERAL"
+SIGNAL_NEWS_WINDOW_HOURS = 24
+
+
+def parse_news_time(news: Dict) -> Optional[float]:
+    """crawled_at -> epoch saniye (parse edilemezse None)"""
+    value = news.get("crawled_at", "")
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    # Saat dilimi bilgisi yok sayılır, değer UTC kabul edilir (worker davranışı)
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def signed_score(news: Dict) -> float:
+    """bullish -> +|score|, bearish -> -|score|, diğer -> 0"""
+    sentiment = news.get("sentiment", "neutral")
+    score = news.get("sentiment_score", 0)
+    if sentiment == "bullish":
+        return abs(score)
+    if sentiment == "bearish":
+        return -abs(score)
+    return 0
+
+
+class NewsIndex:
+    """Değiştirilmeyen news_db için coin -> haber indeksi"""
+
+    def __init__(self, news_db: Mapping[str, Dict], now: Optional[float] = None):
+        self.news = news_db
+        self.built_at = now if now is not None else time.time()
+        self.times: Dict[str, float] = {}
+
+        by_coin: Dict[str, List[Tuple[float, str]]] = {}
+        undated_by_coin: Dict[str, List[str]] = {}
+        dated: List[Tuple[float, str]] = []
+        undated: List[str] = []
+        for news_id, news in news_db.items():
+            ts = parse_news_time(news)
+            if ts is None:
+                undated.append(news_id)
+                for coin in set(news.get("coins") or []):
+                    undated_by_coin.setdefault(coin, []).append(news_id)
+                continue
+            self.times[news_id] = ts
+            dated.append((ts, news_id))
+            for coin in set(news.get("coins") or []):
+                by_coin.setdefault(coin, []).append((ts, news_id))
+
+        # Yeniden eskiye; zamanı olmayanlar sonda
+        dated.sort(reverse=True)
+        self.all_ids: List[str] = [nid for _, nid in dated] + undated
+        self.by_coin: Dict[str, List[str]] = {}
+        self._coin_times: Dict[str, List[float]] = {}  # Artan sıralı (bisect için, negatif) - sadece tarihliler
+        for coin, entries in by_coin.items():
+            entries.sort(reverse=True)
+            self.by_coin[coin] = [nid for _, nid in entries]
+            self._coin_times[coin] = [-ts for ts, _ in entries]
+        for coin, ids in undated_by_coin.items():
+            self.by_coin.setdefault(coin, []).extend(ids)
+
+        # Sinyal worker'ı için son 24 saatin GENERAL toplamı
+        cutoff = self.built_at - SIGNAL_NEWS_WINDOW_HOURS * 3600
+        general_ids = self.ids_since(GENERAL, cutoff)
+        self._general_sum = sum(signed_score(news_db[nid]) for nid in general_ids)
+        self._general_count = len(general_ids)
+
+    def __len__(self) -> int:
+        return len(self.news)
+
+    # ============================================
+    # QUERIES
+    # ============================================
+
+    def ids_for(self, coin: str, limit: Optional[int] = None) -> List[str]:
+        """Coin'in haber id'leri (yeniden eskiye)"""
+        ids = self.by_coin.get(coin, [])
+        return ids[:limit] if limit is not None else ids
+
+    def ids_since(self, coin: str, cutoff: float) -> List[str]:
+        """cutoff (epoch) sonrasındaki haber id'leri - O(log n + eşleşen)"""
+        times = self._coin_times.get(coin)
+        if not times:
+            return []
+        # times = -ts artan sırada; ts >= cutoff  <=>  -ts <= -cutoff
+        return self.by_coin[coin][:bisect_right(times, -cutoff)]
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """Tüm haberler (yeniden eskiye)"""
+        ids = self.all_ids[:limit] if limit is not None else self.all_ids
+        return [self.news[nid] for nid in ids]
+
+    def coin_news(self, coin: str, limit: Optional[int] = None) -> List[Dict]:
+        return [self.news[nid] for nid in self.ids_for(coin, limit)]
+
+    def signal_sentiment(self, symbol: str) -> Optional[Dict]:
+        """
+        Sinyal worker'ının coin sentiment'i: son 24 saatte coin veya GENERAL
+        etiketli haberlerin ortalama işaretli skoru.
+        """
+        cutoff = self.built_at - SIGNAL_NEWS_WINDOW_HOURS * 3600
+        total = self._general_sum
+        count = self._general_count
+        for nid in self.ids_since(symbol, cutoff):
+            news = self.news[nid]
+            if GENERAL in (news.get("coins") or []):
+                continue  # GENERAL toplamında zaten sayıldı
+            total += signed_score(news)
+            count += 1
+
+        if count == 0:
+            return None
+        return {
+            "score": round(total / count, 3),
+            "news_count": count
+        }
+
+    def sentiment(self, coin: Optional[str] = None, limit: Optional[int] = None,
+                  half_life_hours: Optional[float] = None) -> Dict:
+        """
+        bullish/bearish sayıları ve skor = (bullish - bearish) / toplam.
+        half_life_hours verilirse her haber 0.5 ** (yaş / yarı ömür) ağırlığı alır.
+        """
+        ids = self.ids_for(coin.upper(), limit) if coin else (
+            self.all_ids[:limit] if limit is not None else self.all_ids
+        )
+
+        bullish = bearish = 0
+        weighted = weight_total = 0.0
+        for nid in ids:
+            news = self.news[nid]
+            direction = 0
+            if news.get("sentiment") == "bullish":
+                bullish += 1
+                direction = 1
+            elif news.get("sentiment") == "bearish":
+                bearish += 1
+                direction = -1
+
+            weight = 1.0
+            if half_life_hours:
+                ts = self.times.get(nid)
+                age_hours = max(self.built_at - ts, 0) / 3600 if ts is not None else 0
+                weight = 0.5 ** (age_hours / half_life_hours)
+            weighted += weight * direction
+            weight_total += weight
+
+        total = len(ids)
+        if half_life_hours:
+            score = weighted / weight_total if weight_total > 0 else 0
+        else:
+            score = (bullish - bearish) / total if total > 0 else 0
+
+        return {
+            "news_count": total,
+            "bullish": bullish,
+            "bearish": bearish,
+            "neutral": total - bullish - bearish,
+            "score": score,
+        }
+
+
+def sentiment_label(score: float, threshold: float = 0.2) -> str:
+    """Skor -> bullish/bearish/neutral"""
+    if score > threshold:
+        return "bullish"
+    if score < -threshold:
+        return "bearish"
+    return "neutral"
+
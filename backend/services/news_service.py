@@ -5,13 +5,13 @@ CryptoSignal - News Service
 Haber analizi ve sentiment
 """
 
-import json
 import re
 from typing import Optional, Dict, List
 from datetime import datetime
 
-from database import redis_client
 from config import BULLISH_KEYWORDS, BEARISH_KEYWORDS, COIN_SYMBOLS
+from services.news_index import sentiment_label
+from services.snapshot_cache import snapshot_cache
 
 
 class NewsService:
@@ -107,13 +107,10 @@ class NewsService:
     def get_news_from_redis(self, limit: int = 100) -> List[Dict]:
         """Redis'den haberleri getir"""
         try:
-            news_raw = redis_client.get("news_db")
-            if not news_raw:
+            news_list = list(snapshot_cache.get("news_db").values())
+            if not news_list:
                 return []
             
-            news_dict = json.loads(news_raw)
-            news_list = list(news_dict.values())
-            
             # Sort by date
             news_list.sort(
                 key=lambda x: x.get('crawled_at', x.get('published_at', '')),
@@ -126,15 +123,8 @@ class NewsService:
             return []
     
     def get_coin_news(self, symbol: str, limit: int = 20) -> List[Dict]:
-        """Belirli bir coin için haberleri getir"""
-        all_news = self.get_news_from_redis(500)
-        
-        coin_news = [
-            n for n in all_news 
-            if symbol.upper() in (n.get('coins') or [])
-        ]
-        
-        return coin_news[:limit]
+        """Belirli bir coin için haberleri getir (coin -> haber indeksi)"""
+        return snapshot_cache.news_index().coin_news(symbol.upper(), limit)
     
     def get_market_sentiment(self) -> Dict:
         """Genel piyasa sentiment'i"""
@@ -172,11 +162,12 @@ class NewsService:
             "neutral": neutral
         }
     
-    def get_coin_sentiment(self, symbol: str) -> Dict:
-        """Belirli bir coin için sentiment"""
-        news = self.get_coin_news(symbol, 50)
+    def get_coin_sentiment(self, symbol: str, half_life_hours: Optional[float] = None) -> Dict:
+        """Belirli bir coin için sentiment (son 50 haber, opsiyonel zaman ağırlıklı)"""
+        index = snapshot_cache.news_index()
+        stats = index.sentiment(symbol, limit=50, half_life_hours=half_life_hours)
         
-        if not news:
+        if not stats["news_count"]:
             return {
                 "symbol": symbol,
                 "sentiment": "neutral",
@@ -184,26 +175,14 @@ class NewsService:
                 "news_count": 0
             }
         
-        bullish = sum(1 for n in news if n.get('sentiment') == 'bullish')
-        bearish = sum(1 for n in news if n.get('sentiment') == 'bearish')
-        
-        score = (bullish - bearish) / len(news)
-        
-        if score > 0.2:
-            sentiment = "bullish"
-        elif score < -0.2:
-            sentiment = "bearish"
-        else:
-            sentiment = "neutral"
-        
         return {
             "symbol": symbol,
-            "sentiment": sentiment,
-            "score": round(score, 3),
-            "news_count": len(news),
-            "bullish": bullish,
-            "bearish": bearish,
-            "recent_headlines": [n.get('title', '')[:100] for n in news[:5]]
+            "sentiment": sentiment_label(stats["score"]),
+            "score": round(stats["score"], 3),
+            "news_count": stats["news_count"],
+            "bullish": stats["bullish"],
+            "bearish": stats["bearish"],
+            "recent_headlines": [n.get('title', '')[:100] for n in index.coin_news(symbol.upper(), 5)]
         }
     
     def get_trending_coins(self, limit: int = 10) -> List[Dict]:
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Portfolio Simulator
+==================================
+İşlem listesini (replay sonuçları veya signal_tracking geçmişi) ortak
+sermaye üzerinde eşzamanlı pozisyonlarla simüle eder.
+
+calculate_summary getirileri tek tek, sırayla bileşikler (aynı anda tek
+işlem varmış gibi). Burada:
+- Pozisyon büyüklüğü sizing kuralıyla o anki özsermayeden hesaplanır
+- Eşzamanlı pozisyon (max_positions, varsayılan MAX_ACTIVE_SIGNALS),
+  toplam maruziyet (max_exposure) ve nakit limiti uygulanır
+- Sembol başına tek açık pozisyon, giriş/çıkışta komisyon
+
+Olaylar (giriş/çıkış) numpy ile zaman sırasına dizilir, tahsis tek geçişte
+yapılır; özsermaye eğrisi, drawdown ve maruziyet olay zamanlarına göre
+indekslenmiş dizilerden vektörel hesaplanır.
+
+Açık pozisyonlar olay zamanlarında ve eğri ızgarasında (en az günlük)
+candle store kapanışlarıyla piyasa değerine çekilir (load_marks: 1h, yoksa
+1d). Özsermaye eğrisi ve max drawdown bu değerlerden hesaplanır; böylece
+çıkışa kadar açık kalan pozisyonların ara zararları da görünür. Kapanışı
+bilinmeyen pozisyonlar maliyetle taşınır.
+
+Sizing kuralları:
+- fixed_fraction : özsermaye x position_fraction
+- equal_weight   : özsermaye / max_positions
+- confidence     : özsermaye x position_fraction x confidence / 75 (en fazla 2x)
+"""
+
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from database import get_db, sql_chunks
+from services.candle_store import INTERVAL_MS, CandleStore, candle_store
+from services.signal_quality import BUY_SIGNALS, MAX_ACTIVE_SIGNALS, SELL_SIGNALS
+
+SIZING_RULES = ("fixed_fraction", "equal_weight", "confidence")
+CONFIDENCE_REFERENCE = 75
+DAY_MS = 86_400_000
+MAX_CURVE_POINTS = 1000
+MIN_POSITION_FRACTION = 0.001  # Özsermayenin bundan küçük pozisyonları açma
+MARK_INTERVALS = ("1h", "1d")  # Açık pozisyon değerlemesi: ilk veri bulunan aralık
+
+EVENT_EXIT = 0                 # Aynı anda önce çıkışlar (sermaye serbest kalır)
+EVENT_ENTRY = 1                # Aynı anda açılıp kapanan işlemin çıkışı kendi girişinin hemen ardından
+
+
+@dataclass
+class PortfolioConfig:
+    initial_capital: float = 10_000.0
+    sizing: str = "fixed_fraction"
+    position_fraction: float = 0.1
+    max_positions: int = MAX_ACTIVE_SIGNALS
+    max_exposure: float = 1.0      # Açık pozisyonlar / özsermaye üst sınırı
+    fee_pct: float = 0.1           # Giriş ve çıkışta ayrı ayrı
+    one_per_symbol: bool = True
+
+
+# Sembol -> (kapanış zamanları ms, kapanış fiyatları)
+Marks = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+
+def utc_ms(value: str) -> int:
+    """signal_tracking zamanları (utcnow().isoformat, tz'siz UTC) -> epoch ms"""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+class TradeTape:
+    """
+    Zaman damgalı işlem listesi (kolon dizileri).
+    entry_price / direction (1 long, -1 short) ara değerleme içindir;
+    giriş fiyatı bilinmeyen (NaN) işlemler maliyetle taşınır.
+    """
+
+    def __init__(self, symbols: List[str], entry_ms: Iterable[int], exit_ms: Iterable[int],
+                 pnl_pct: Iterable[float], confidence: Iterable[float],
+                 entry_price: Optional[Iterable[float]] = None,
+                 direction: Optional[Iterable[int]] = None):
+        self.symbols = list(symbols)
+        self.entry_ms = np.asarray(list(entry_ms), dtype=np.int64)
+        self.exit_ms = np.asarray(list(exit_ms), dtype=np.int64)
+        self.pnl_pct = np.asarray(list(pnl_pct), dtype=np.float64)
+        self.confidence = np.asarray(list(confidence), dtype=np.float64)
+        count = len(self.symbols)
+        self.entry_price = (np.full(count, np.nan) if entry_price is None
+                            else np.asarray([np.nan if p is None else p for p in entry_price], dtype=np.float64))
+        self.direction = (np.ones(count, dtype=np.int64) if direction is None
+                          else np.asarray(list(direction), dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @classmethod
+    def from_results(cls, results: Iterable) -> "TradeTape":
+        """BacktestResult (veya asdict'i) listesi - replay / run_backtest çıktısı"""
+        rows = [r if isinstance(r, dict) else asdict(r) for r in results]
+
+        def ms(value: str) -> int:
+            return int(datetime.strptime(value, "%Y-%m-%d %H:%M").timestamp() * 1000)
+
+        return cls(
+            [r["symbol"] for r in rows],
+            [ms(r["entry_date"]) for r in rows],
+            [ms(r["exit_date"]) for r in rows],
+            [r["profit_loss_pct"] for r in rows],
+            [r.get("confidence") or 0 for r in rows],
+            [r.get("entry_price") for r in rows],
+            [-1 if r.get("signal_type") in SELL_SIGNALS else 1 for r in rows],
+        )
+
+    @classmethod
+    def from_tracking(cls, rows: Iterable[Dict]) -> "TradeTape":
+        """signal_tracking satırları (kapanmamış / tarihsiz satırlar atlanır)"""
+        symbols, entries, exits, pnls, confs, prices, directions = [], [], [], [], [], [], []
+        for row in rows:
+            opened, closed = row.get("created_at"), row.get("closed_at") or row.get("check_date")
+            if not opened or not closed or row.get("profit_loss_pct") is None:
+                continue
+            try:
+                entry, exit_ = utc_ms(opened), utc_ms(closed)
+            except ValueError:
+                continue
+            symbols.append(row["symbol"])
+            entries.append(entry)
+            exits.append(max(exit_, entry))
+            pnls.append(row["profit_loss_pct"])
+            confs.append(row.get("confidence") or 0)
+            prices.append(row.get("entry_price") or None)
+            directions.append(-1 if row.get("signal") in SELL_SIGNALS else 1)
+        return cls(symbols, entries, exits, pnls, confs, prices, directions)
+
+
+def load_tracking_tape(days: int = 90, timeframe: Optional[str] = "1d",
+                       symbols: Optional[Iterable[str]] = None) -> TradeTape:
+    """Sonuçlanmış AL/SAT sinyalleri (signal_tracking); symbols verilirse sadece onlar"""
+    since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    signals = sorted(BUY_SIGNALS | SELL_SIGNALS)
+    query = f"""
+        SELECT * FROM signal_tracking
+        WHERE result IS NOT NULL AND created_at >= ?
+        AND signal IN ({",".join("?" * len(signals))})
+    """
+    params: List = [since, *signals]
+    if timeframe:
+        query += " AND timeframe = ?"
+        params.append(timeframe)
+    # idx_signal_tracking_symbol
+    chunks = sql_chunks(symbols) if symbols is not None else [None]
+    rows = []
+    with get_db() as conn:
+        for chunk in chunks:
+            if chunk is None:
+                rows.extend(dict(row) for row in conn.execute(query, params).fetchall())
+            else:
+                rows.extend(dict(row) for row in conn.execute(
+                    query + f" AND symbol IN ({','.join('?' * len(chunk))})", [*params, *chunk]
+                ).fetchall())
+    rows.sort(key=lambda row: row["created_at"])
+    return TradeTape.from_tracking(rows)
+
+
+def load_marks(tape: TradeTape, store: Optional[CandleStore] = None) -> Marks:
+    """
+    İşlem aralıklarını kapsayan kapanışlar (sadece yerel candle store, sync yok).
+    Mum kapanışı open_time + aralık anında bilinir kabul edilir.
+    """
+    store = store or candle_store
+    marks: Marks = {}
+    if not len(tape):
+        return marks
+    start, end = int(tape.entry_ms.min()), int(tape.exit_ms.max())
+    for symbol in set(tape.symbols):
+        for interval in MARK_INTERVALS:
+            step = INTERVAL_MS[interval]
+            candles = store.read_range(symbol, interval, start - step, end)
+            if len(candles):
+                marks[symbol] = (candles["open_time"] + step, np.array(candles["close"]))
+                break
+    return marks
+
+
+def position_size(config: PortfolioConfig, equity: float, confidence: float) -> float:
+    if config.sizing == "equal_weight":
+        return equity / max(config.max_positions, 1)
+    if config.sizing == "confidence":
+        scale = min(confidence / CONFIDENCE_REFERENCE, 2.0)
+        return equity * config.position_fraction * scale
+    return equity * config.position_fraction
+
+
+def simulate_portfolio(tape: TradeTape, config: Optional[PortfolioConfig] = None,
+                       marks: Optional[Marks] = None) -> Dict:
+    """
+    marks: açık pozisyonların ara değerlemesi için kapanışlar (load_marks);
+    verilmezse pozisyonlar çıkışa kadar maliyetle taşınır.
+    Returns: özet metrikler + özsermaye eğrisi (en fazla MAX_CURVE_POINTS nokta)
+    """
+    config = config or PortfolioConfig()
+    if config.sizing not in SIZING_RULES:
+        raise ValueError(f"Unknown sizing rule: {config.sizing}")
+
+    count = len(tape)
+    fee = config.fee_pct / 100
+
+    # Olay sırası: zaman, çıkış önce, aynı anda girişlerde yüksek confidence önce.
+    # exit_ms <= entry_ms olan işlemin çıkışı giriş grubuna alınır ve kendi
+    # girişinin hemen arkasına dizilir (açık kalmaz, yer de tutmaz)
+    exit_ms = np.maximum(tape.exit_ms, tape.entry_ms)
+    instant = exit_ms == tape.entry_ms
+    times = np.r_[exit_ms, tape.entry_ms]
+    groups = np.r_[np.where(instant, EVENT_ENTRY, EVENT_EXIT), np.full(count, EVENT_ENTRY)]
+    is_exit = np.r_[np.ones(count, dtype=bool), np.zeros(count, dtype=bool)]
+    trade = np.r_[np.arange(count), np.arange(count)]
+    order = np.lexsort((is_exit, trade, -np.r_[tape.confidence, tape.confidence], groups, times))
+
+    size = np.zeros(count)
+    taken = np.zeros(count, dtype=bool)
+    skipped = {"max_positions": 0, "same_symbol": 0, "no_capital": 0}
+    cash = float(config.initial_capital)
+    invested = 0.0
+    open_positions = 0
+    open_symbols: Dict[str, int] = defaultdict(int)  # Sembol -> açık pozisyon sayısı
+    traded = 0.0
+    fees = 0.0
+
+    event_equity = np.empty(len(order))
+    event_invested = np.empty(len(order))
+    event_positions = np.empty(len(order), dtype=np.int64)
+
+    symbols, pnl_pct, confidence = tape.symbols, tape.pnl_pct.tolist(), tape.confidence.tolist()
+    for n, (exit_event, i) in enumerate(zip(is_exit[order].tolist(), trade[order].tolist())):
+        if exit_event:
+            if taken[i]:
+                proceeds = size[i] * (1 + pnl_pct[i] / 100)
+                cash += proceeds - abs(proceeds) * fee
+                fees += abs(proceeds) * fee
+                invested -= size[i]
+                traded += abs(proceeds)
+                open_positions -= 1
+                open_symbols[symbols[i]] -= 1
+        elif open_positions >= config.max_positions:
+            skipped["max_positions"] += 1
+        elif config.one_per_symbol and open_symbols[symbols[i]]:
+            skipped["same_symbol"] += 1
+        else:
+            equity = cash + invested
+            room = min(config.max_exposure * equity - invested, cash / (1 + fee))
+            notional = min(position_size(config, equity, confidence[i]), room)
+            if notional <= equity * MIN_POSITION_FRACTION:
+                skipped["no_capital"] += 1
+            else:
+                size[i], taken[i] = notional, True
+                cash -= notional * (1 + fee)
+                fees += notional * fee
+                invested += notional
+                traded += notional
+                open_positions += 1
+                open_symbols[symbols[i]] += 1
+
+        event_equity[n] = cash + invested
+        event_invested[n] = invested
+        event_positions[n] = open_positions
+
+    return _report(tape, config, times[order], event_equity, event_invested, event_positions,
+                   size, taken, skipped, traded, fees, marks or {})
+
+
+def _report(tape, config, event_times, equity, invested, positions, size, taken, skipped, traded, fees,
+            marks) -> Dict:
+    initial = config.initial_capital
+    final = float(equity[-1]) if len(equity) else initial
+
+    # Drawdown: olay anları + eğri ızgarasında piyasa değerli özsermaye
+    grid = curve_grid(event_times)
+    samples = np.union1d(event_times, grid)
+    marked = mark_to_market(tape, size, taken, marks, samples, event_times, equity, initial)
+    curve_equity = np.r_[initial, marked]
+    peak = np.maximum.accumulate(curve_equity)
+    drawdown = (peak - curve_equity) / peak * 100
+
+    # Zaman ağırlıklı ortalamalar (olaylar arası süre)
+    if len(event_times) > 1:
+        span = np.diff(event_times).astype(np.float64)
+        weights = span / span.sum() if span.sum() > 0 else np.full(len(span), 1 / len(span))
+        avg_equity = float((equity[:-1] * weights).sum())
+        avg_exposure = float((invested[:-1] / equity[:-1] * weights).sum()) * 100
+        years = (event_times[-1] - event_times[0]) / (365 * DAY_MS)
+    else:
+        avg_equity, avg_exposure, years = initial, 0.0, 0.0
+
+    turnover = float(traded) / 2 / avg_equity if avg_equity > 0 else 0.0
+    trade_returns = tape.pnl_pct[taken]
+    serial = float(np.prod(1 + tape.pnl_pct[np.argsort(tape.entry_ms, kind="stable")] / 100) - 1) * 100
+
+    return {
+        "initial_capital": initial,
+        "final_equity": round(final, 2),
+        "total_return_pct": round((final / initial - 1) * 100, 2),
+        "serial_return_pct": round(serial, 2),  # calculate_summary tarzı sıralı bileşik (karşılaştırma)
+        "max_drawdown_pct": round(float(drawdown.max()), 2),
+        "turnover": round(turnover, 2),
+        "turnover_annual": round(turnover / years, 2) if years > 0 else None,
+        "avg_exposure_pct": round(avg_exposure, 1),
+        "max_concurrent": int(positions.max()) if len(positions) else 0,
+        "fees_paid": round(float(fees), 2),
+        "trades_total": len(tape),
+        "trades_taken": int(taken.sum()),
+        "trades_skipped": skipped,
+        "win_rate": round(float((trade_returns > 0).mean() * 100), 1) if len(trade_returns) else 0.0,
+        "avg_position": round(float(size[taken].mean()), 2) if taken.any() else 0.0,
+        "equity_curve": equity_curve(grid, marked[np.searchsorted(samples, grid)],
+                                     event_times, invested, positions),
+        "config": asdict(config),
+    }
+
+
+def curve_grid(event_times: np.ndarray) -> np.ndarray:
+    """Sabit aralıklı (en az günlük, en fazla MAX_CURVE_POINTS nokta) eğri zamanları"""
+    if not len(event_times):
+        return np.zeros(0, dtype=np.int64)
+    start = event_times[0] // DAY_MS * DAY_MS
+    step = max(DAY_MS, -(-(event_times[-1] - start) // MAX_CURVE_POINTS))
+    return np.arange(start, event_times[-1] + step, step)
+
+
+def mark_to_market(tape: TradeTape, size: np.ndarray, taken: np.ndarray, marks: Marks,
+                   times: np.ndarray, event_times: np.ndarray, equity: np.ndarray,
+                   initial: float) -> np.ndarray:
+    """
+    times anlarındaki özsermaye: son olaydaki (maliyetle) değer + o an açık
+    pozisyonların [giriş, çıkış) son kapanışa göre gerçekleşmemiş kâr/zararı
+    """
+    index = np.searchsorted(event_times, times, side="right") - 1
+    values = np.where(index >= 0, equity[np.maximum(index, 0)], initial)
+
+    for i in np.flatnonzero(taken & np.isfinite(tape.entry_price)).tolist():
+        series = marks.get(tape.symbols[i])
+        if series is None:
+            continue
+        lo = int(np.searchsorted(times, tape.entry_ms[i], side="left"))
+        hi = int(np.searchsorted(times, tape.exit_ms[i], side="left"))
+        if lo >= hi:
+            continue
+        close_times, closes = series
+        k = np.searchsorted(close_times, times[lo:hi], side="right") - 1
+        # Girişten sonra kapanmış mum yoksa henüz değerleme yok
+        valid = (k >= 0) & (close_times[np.maximum(k, 0)] > tape.entry_ms[i])
+        change = closes[np.maximum(k, 0)] / tape.entry_price[i] - 1
+        values[lo:hi] += np.where(valid, size[i] * tape.direction[i] * change, 0.0)
+    return values
+
+
+def equity_curve(grid: np.ndarray, values: np.ndarray, event_times: np.ndarray,
+                 invested: np.ndarray, positions: np.ndarray) -> List[Dict]:
+    """Izgara noktalarında özsermaye (piyasa değerli), maliyet bazlı maruziyet ve pozisyon sayısı"""
+    if not len(grid):
+        return []
+    index = np.searchsorted(event_times, grid, side="right") - 1
+    known = index >= 0
+    index = np.maximum(index, 0)
+    exposure = np.where(known, invested[index], 0.0)
+    open_count = np.where(known, positions[index], 0)
+    return [
+        {"time": datetime.fromtimestamp(t / 1000).isoformat(), "equity": round(e, 2),
+         "exposure": round(x, 2), "positions": p}
+        for t, e, x, p in zip(grid.tolist(), values.tolist(), exposure.tolist(), open_count.tolist())
+    ]
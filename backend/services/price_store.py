@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Price Store
+==========================
+Sembol bazlı fiyat deposu (tam prices_data blob'u yerine)
+
+Redis anahtarları:
+- prices_quotes  : HASH   symbol -> quote JSON
+- prices_changes : ZSET   symbol -> son değiştiği snapshot versiyonu
+- prices_removed : ZSET   symbol -> silindiği snapshot versiyonu (tombstone)
+- prices_version : STRING monoton artan snapshot versiyonu
+
+Yazıcı (price worker) sadece son sync'ten beri değişen sembolleri yazar.
+Okuyucular ya ihtiyaç duydukları sembolleri (HMGET) ya da belirli bir
+versiyondan sonraki değişiklikleri (ZRANGEBYSCORE) çeker.
+Delist edilen / artık takip edilmeyen semboller remove() ile silinir;
+tombstone'ları delta okuyucularına get_changes_since() ile döner.
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import redis_client
+
+QUOTES_KEY = "prices_quotes"
+CHANGES_KEY = "prices_changes"
+REMOVED_KEY = "prices_removed"
+VERSION_KEY = "prices_version"
+
+
+class PriceStore:
+    """Per-symbol quote store with a monotonically increasing snapshot version."""
+
+    def __init__(self, client):
+        self.r = client
+        self._version: Optional[int] = None
+
+    # ============================================
+    # WRITER (price worker)
+    # ============================================
+
+    def publish(self, quotes: Dict[str, Dict]) -> int:
+        """
+        Değişen sembolleri tek transaction içinde yaz.
+        Returns: yeni snapshot versiyonu
+        """
+        if self._version is None:
+            self._version = int(self.r.get(VERSION_KEY) or 0)
+
+        if not quotes:
+            return self._version
+
+        version = self._version + 1
+
+        pipe = self.r.pipeline(transaction=True)
+        pipe.hset(QUOTES_KEY, mapping={s: json.dumps(q) for s, q in quotes.items()})
+        pipe.zadd(CHANGES_KEY, {s: version for s in quotes})
+        pipe.zrem(REMOVED_KEY, *quotes)  # Yeniden listelenen sembolün tombstone'u kalkar
+        pipe.set(VERSION_KEY, version)
+        pipe.execute()
+
+        self._version = version
+        return version
+
+    def remove(self, symbols: Iterable[str]) -> int:
+        """
+        Sembolleri depodan sil (quote + değişiklik kaydı, tek transaction).
+        Silinenler prices_removed'a tombstone olarak yazılır; delta okuyucuları
+        get_changes_since() ile öğrenir.
+        Returns: yeni snapshot versiyonu
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if self._version is None:
+            self._version = int(self.r.get(VERSION_KEY) or 0)
+
+        if not symbols:
+            return self._version
+
+        version = self._version + 1
+
+        pipe = self.r.pipeline(transaction=True)
+        pipe.hdel(QUOTES_KEY, *symbols)
+        pipe.zrem(CHANGES_KEY, *symbols)
+        pipe.zadd(REMOVED_KEY, {s: version for s in symbols})
+        pipe.set(VERSION_KEY, version)
+        pipe.execute()
+
+        self._version = version
+        return version
+
+    @property
+    def published_version(self) -> int:
+        """Bu yazıcının son yazdığı versiyon (Redis'e gitmeden)"""
+        return self._version or 0
+
+    # ============================================
+    # READERS (API, workers)
+    # ============================================
+
+    def get_version(self) -> int:
+        """Mevcut snapshot versiyonu"""
+        return int(self.r.get(VERSION_KEY) or 0)
+
+    def get_quote(self, symbol: str) -> Optional[Dict]:
+        """Tek sembol"""
+        raw = self.r.hget(QUOTES_KEY, symbol)
+        return json.loads(raw) if raw else None
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """Sadece istenen semboller (bulunamayanlar dönmez)"""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        raws = self.r.hmget(QUOTES_KEY, symbols)
+        return {s: json.loads(raw) for s, raw in zip(symbols, raws) if raw}
+
+    def get_all(self) -> Dict[str, Dict]:
+        """Tüm semboller"""
+        raws = self.r.hgetall(QUOTES_KEY)
+        return {s: json.loads(raw) for s, raw in raws.items()}
+
+    def get_changes_since(self, since: int) -> Tuple[int, Dict[str, Dict], List[str]]:
+        """
+        'since' versiyonundan sonra değişen ve silinen semboller.
+        Returns: (current_version, {symbol: quote}, [silinen semboller])
+        """
+        pipe = self.r.pipeline(transaction=True)
+        pipe.get(VERSION_KEY)
+        pipe.zrangebyscore(CHANGES_KEY, f"({int(since)}", "+inf")
+        pipe.zrangebyscore(REMOVED_KEY, f"({int(since)}", "+inf")
+        version_raw, changed, removed = pipe.execute()
+
+        version = int(version_raw or 0)
+        if not changed:
+            return version, {}, removed
+        return version, self.get_quotes(changed), removed
+
+    def count(self) -> int:
+        """Depodaki sembol sayısı"""
+        return self.r.hlen(QUOTES_KEY)
+
+
+# Singleton instance (API process)
+price_store = PriceStore(redis_client)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Response Cache
+=============================
+Veri versiyonuna bağlı, önceden encode edilmiş HTTP yanıtları.
+
+- Anahtar: endpoint + query parametreleri, değer: (versiyon, gövde)
+- Gövde bir kez encode edilir (orjson varsa orjson), gzip/brotli
+  varyantları ilk ihtiyaçta bir kez sıkıştırılır
+- ETag = endpoint + versiyon + parametreler; If-None-Match eşleşirse 304
+- Versiyon değişince aynı parametre için eski gövde değiştirilir
+
+Kullananlar: /api/prices, /api/coins, /api/signals
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from fastapi import Request, Response
+
+from database import redis_client
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_ENTRIES = 256            # Farklı endpoint + parametre kombinasyonu
+MIN_COMPRESS_BYTES = 1024    # Bundan küçük gövdeler sıkıştırılmaz
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _default(obj):
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(payload: Any) -> bytes:
+    """Hızlı JSON encode (orjson yoksa json)"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CachedBody:
+    """Encode edilmiş gövde + lazy sıkıştırılmış varyantlar"""
+
+    __slots__ = ("etag", "raw", "_variants")
+
+    def __init__(self, etag: str, raw: bytes):
+        self.etag = etag
+        self.raw = raw
+        self._variants: Dict[str, bytes] = {}
+
+    def variant(self, encoding: str) -> bytes:
+        body = self._variants.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.raw, quality=BROTLI_QUALITY)
+            else:
+                body = gzip.compress(self.raw, compresslevel=GZIP_LEVEL)
+            self._variants[encoding] = body
+        return body
+
+
+def _accepted_encoding(request: Request, size: int) -> Optional[str]:
+    if size < MIN_COMPRESS_BYTES:
+        return None
+    accept = request.headers.get("accept-encoding", "").lower()
+    if brotli is not None and "br" in accept:
+        return "br"
+    if "gzip" in accept:
+        return "gzip"
+    return None
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+class ResponseCache:
+    """(endpoint, parametreler) -> (versiyon, CachedBody) LRU cache'i"""
+
+    def __init__(self, client, max_entries: int = MAX_ENTRIES):
+        self.r = client
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[str, CachedBody]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, *keys: str) -> str:
+        """Versiyon anahtarlarının birleşimi (tek MGET)"""
+        return "|".join(v or "0" for v in self.r.mget(keys))
+
+    def _get_body(self, key: Tuple, version: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _put_body(self, key: Tuple, version: str, body: CachedBody):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def respond(self, request: Request, endpoint: str, version: str,
+                params: Iterable, build: Callable[[], Any]) -> Response:
+        """
+        Versiyonlu yanıt.
+        - If-None-Match ETag ile eşleşirse 304 (gövde üretilmez)
+        - Cache'te aynı versiyon varsa hazır byte'lar
+        - Yoksa build() -> encode -> cache
+        build() içinde 'error' anahtarlı yanıtlar cache'lenmez.
+        """
+        key = (endpoint, tuple(params))
+        digest = hashlib.blake2b(repr((key, version)).encode(), digest_size=12).hexdigest()
+        etag = f'"{endpoint}-{digest}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        body = self._get_body(key, version)
+        if body is None:
+            payload = build()
+            body = CachedBody(etag, encode_json(payload))
+            if not (isinstance(payload, dict) and "error" in payload):
+                self._put_body(key, version, body)
+            else:
+                headers.pop("ETag")
+
+        encoding = _accepted_encoding(request, len(body.raw))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            content = body.variant(encoding)
+        else:
+            content = body.raw
+        return Response(content=content, media_type="application/json", headers=headers)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Singleton instance (API process)
+response_cache = ResponseCache(redis_client)
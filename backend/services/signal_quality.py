@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Signal Quality Gate
+==================================
+Sinyal yayın kuralları (worker_signals ve replay backtest ortak kullanır).
+
+- should_emit_signal: Quality Gate v3 (rejim, crowding, confidence, faktör uyumu)
+- filter_top_signals: döngü başına en kaliteli MAX_ACTIVE_SIGNALS AL/SAT sinyali
+
+Saf fonksiyonlar - Redis / ağ erişimi yok.
+"""
+
+# Quality Gate settings
+MIN_CONFIDENCE_FOR_TRADE = 60
+MIN_FACTOR_ALIGNMENT = 2
+HIGH_RISK_CONFIDENCE_PENALTY = 10
+
+BUY_SIGNALS = {"BUY", "AL", "STRONG_BUY", "GÜÇLÜ AL"}
+SELL_SIGNALS = {"SELL", "SAT", "STRONG_SELL", "GÜÇLÜ SAT"}
+HOLD_SIGNALS = {"HOLD", "BEKLE"}
+
+# Top 50 signal filter
+MAX_ACTIVE_SIGNALS = 50
+
+
+def filter_top_signals(signals: dict, max_count: int = MAX_ACTIVE_SIGNALS) -> dict:
+    """
+    En kaliteli sinyalleri filtrele - sadece AL/SAT sinyallerini say
+    Sıralama: confidence * (1 + alignment/10) * quality_bonus
+    """
+    active_signals = []
+    hold_signals = []
+
+    for symbol, sig in signals.items():
+        signal_type = sig.get("signal", "HOLD")
+        if signal_type in BUY_SIGNALS or signal_type in SELL_SIGNALS:
+            conf = sig.get("confidence", 0)
+            details = sig.get("confidence_details", {})
+            alignment = _extract_alignment(details)
+
+            # Quality score hesapla
+            quality_bonus = 1.0
+            qg = sig.get("quality_gate", {})
+            if qg.get("passed"):
+                quality_bonus = 1.2
+
+            # R:R bonus
+            rr = sig.get("risk_reward_ratio", 0)
+            try:
+                if rr and float(rr) >= 2.0:
+                    quality_bonus *= 1.1
+            except (TypeError, ValueError):
+                pass
+
+            score = conf * (1 + alignment / 10) * quality_bonus
+            active_signals.append((symbol, sig, score))
+        else:
+            hold_signals.append((symbol, sig))
+
+    # En yüksek skorlu sinyalleri al
+    active_signals.sort(key=lambda x: x[2], reverse=True)
+    top_active = active_signals[:max_count]
+
+    # Sonucu oluştur
+    result = {}
+    for symbol, sig, _ in top_active:
+        result[symbol] = sig
+
+    # HOLD sinyallerini de ekle (bunlar zaten işlem önermiyor)
+    for symbol, sig in hold_signals:
+        result[symbol] = sig
+
+    return result
+
+
+def _norm_risk(risk_level: str) -> str:
+    """Risk seviyesini normalize et"""
+    if not risk_level:
+        return "UNKNOWN"
+    r = risk_level.strip().upper()
+    if r in {"HIGH", "YÜKSEK"}:
+        return "HIGH"
+    if r in {"MEDIUM", "ORTA"}:
+        return "MEDIUM"
+    if r in {"LOW", "DÜŞÜK", "DUSUK"}:
+        return "LOW"
+    return r
+
+
+def _extract_alignment(details: dict) -> int:
+    """confidence_details içinden factor uyum sayısını çıkarır"""
+    if not isinstance(details, dict):
+        return 0
+
+    fb = details.get("factors_buy")
+    fs = details.get("factors_sell")
+
+    if isinstance(fb, (int, float)) or isinstance(fs, (int, float)):
+        try:
+            fb = int(fb or 0)
+            fs = int(fs or 0)
+            return max(fb, fs)
+        except Exception:
+            return 0
+
+    if isinstance(fb, list) or isinstance(fs, list):
+        fb_n = len(fb or [])
+        fs_n = len(fs or [])
+        return max(fb_n, fs_n)
+
+    return 0
+
+
+def _has_indicators(technical: dict) -> bool:
+    """İndikatör verisi var mı kontrol et"""
+    if not technical:
+        return False
+
+    rsi = technical.get("rsi")
+    has_rsi = rsi is not None and rsi not in ("N/A", "na", "NA", "") and isinstance(rsi, (int, float))
+
+    macd = technical.get("macd")
+    if macd is not None:
+        if isinstance(macd, dict):
+            has_macd = macd.get("histogram") is not None
+        elif isinstance(macd, (int, float)):
+            has_macd = True
+        else:
+            has_macd = macd not in ("N/A", "na", "NA", "")
+    else:
+        has_macd = False
+
+    ma = technical.get("ma")
+    if ma is not None and isinstance(ma, dict):
+        has_ma = ma.get("ma_20") is not None or ma.get("ma_50") is not None
+    else:
+        has_ma = False
+
+    return has_rsi or has_macd or has_ma
+
+
+def should_emit_signal(analysis: dict, risk_level: str, technical: dict = None, market_data: dict = None, futures_data: dict = None) -> tuple:
+    """Geliştirilmiş Quality Gate v3 - Market Regime + Crowding Protection"""
+    signal = (analysis.get("signal") or "BEKLE").strip()
+    confidence = float(analysis.get("confidence") or 0)
+    details = analysis.get("confidence_details") or {}
+
+    if signal in HOLD_SIGNALS:
+        return "HOLD", confidence, "already_hold"
+
+    if signal not in BUY_SIGNALS and signal not in SELL_SIGNALS:
+        return "HOLD", confidence, f"unknown_signal_{signal}"
+
+    if not _has_indicators(technical):
+        return "HOLD", confidence, "missing_indicators"
+
+    # MARKET REGIME FILTRESI
+    if market_data:
+        btc_change = market_data.get("btc_change_24h", 0) or 0
+        fear_greed = market_data.get("fear_greed", 50) or 50
+
+        # BTC düşüşteyken AL verme
+        if signal in BUY_SIGNALS and btc_change < -3:
+            return "HOLD", confidence, f"btc_downtrend_{btc_change:.1f}%"
+
+        # Bear market'te AL için ekstra kontrol
+        if signal in BUY_SIGNALS and btc_change < -5 and fear_greed < 30:
+            if confidence < 90:
+                return "HOLD", confidence, "bear_market_blocks_buy"
+
+    # CROWDING PROTECTION
+    if futures_data:
+        ls_ratio = futures_data.get("long_short_ratio", 1.0) or 1.0
+        funding_rate = futures_data.get("funding_rate", 0.0) or 0.0
+
+        # Herkes long'dayken AL verme
+        if signal in BUY_SIGNALS and ls_ratio > 2.5:
+            return "HOLD", confidence, f"crowded_long_{ls_ratio:.2f}"
+
+        # Herkes short'dayken SAT verme
+        if signal in SELL_SIGNALS and ls_ratio < 0.5:
+            return "HOLD", confidence, f"crowded_short_{ls_ratio:.2f}"
+
+        # Yüksek funding rate'de long açma
+        if signal in BUY_SIGNALS and funding_rate > 0.1:
+            return "HOLD", confidence, f"high_funding_{funding_rate:.4f}"
+
+    # CONFIDENCE THRESHOLD
+    risk = _norm_risk(risk_level)
+    threshold = MIN_CONFIDENCE_FOR_TRADE + (HIGH_RISK_CONFIDENCE_PENALTY if risk == "HIGH" else 0)
+
+    if confidence < threshold:
+        return "HOLD", confidence, f"low_confidence_{confidence:.1f}<{threshold}"
+
+    # FAKTÖR UYUMU
+    alignment = _extract_alignment(details)
+    if alignment < MIN_FACTOR_ALIGNMENT:
+        return "HOLD", confidence, f"low_alignment_{alignment}<{MIN_FACTOR_ALIGNMENT}"
+
+    return signal, confidence, "passed"
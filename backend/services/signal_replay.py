@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Point-in-Time Signal Replay
+==========================================
+Üretim sinyal hattını geçmiş üzerinde gün gün tekrar oynatır:
+
+    IndicatorState (90 günlük pencere, artımlı) -> generate_signal
+    -> calculate_risk_level -> should_emit_signal -> filter_top_signals
+    -> calculate_exit_strategy -> find_exits (1h mumlar)
+
+Look-ahead yok:
+- Günlük mumlar yerel candle store'daki 1h mumlardan türetilir; bir gün
+  sadece 23:00 mumu kapandıktan sonra (gün sonu) indikatörlere girer
+- Sinyal gün sonunda üretilir, giriş bir sonraki 1h mumun açılışından
+- BTC 24s/7g değişimi (rejim + quality gate) aynı gün sonuna kadarki veriden
+
+Tarihsel karşılığı olmayan girdiler: futures ve haber sentiment'i yok
+(None), fear & greed sabit (varsayılan 50 = nötr).
+
+Performans: sembol başına tek okuma + tek geçiş (process pool'da paralel;
+BACKTEST_WORKERS yoksa tek spawn process - API thread'inde çalışmaz), günlük
+top-N filtresi sadece quality gate'i geçen adaylar üzerinde çalışır.
+Aynı sembolde açık pozisyon varken gelen yeni sinyal işleme girmez.
+"""
+
+import asyncio
+from collections import defaultdict
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.analysis_service import analysis_service, get_market_regime
+from services.backtest_engine import (
+    BACKTEST_INTERVAL,
+    EXIT_REASONS,
+    MAX_HOLD_BARS,
+    BacktestEngine,
+    BacktestResult,
+    KlineSeries,
+    find_exits,
+    run_in_process,
+)
+from services.candle_store import INTERVAL_MS, candle_store
+from services.indicator_state import IndicatorState
+from services.portfolio_sim import PortfolioConfig, TradeTape, load_marks, simulate_portfolio
+from services.signal_quality import (
+    BUY_SIGNALS,
+    MAX_ACTIVE_SIGNALS,
+    SELL_SIGNALS,
+    filter_top_signals,
+    should_emit_signal,
+)
+
+HISTORY_DAYS = 90            # worker_signals ile aynı (fetch_historical_prices days=90)
+DAY_MS = INTERVAL_MS["1d"]
+HOUR_MS = INTERVAL_MS["1h"]
+MARKET_SYMBOL = "BTC"
+MAX_REPLAY_SYMBOLS = 500
+HOLD_BARS = {"1d": MAX_HOLD_BARS, "1w": MAX_HOLD_BARS * 4}
+
+
+def daily_closes(series: KlineSeries) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    1h mumlardan kapanmış günlük kapanışlar.
+    Returns: (gün açılış ms, kapanış) - son mumu 23:00 olmayan günler atlanır
+    """
+    if not len(series):
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    day = series.times // DAY_MS
+    last = np.flatnonzero(np.r_[day[1:] != day[:-1], True])
+    closed = series.times[last] + HOUR_MS == (day[last] + 1) * DAY_MS
+    last = last[closed]
+    return day[last] * DAY_MS, series.close[last]
+
+
+def market_changes(days: np.ndarray, closes: np.ndarray) -> Dict[int, Tuple[float, float]]:
+    """Gün -> (BTC 24s değişim %, 7g değişim %) - o gün sonuna kadarki veriden"""
+    out = {}
+    for i, day_ms in enumerate(days.tolist()):
+        change_24h = (closes[i] / closes[i - 1] - 1) * 100 if i >= 1 else 0.0
+        change_7d = (closes[i] / closes[i - 7] - 1) * 100 if i >= 7 else 0.0
+        out[day_ms] = (float(change_24h), float(change_7d))
+    return out
+
+
+GATE_REASON_PREFIXES = (
+    "low_confidence", "low_alignment", "btc_downtrend", "crowded_long", "crowded_short", "high_funding"
+)
+
+
+def gate_reason_key(reason: str) -> str:
+    """Quality gate nedenini sayısal ek olmadan grupla (low_confidence_55<60 -> low_confidence)"""
+    for prefix in GATE_REASON_PREFIXES:
+        if reason.startswith(prefix):
+            return prefix
+    return reason
+
+
+def replay_symbol(
+    symbol: str,
+    load_start_ms: int,
+    start_ms: int,
+    end_ms: int,
+    load_end_ms: int,
+    market: Dict[int, Tuple[float, float]],
+    timeframe: str = "1d",
+    fear_greed: int = 50
+) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Tek sembol (pool worker veya thread): her gün sonunda üretim skorlaması,
+    quality gate'i geçen sinyaller için çıkış simülasyonu.
+    Returns: (adaylar, quality gate istatistikleri)
+    """
+    candles = candle_store.read_range(symbol, BACKTEST_INTERVAL, load_start_ms, load_end_ms)
+    series = KlineSeries(symbol, BACKTEST_INTERVAL, candles, load_start_ms, load_end_ms)
+    days, closes = daily_closes(series)
+
+    stats: Dict[str, int] = defaultdict(int)
+    state = IndicatorState(HISTORY_DAYS)
+    pending = []  # (gün, sinyal, analiz, exit strategy, giriş index'i)
+
+    for day_ms, close in zip(days.tolist(), closes.tolist()):
+        state.update(day_ms, close)
+        signal_ms = day_ms + DAY_MS
+        if signal_ms <= start_ms:
+            continue
+        if signal_ms > end_ms:
+            break
+
+        technical = analysis_service.calculate_indicators_from_state(state)
+        btc_change_24h, btc_change_7d = market.get(day_ms, (0.0, 0.0))
+        analysis = analysis_service.generate_signal(
+            technical, None, None, get_market_regime(btc_change_7d, fear_greed)
+        )
+        if analysis["signal"] not in BUY_SIGNALS and analysis["signal"] not in SELL_SIGNALS:
+            continue
+
+        risk = analysis_service.calculate_risk_level(symbol, technical)
+        market_data = {"btc_change_24h": btc_change_24h, "fear_greed": fear_greed}
+        final_signal, _, reason = should_emit_signal(analysis, risk["level"], technical, market_data, None)
+        stats[gate_reason_key(reason)] += 1
+        if reason != "passed":
+            continue
+
+        entry = int(np.searchsorted(series.times, signal_ms, side="left"))
+        if entry >= len(series):
+            continue
+        exit_strategy = analysis_service.calculate_exit_strategy(
+            float(series.open[entry]), final_signal, analysis["confidence"], technical,
+            risk["category"], timeframe
+        )
+        pending.append((day_ms, final_signal, analysis, exit_strategy, entry, risk["category"]))
+
+    if not pending:
+        return [], dict(stats)
+
+    entries = np.array([p[4] for p in pending])
+    prices = series.open[entries]
+    is_long = np.array([p[1] in BUY_SIGNALS for p in pending])
+    exit_indexes, exit_prices, reasons = find_exits(
+        series.high, series.low, series.close,
+        entries, np.full(len(pending), len(series)),
+        prices,
+        np.array([p[3]["stop_loss"] for p in pending], dtype=np.float64),
+        np.array([p[3]["take_profit"] for p in pending], dtype=np.float64),
+        np.array([p[3]["trailing_stop"] for p in pending], dtype=np.float64),
+        is_long,
+        HOLD_BARS.get(timeframe, MAX_HOLD_BARS)
+    )
+
+    candidates = []
+    for n, (day_ms, final_signal, analysis, exit_strategy, entry, category) in enumerate(pending):
+        entry_price = float(prices[n])
+        exit_index = int(exit_indexes[n])
+        exit_price = float(exit_prices[n])
+        exit_reason = EXIT_REASONS[reasons[n]]
+        direction = 1 if is_long[n] else -1
+        profit_loss_pct = (exit_price - entry_price) / entry_price * 100 * direction
+        exit_time = series.close_time(exit_index)
+
+        candidates.append({
+            # filter_top_signals'ın okuduğu alanlar (üretim sinyal dict'i ile aynı)
+            "signal": final_signal,
+            "confidence": analysis["confidence"],
+            "confidence_details": analysis["confidence_details"],
+            "quality_gate": {"passed": True},
+            "risk_reward_ratio": exit_strategy["risk_reward_ratio"],
+            "day": day_ms,
+            "entry_ms": int(series.times[entry]),
+            "exit_ms": int(series.times[exit_index]),
+            "result": BacktestResult(
+                symbol=symbol,
+                entry_date=series.open_time(entry).strftime("%Y-%m-%d %H:%M"),
+                entry_price=entry_price,
+                signal_type=final_signal,
+                stop_loss=exit_strategy["stop_loss"],
+                take_profit=exit_strategy["take_profit"],
+                exit_date=exit_time.strftime("%Y-%m-%d %H:%M"),
+                exit_price=exit_price,
+                exit_reason=exit_reason,
+                profit_loss_pct=round(profit_loss_pct, 2),
+                is_successful=(exit_reason in ["TAKE_PROFIT", "TRAILING_STOP"] and profit_loss_pct > 0),
+                hold_duration_hours=int((exit_time - series.open_time(entry)).total_seconds() / 3600),
+                confidence=analysis["confidence"],
+                category=category
+            ),
+        })
+    return candidates, dict(stats)
+
+
+def select_trades(by_symbol: Dict[str, List[Dict]], max_signals: int = MAX_ACTIVE_SIGNALS) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Gün başına filter_top_signals (üretimdeki gibi tüm coinler arasında),
+    sonra sembol başına açık pozisyon varken gelen sinyalleri atla.
+    """
+    by_day: Dict[int, Dict[str, Dict]] = defaultdict(dict)
+    for symbol, candidates in by_symbol.items():
+        for candidate in candidates:
+            by_day[candidate["day"]][symbol] = candidate
+
+    counts = {"filtered_top_n": 0, "skipped_open_position": 0}
+    open_until: Dict[str, int] = {}
+    trades = []
+    for day_ms in sorted(by_day):
+        signals = by_day[day_ms]
+        kept = filter_top_signals(signals, max_signals)
+        counts["filtered_top_n"] += len(signals) - len(kept)
+        for symbol in sorted(kept):
+            candidate = kept[symbol]
+            if candidate["entry_ms"] <= open_until.get(symbol, -1):
+                counts["skipped_open_position"] += 1
+                continue
+            open_until[symbol] = candidate["exit_ms"]
+            trades.append(candidate)
+    return trades, counts
+
+
+async def stream_replay(
+    symbols: List[str],
+    start_date: datetime,
+    end_date: datetime,
+    timeframe: str = "1d",
+    fear_greed: int = 50,
+    max_signals: int = MAX_ACTIVE_SIGNALS,
+    portfolio: Optional[PortfolioConfig] = None
+) -> AsyncIterator[Dict]:
+    """
+    Her sembol bitince "progress", sonunda özet + işlemlerle "result" olayı.
+    portfolio verilirse tüm işlemler ortak sermayeyle de simüle edilir.
+    """
+    hold = timedelta(hours=HOLD_BARS.get(timeframe, MAX_HOLD_BARS) + 24)
+    load_start = start_date - timedelta(days=HISTORY_DAYS + 1)
+    load_end = end_date + hold
+    engine = BacktestEngine()
+    await engine.preload(list(dict.fromkeys([MARKET_SYMBOL, *symbols])), load_start, load_end)
+
+    load_start_ms = int(load_start.timestamp() * 1000)
+    start_ms = int(start_date.timestamp() * 1000)
+    end_ms = int(end_date.timestamp() * 1000)
+    load_end_ms = int(load_end.timestamp() * 1000)
+
+    btc = candle_store.read_range(MARKET_SYMBOL, BACKTEST_INTERVAL, load_start_ms, end_ms)
+    market = market_changes(*daily_closes(KlineSeries(MARKET_SYMBOL, BACKTEST_INTERVAL, btc)))
+
+    async def run(symbol: str):
+        try:
+            # Saf Python gün döngüsü: API thread'inde GIL'i tutmasın diye her zaman ayrı process
+            replayed = await run_in_process(
+                replay_symbol, symbol, load_start_ms, start_ms, end_ms, load_end_ms,
+                market, timeframe, fear_greed
+            )
+        except Exception as e:
+            print(f"[Replay] {symbol} error: {e}")
+            replayed = ([], {})
+        return symbol, replayed
+
+    by_symbol: Dict[str, List[Dict]] = {}
+    gate: Dict[str, int] = defaultdict(int)
+    for finished in asyncio.as_completed([run(symbol) for symbol in symbols]):
+        symbol, (candidates, stats) = await finished
+        by_symbol[symbol] = candidates
+        for reason, count in stats.items():
+            gate[reason] += count
+        yield {"type": "progress", "done": len(by_symbol), "total": len(symbols),
+               "symbol": symbol, "candidates": len(candidates)}
+
+    trades, counts = select_trades(by_symbol, max_signals)
+    results = [t["result"] for t in trades if t["result"].exit_reason != "INCOMPLETE"]
+    results.sort(key=lambda r: (r.entry_date, r.symbol))
+    summary = engine.calculate_summary(results)
+    tape = TradeTape.from_results(results)
+
+    signal_counts: Dict[str, int] = defaultdict(int)
+    for r in results:
+        signal_counts[r.signal_type] += 1
+
+    yield {
+        "type": "result",
+        "summary": asdict(summary) if summary else None,
+        "results": [asdict(r) for r in results[-50:]],
+        "total_results": len(results),
+        "signals": dict(signal_counts),
+        "quality_gate": dict(gate),
+        **counts,
+        "portfolio": simulate_portfolio(tape, portfolio, load_marks(tape)) if portfolio else None,
+        "config": {
+            "symbols": len(symbols),
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+            "timeframe": timeframe,
+            "fear_greed": fear_greed,
+            "max_signals": max_signals,
+        },
+    }
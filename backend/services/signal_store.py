@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Signal Store
+===========================
+Normalize edilmiş çoklu timeframe sinyal deposu.
+
+Her coinin ortak (timeframe'den bağımsız) kaydı bir kez, timeframe başına
+sadece küçük exit strategy kaydı saklanır. Okuyucular ikisini ihtiyaç
+duydukları sinyaller için birleştirir (join_timeframe).
+
+Redis anahtarları:
+- signals_base       : HASH   symbol -> base sinyal JSON (technical, reasons, ...)
+- signals_exits:{tf} : HASH   symbol -> exit strategy JSON (tf'deki sinyaller)
+- signals_timeframes : STRING {tf: {label, stats, risk_stats, count}}
+- signals_idx:{tf}:{group}:{field} : ZSET symbol -> sıralama alanı
+      group = ALL | BUY | SELL | HOLD (sinyal tipi üyeliği)
+      field = market_cap | change_24h | confidence | score
+- signals_stats / signals_risk_stats : 1d istatistikleri (geriye uyumluluk)
+
+/api/signals filtre + sıralamayı tek ZREVRANGE ile yapar, sadece dönen
+sayfanın kayıtlarını okur.
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import redis_client
+
+BASE_KEY = "signals_base"
+EXITS_KEY_PREFIX = "signals_exits"
+TIMEFRAMES_KEY = "signals_timeframes"
+LEGACY_KEYS = ("signals_all_timeframes", "signals_data")
+
+INDEX_KEY_PREFIX = "signals_idx"
+
+PRIMARY_TIMEFRAME = "1d"
+
+SORT_FIELDS = ("market_cap", "change_24h", "confidence", "score")
+SIGNAL_GROUPS = {
+    "BUY": ("BUY", "STRONG_BUY"),
+    "SELL": ("SELL", "STRONG_SELL"),
+    "HOLD": ("HOLD",),
+}
+ALL_GROUP = "ALL"
+
+
+def exits_key(timeframe: str) -> str:
+    return f"{EXITS_KEY_PREFIX}:{timeframe}"
+
+
+def index_key(timeframe: str, field: str, group: str = ALL_GROUP) -> str:
+    return f"{INDEX_KEY_PREFIX}:{timeframe}:{group}:{field}"
+
+
+def signal_group(signal: Optional[str]) -> Optional[str]:
+    """STRONG_BUY -> BUY, STRONG_SELL -> SELL, HOLD -> HOLD"""
+    for group, members in SIGNAL_GROUPS.items():
+        if signal in members:
+            return group
+    return None
+
+
+def _sort_value(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def join_timeframe(base: Dict, timeframe: str, exit_strategy: Dict,
+                   label: Optional[str] = None) -> Dict:
+    """Base kayıt + timeframe exit strategy -> tam sinyal dict'i"""
+    result = base.copy()
+    result["timeframe"] = timeframe
+    result["timeframe_label"] = label or timeframe
+    result["exit_strategy"] = exit_strategy
+    result["stop_loss"] = exit_strategy.get("stop_loss")
+    result["take_profit"] = exit_strategy.get("take_profit")
+    result["trailing_stop"] = exit_strategy.get("trailing_stop")
+    result["risk_reward_ratio"] = exit_strategy.get("risk_reward_ratio")
+    result["stop_loss_pct"] = exit_strategy.get("stop_loss_pct")
+    result["take_profit_pct"] = exit_strategy.get("take_profit_pct")
+    return result
+
+
+class SignalStore:
+    """signals_base + signals_exits:{tf} üzerinde okuma/yazma"""
+
+    def __init__(self, client):
+        self.r = client
+
+    # ============================================
+    # WRITER (signal worker)
+    # ============================================
+
+    def publish(self, bases: Dict[str, Dict], exits: Dict[str, Dict[str, Dict]],
+                timeframes: Dict[str, Dict], updated_at: str, count: int):
+        """
+        Tüm sinyal setini tek transaction içinde değiştir.
+        bases: {symbol: base}, exits: {tf: {symbol: exit_strategy}},
+        timeframes: {tf: {label, stats, risk_stats, count}}
+        """
+        primary = timeframes.get(PRIMARY_TIMEFRAME, {})
+
+        pipe = self.r.pipeline(transaction=True)
+        pipe.delete(BASE_KEY, *LEGACY_KEYS)
+        if bases:
+            pipe.hset(BASE_KEY, mapping={s: json.dumps(b) for s, b in bases.items()})
+        for tf, tf_exits in exits.items():
+            pipe.delete(exits_key(tf))
+            if tf_exits:
+                pipe.hset(exits_key(tf), mapping={s: json.dumps(e) for s, e in tf_exits.items()})
+            self._write_indexes(pipe, tf, {s: bases[s] for s in tf_exits})
+        pipe.set(TIMEFRAMES_KEY, json.dumps(timeframes))
+        pipe.set("signals_stats", json.dumps(primary.get("stats", {})))
+        pipe.set("signals_risk_stats", json.dumps(primary.get("risk_stats", {})))
+        pipe.set("signals_updated", updated_at)
+        pipe.set("signals_count", str(count))
+        pipe.execute()
+
+    def _write_indexes(self, pipe, timeframe: str, signals: Dict[str, Dict]):
+        """Sıralama alanı x sinyal tipi başına ZSET indeksleri"""
+        groups: Dict[str, List[str]] = {ALL_GROUP: list(signals)}
+        for group in SIGNAL_GROUPS:
+            groups[group] = []
+        for symbol, sig in signals.items():
+            group = signal_group(sig.get("signal"))
+            if group:
+                groups[group].append(symbol)
+
+        for field in SORT_FIELDS:
+            for group, symbols in groups.items():
+                key = index_key(timeframe, field, group)
+                pipe.delete(key)
+                if symbols:
+                    pipe.zadd(key, {s: _sort_value(signals[s].get(field)) for s in symbols})
+
+    # ============================================
+    # READERS (API)
+    # ============================================
+
+    def page(self, timeframe: str, sort_by: str = "market_cap", group: str = ALL_GROUP,
+             limit: int = 100, offset: int = 0, search: Optional[str] = None) -> Tuple[List[str], int, Dict]:
+        """
+        İndeksten sıralı sembol sayfası (kayıt okumadan).
+        Returns: (symbols, timeframe'deki toplam sinyal, timeframe meta)
+        """
+        key = index_key(timeframe, sort_by, group)
+        pipe = self.r.pipeline(transaction=False)
+        pipe.get(TIMEFRAMES_KEY)
+        pipe.zcard(index_key(timeframe, sort_by))
+        if search:
+            pipe.zrevrange(key, 0, -1)
+        else:
+            pipe.zrevrange(key, offset, offset + limit - 1)
+        meta_raw, total, symbols = pipe.execute()
+
+        if search:
+            needle = search.lower()
+            symbols = [s for s in symbols if needle in s.lower()][offset:offset + limit]
+
+        meta = json.loads(meta_raw) if meta_raw else {}
+        return symbols, total, meta.get(timeframe, {})
+
+    def get_joined(self, timeframe: str, symbols: List[str], label: Optional[str] = None) -> List[Dict]:
+        """Verilen sırada birleştirilmiş sinyaller (base + timeframe exit)"""
+        if not symbols:
+            return []
+        pipe = self.r.pipeline(transaction=False)
+        pipe.hmget(BASE_KEY, symbols)
+        pipe.hmget(exits_key(timeframe), symbols)
+        base_raws, exit_raws = pipe.execute()
+        return [
+            join_timeframe(json.loads(base_raw), timeframe, json.loads(exit_raw), label)
+            for base_raw, exit_raw in zip(base_raws, exit_raws)
+            if base_raw and exit_raw
+        ]
+
+    def get_timeframes(self) -> Dict[str, Dict]:
+        """Timeframe başına label/stats/risk_stats/count"""
+        raw = self.r.get(TIMEFRAMES_KEY)
+        return json.loads(raw) if raw else {}
+
+    def get_exits(self, timeframe: str) -> Dict[str, Dict]:
+        """Timeframe'deki sembollerin exit strategy'leri"""
+        raws = self.r.hgetall(exits_key(timeframe))
+        return {s: json.loads(raw) for s, raw in raws.items()}
+
+    def get_bases(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Base kayıtlar (symbols verilmezse hepsi)"""
+        if symbols is None:
+            raws = self.r.hgetall(BASE_KEY)
+            return {s: json.loads(raw) for s, raw in raws.items()}
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        raws = self.r.hmget(BASE_KEY, symbols)
+        return {s: json.loads(raw) for s, raw in zip(symbols, raws) if raw}
+
+    def get_timeframe(self, timeframe: str = PRIMARY_TIMEFRAME) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """
+        Timeframe'in base kayıtları ve exit strategy'leri (birleştirmeden).
+        Returns: ({symbol: base}, {symbol: exit_strategy})
+        """
+        exits = self.get_exits(timeframe)
+        return self.get_bases(exits.keys()), exits
+
+    def get_signals(self, timeframe: str = PRIMARY_TIMEFRAME) -> Dict[str, Dict]:
+        """Timeframe'in tüm sinyalleri (birleştirilmiş, eski signals_data formatı)"""
+        bases, exits = self.get_timeframe(timeframe)
+        label = self.get_timeframes().get(timeframe, {}).get("label")
+        return {
+            s: join_timeframe(base, timeframe, exits[s], label)
+            for s, base in bases.items()
+        }
+
+    def get_signal(self, symbol: str, timeframe: str = PRIMARY_TIMEFRAME) -> Optional[Dict]:
+        """Tek coin, tek timeframe"""
+        pipe = self.r.pipeline(transaction=False)
+        pipe.hget(BASE_KEY, symbol)
+        pipe.hget(exits_key(timeframe), symbol)
+        base_raw, exit_raw = pipe.execute()
+        if not base_raw or not exit_raw:
+            return None
+        label = self.get_timeframes().get(timeframe, {}).get("label")
+        return join_timeframe(json.loads(base_raw), timeframe, json.loads(exit_raw), label)
+
+    def get_coin_timeframes(self, symbol: str, timeframes: List[str]) -> Dict[str, Dict]:
+        """Tek coinin bulunduğu tüm timeframe'lerdeki sinyalleri"""
+        pipe = self.r.pipeline(transaction=False)
+        pipe.hget(BASE_KEY, symbol)
+        pipe.get(TIMEFRAMES_KEY)
+        for tf in timeframes:
+            pipe.hget(exits_key(tf), symbol)
+        base_raw, meta_raw, *exit_raws = pipe.execute()
+        if not base_raw:
+            return {}
+
+        base = json.loads(base_raw)
+        meta = json.loads(meta_raw) if meta_raw else {}
+        return {
+            tf: join_timeframe(base, tf, json.loads(raw), meta.get(tf, {}).get("label"))
+            for tf, raw in zip(timeframes, exit_raws) if raw
+        }
+
+
+# Singleton instance (API process)
+signal_store = SignalStore(redis_client)
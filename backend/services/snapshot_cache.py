@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Snapshot Cache
+=============================
+API process'i için versiyonlu Redis blob cache'i.
+
+Her istek önce ucuz *_updated versiyon anahtarını okur; blob sadece
+versiyon değiştiğinde çekilip parse edilir. Parse edilen nesne tüm
+handler'lara paylaşılır:
+
+- Üst seviye MappingProxyType (salt okunur); iç dict'ler de paylaşımlıdır,
+  handler'lar değiştirmemeli (gerekirse kopyalamalı)
+- Single-flight: aynı snapshot'ı aynı anda yükleyen thread'ler tek parse bekler
+- Versiyon anahtarı yoksa her çağrıda yeniden yüklenir (eski veri tutulmaz)
+"""
+
+import json
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from database import redis_client
+from services.market_context import MarketContext
+from services.news_index import NewsIndex
+
+EMPTY_MAPPING: Mapping = MappingProxyType({})
+
+# blob anahtarı -> yazıcının blob'dan SONRA güncellediği versiyon anahtarı
+SNAPSHOT_VERSION_KEYS = {
+    "prices_data": "prices_data_updated",
+    "futures_data": "futures_updated",
+    "news_db": "news_updated",
+    "fear_greed": "sentiment_updated",
+    "fx_rates": "sentiment_updated",
+}
+
+
+class SnapshotCache:
+    """*_updated versiyonuna bağlı, process içi parse edilmiş snapshot'lar"""
+
+    def __init__(self, client):
+        self.r = client
+        self._entries: Dict[str, Tuple[Optional[str], Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, name: str) -> threading.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(name, threading.Lock())
+        return lock
+
+    def get_or_load(self, name: str, version_key: str, loader: Callable[[], Any],
+                    default: Any = EMPTY_MAPPING) -> Any:
+        """
+        version_key değişmediyse cache'teki nesne, değiştiyse loader() sonucu.
+        Yükleme hatasında son başarılı nesne (yoksa default) döner.
+        """
+        entry = self._entries.get(name)
+        try:
+            version = self.r.get(version_key)
+        except Exception as e:
+            print(f"[SnapshotCache] {version_key} read error: {e}")
+            return entry[1] if entry else default
+
+        if entry is not None and version is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock(name):
+            # Beklerken başka bir istek yüklemiş olabilir
+            entry = self._entries.get(name)
+            if entry is not None and version is not None and entry[0] == version:
+                return entry[1]
+            try:
+                value = loader()
+            except Exception as e:
+                print(f"[SnapshotCache] {name} load error: {e}")
+                return entry[1] if entry else default
+            # Blob versiyondan önce yazıldığı için value en az 'version' kadar yeni
+            self._entries[name] = (version, value)
+            return value
+
+    def get(self, key: str) -> Mapping:
+        """Kayıtlı JSON blob (salt okunur mapping, yoksa boş)"""
+        return self.get_or_load(key, SNAPSHOT_VERSION_KEYS[key], lambda: self._load_blob(key))
+
+    def _load_blob(self, key: str) -> Mapping:
+        raw = self.r.get(key)
+        return MappingProxyType(json.loads(raw)) if raw else EMPTY_MAPPING
+
+    def news_index(self) -> NewsIndex:
+        """news_db üzerinde coin -> haber indeksi (news_db ile aynı versiyon)"""
+        return self.get_or_load(
+            "news_index", SNAPSHOT_VERSION_KEYS["news_db"],
+            lambda: NewsIndex(self.get("news_db")),
+            default=NewsIndex(EMPTY_MAPPING)
+        )
+
+    def market_context(self, btc: Optional[Dict] = None) -> MarketContext:
+        """Snapshot'lardan paylaşılan piyasa bağlamı (blob'lar yeniden parse edilmez)"""
+        return MarketContext.build(
+            fear_greed=self.get("fear_greed"),
+            btc=btc,
+            futures=self.get("futures_data"),
+            news_index=self.news_index(),
+        )
+
+
+# Singleton instance (API process)
+snapshot_cache = SnapshotCache(redis_client)
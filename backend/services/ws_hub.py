@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - WebSocket Fan-out Hub
+====================================
+Bağlantı başına sınırlı giden kuyruk + writer task.
+
+- Yayın yapan taraf asla client'ı beklemez: frame kuyruğa eklenir, her
+  bağlantının kendi writer task'ı gönderir (yavaş client diğerlerini durdurmaz)
+- Kuyruk doluysa bekleyen fiyat frame'leri atılır ve client resync'e işaretlenir
+  (bir sonraki turda snapshot alır); kontrol frame'leri atılmaz
+- Fiyat delta'ları tur başına bir kez hesaplanır; aynı sembol kümesini
+  izleyen client'lar aynı encode edilmiş gövdeyi paylaşır (sadece seq başlığı
+  client'a özel)
+- Okumayan / gönderimi zaman aşımına uğrayan client hub'dan çıkarılır ve
+  soketi 1013 (try again later) ile kapatılır; endpoint client.closing'i
+  görünce mesaj döngüsünden çıkar
+- Kuyruk derinliği, atılan frame ve yavaş bağlantı metrikleri: stats()
+"""
+
+import asyncio
+import json
+from collections import deque
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+from fastapi import WebSocket
+
+# Delta frame'lerde izlenen alanlar
+STREAM_FIELDS = ("price", "change_24h", "change_instant")
+TOP_CHANNEL = "top"
+TOP_N = 50
+MAX_SUBSCRIBED_COINS = 200
+
+QUEUE_MAX_FRAMES = 64        # Bağlantı başına bekleyen frame limiti
+SEND_TIMEOUT = 10            # Tek frame için saniye; aşılırsa bağlantı kapatılır
+CLOSE_SLOW_CLIENT = 1013     # WebSocket close kodu: try again later
+
+FRAME_PRICE = "price"        # Atılabilir (resync ile telafi edilir)
+FRAME_CONTROL = "control"    # Atılmaz (init, pong, subscribed, bildirimler)
+
+
+class WSClient:
+    """
+    Bağlı client: abonelik, seq ve giden kuyruk.
+    - symbols: abone olunan coinler, channels: {"top"} = market cap ilk 50
+    - seq: her fiyat frame'inde bir artar; client boşluk görürse resync ister
+    """
+
+    __slots__ = ("ws", "hub", "symbols", "channels", "seq", "needs_resync",
+                 "queue", "_wakeup", "writer", "dropped", "sent", "closing", "_closer")
+
+    def __init__(self, ws: WebSocket, hub: "FanoutHub"):
+        self.ws = ws
+        self.hub = hub
+        self.symbols: Set[str] = set()
+        self.channels: Set[str] = {TOP_CHANNEL}  # Abone olmayan client'lar: top 50 akışı
+        self.seq = 0
+        self.needs_resync = False
+        self.queue: deque = deque()
+        self._wakeup = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.sent = 0
+        self.closing = False  # Hub bağlantıyı kapattı; endpoint döngüden çıkmalı
+        self._closer: Optional[asyncio.Task] = None
+
+    # ============================================
+    # SUBSCRIPTION
+    # ============================================
+
+    def interested(self, top_coins: Set[str]) -> Set[str]:
+        if TOP_CHANNEL in self.channels:
+            return self.symbols | top_coins
+        return self.symbols
+
+    def subscribe(self, coins: Iterable[str], channels: Optional[Iterable[str]] = None):
+        wanted = {str(c).upper() for c in coins if c}
+        self.symbols = set(list(wanted)[:MAX_SUBSCRIBED_COINS])
+        if channels is not None:
+            self.channels = {c for c in channels if c == TOP_CHANNEL}
+        elif self.symbols:
+            self.channels = set()  # Sadece seçilen coinler
+
+    def unsubscribe(self, coins: Iterable[str]):
+        self.symbols -= {str(c).upper() for c in coins}
+
+    # ============================================
+    # OUTBOUND QUEUE
+    # ============================================
+
+    def send(self, message: Dict):
+        """Kontrol mesajı (atılmaz)"""
+        self.enqueue(json.dumps(message), FRAME_CONTROL)
+
+    def enqueue(self, frame: str, kind: str = FRAME_CONTROL) -> bool:
+        """
+        Frame'i kuyruğa ekle (bloklamaz).
+        Returns: eklendi mi
+        """
+        if self.closing:
+            return False
+        if len(self.queue) >= QUEUE_MAX_FRAMES:
+            self._drop_price_frames()
+            if kind == FRAME_PRICE or len(self.queue) >= QUEUE_MAX_FRAMES:
+                if kind == FRAME_PRICE:
+                    self._count_drop(1)
+                else:
+                    # Sadece kontrol frame'leriyle dolu - client okumuyor
+                    self.hub.metrics["slow_disconnects"] += 1
+                    self.hub.remove(self, CLOSE_SLOW_CLIENT)
+                return False
+
+        self.queue.append((kind, frame))
+        self._wakeup.set()
+        return True
+
+    def _drop_price_frames(self):
+        kept = deque(item for item in self.queue if item[0] != FRAME_PRICE)
+        dropped = len(self.queue) - len(kept)
+        if dropped:
+            # Atılan fiyat frame'leri kuyruğun en yüksek seq'leri; seq geri sarılır
+            self.queue = kept
+            self.seq -= dropped
+            self._count_drop(dropped)
+
+    def _count_drop(self, count: int):
+        self.dropped += count
+        self.hub.metrics["price_frames_dropped"] += count
+        # Delta zinciri koptu - sonraki turda snapshot
+        self.needs_resync = True
+
+    async def _write_loop(self):
+        try:
+            while True:
+                if not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                _, frame = self.queue.popleft()
+                await asyncio.wait_for(self.ws.send_text(frame), timeout=SEND_TIMEOUT)
+                self.sent += 1
+                self.hub.metrics["frames_sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.hub.metrics["slow_disconnects"] += 1
+            self.hub.remove(self, CLOSE_SLOW_CLIENT)
+        except Exception:
+            self.hub.remove(self)
+
+    def start(self):
+        self.writer = asyncio.create_task(self._write_loop())
+
+    def stop(self):
+        if self.writer and not self.writer.done() and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        self.queue.clear()
+
+    def close(self, code: int):
+        """Soketi kapat (bloklamaz; kapanış frame'i de SEND_TIMEOUT ile sınırlı)"""
+        self.closing = True
+        if self._closer is None:
+            self._closer = asyncio.create_task(self._close(code))
+
+    async def _close(self, code: int):
+        try:
+            await asyncio.wait_for(self.ws.close(code=code), timeout=SEND_TIMEOUT)
+        except Exception:
+            pass
+
+
+class FanoutHub:
+    """Bağlı client'lar ve fiyat yayın durumu (API process'i başına bir tane)"""
+
+    def __init__(self):
+        self.clients: Dict[WebSocket, WSClient] = {}
+        self.latest_fields: Dict[str, Dict] = {}  # Son yayınlanan alan değerleri
+        self.top_coins: Set[str] = set()
+        self.metrics = {
+            "frames_sent": 0,
+            "price_frames_dropped": 0,
+            "slow_disconnects": 0,
+            "resyncs": 0,
+            "price_ticks": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def add(self, ws: WebSocket) -> WSClient:
+        client = self.clients[ws] = WSClient(ws, self)
+        client.start()
+        return client
+
+    def remove(self, client: WSClient, close_code: Optional[int] = None):
+        """Client'ı çıkar; close_code verilirse soket de kapatılır"""
+        if self.clients.get(client.ws) is client:
+            del self.clients[client.ws]
+        client.stop()
+        if close_code is not None:
+            client.close(close_code)
+
+    # ============================================
+    # PUBLISH
+    # ============================================
+
+    def broadcast(self, message: Dict):
+        """Tüm client'lara kontrol mesajı (bir kez encode)"""
+        frame = json.dumps(message)
+        for client in list(self.clients.values()):
+            client.enqueue(frame, FRAME_CONTROL)
+
+    def apply_quotes(self, quotes: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Yeni quote'ları son yayınlanan değerlerle karşılaştır.
+        Returns: {symbol: değişen alanlar}
+        """
+        changes = {}
+        for symbol, quote in quotes.items():
+            last = self.latest_fields.setdefault(symbol, {})
+            changed = {}
+            for field in STREAM_FIELDS:
+                value = quote.get(field, 0)
+                if last.get(field) != value:
+                    changed[field] = value
+                    last[field] = value
+            if changed:
+                changes[symbol] = changed
+        return changes
+
+    def remove_symbols(self, symbols: Iterable[str]):
+        """
+        Delist edilen sembolleri yayın durumundan düşür (resync snapshot'larında
+        tekrar gönderilmez) ve client'lara bildir.
+        """
+        removed = [s for s in symbols if self.latest_fields.pop(s, None) is not None]
+        self.top_coins.difference_update(removed)
+        if removed:
+            self.broadcast({"type": "price_removed", "symbols": removed})
+
+    def publish_prices(self, changes: Dict[str, Dict]):
+        """Tur delta'sını abonelere dağıt (bloklamaz)"""
+        if not changes:
+            return
+        self.metrics["price_ticks"] += 1
+        now = datetime.utcnow().isoformat()
+        bodies: Dict[FrozenSet[str], str] = {}
+        changed = changes.keys()
+
+        for client in list(self.clients.values()):
+            if client.needs_resync:
+                self.send_snapshot(client)
+                continue
+
+            symbols = frozenset(client.interested(self.top_coins) & changed)
+            if not symbols:
+                continue
+            body = bodies.get(symbols)
+            if body is None:
+                body = bodies[symbols] = json.dumps({s: changes[s] for s in symbols})
+            self._enqueue_prices(client, "price_update", body, now)
+
+    def send_snapshot(self, client: WSClient):
+        """Client'ın izlediği coinlerin son yayınlanan tüm alanları"""
+        symbols = client.interested(self.top_coins)
+        body = json.dumps({s: self.latest_fields[s] for s in symbols if s in self.latest_fields})
+        client.needs_resync = False
+        self.metrics["resyncs"] += 1
+        self._enqueue_prices(client, "snapshot", body, datetime.utcnow().isoformat())
+
+    @staticmethod
+    def _enqueue_prices(client: WSClient, frame_type: str, body: str, now: str):
+        client.seq += 1
+        frame = f'{{"type":"{frame_type}","seq":{client.seq},"time":"{now}","prices":{body}}}'
+        if not client.enqueue(frame, FRAME_PRICE):
+            client.seq -= 1  # Gönderilmeyen frame seq tüketmez; resync snapshot'ı ardışık gelir
+
+    # ============================================
+    # METRICS
+    # ============================================
+
+    def stats(self) -> Dict:
+        depths = [len(c.queue) for c in self.clients.values()]
+        return {
+            "clients": len(self.clients),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "resync_pending": sum(1 for c in self.clients.values() if c.needs_resync),
+            **self.metrics,
+        }
+
+
+# Singleton instance (API process)
+ws_hub = FanoutHub()
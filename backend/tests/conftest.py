@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Shared Test Fixtures
+===================================
+"""
+
+import pytest
+
+import services.backtest_engine as backtest_engine
+from services.candle_store import CandleStore
+
+
+@pytest.fixture
+def backtest_store(tmp_path, monkeypatch):
+    """
+    Backtest engine'in kullandığı boş candle store (tmp dizinde).
+    sync_binance ağa gitmez, sadece çağrı sayısını (store.syncs) tutar.
+    """
+    store = CandleStore(str(tmp_path))
+    store.syncs = 0
+
+    async def sync_binance(*args, **kwargs):
+        store.syncs += 1
+
+    store.sync_binance = sync_binance
+    monkeypatch.setattr(backtest_engine, "candle_store", store)
+    return store
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Backtest Engine Tests
+====================================
+Sentetik mumlarla (ağ yok) backtest veri yolu testleri
+"""
+
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import services.exit_sweep as exit_sweep
+from services.backtest_engine import EXIT_REASONS, BacktestEngine, find_exits
+from services.candle_store import CANDLE_DTYPE
+
+START = datetime(2025, 1, 1)
+HOUR_MS = 3_600_000
+
+
+def make_hourly(count, seed=1):
+    rng = np.random.default_rng(seed)
+    arr = np.zeros(count, dtype=CANDLE_DTYPE)
+    arr["open_time"] = int(START.timestamp() * 1000) + np.arange(count) * HOUR_MS
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = np.r_[100.0, close[:-1]]
+    arr["open"] = open_
+    arr["close"] = close
+    arr["high"] = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, count))
+    arr["low"] = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, count))
+    return arr
+
+
+@pytest.fixture
+def store(backtest_store):
+    backtest_store.append("AAA", "1h", make_hourly(24 * 120))
+    return backtest_store
+
+
+def test_run_loads_each_symbol_once(store):
+    engine = BacktestEngine()
+    report = asyncio.run(engine.run_backtest(["AAA"], datetime(2025, 1, 25), datetime(2025, 3, 25)))
+
+    assert store.syncs == 1
+    assert report["total_results"] == 59
+
+
+def test_run_matches_single_signal_backtests(store):
+    engine = BacktestEngine()
+    report = asyncio.run(engine.run_backtest(["AAA"], datetime(2025, 2, 1), datetime(2025, 2, 6)))
+
+    single = []
+    for day in range(1, 6):
+        fresh = BacktestEngine()
+        result = asyncio.run(fresh.backtest_signal("AAA", datetime(2025, 2, day), "BUY"))
+        single.append(result.profit_loss_pct)
+    assert [r["profit_loss_pct"] for r in report["results"]] == single
+
+
+def reference_exit(high, low, close, entry, end, price, stop, target, trail, is_long, max_bars=168):
+    """Bar-by-bar exit walk (önceki find_exit_point)"""
+    highest = lowest = price
+    pct = abs(price - trail) / price
+    for i in range(entry + 1, min(entry + max_bars + 1, end)):
+        if is_long:
+            if high[i] > highest:
+                highest = high[i]
+                trail = max(trail, highest * (1 - pct))
+            if low[i] <= stop:
+                return i, stop, "STOP_LOSS"
+            if low[i] <= trail and trail > stop:
+                return i, trail, "TRAILING_STOP"
+            if high[i] >= target:
+                return i, target, "TAKE_PROFIT"
+        else:
+            if low[i] < lowest:
+                lowest = low[i]
+                trail = min(trail, lowest * (1 + pct))
+            if high[i] >= stop:
+                return i, stop, "STOP_LOSS"
+            if high[i] >= trail and trail < stop:
+                return i, trail, "TRAILING_STOP"
+            if low[i] <= target:
+                return i, target, "TAKE_PROFIT"
+    if entry + max_bars < end:
+        return entry + max_bars, close[entry + max_bars], "TIME_EXPIRED"
+    return end - 1, close[end - 1], "INCOMPLETE"
+
+
+def test_vectorized_exits_match_bar_by_bar_walk():
+    candles = make_hourly(3000, seed=3)
+    high, low, close = candles["high"], candles["low"], candles["close"]
+    rng = np.random.default_rng(5)
+
+    count = 600
+    entries = rng.integers(0, 2900, count)
+    ends = np.minimum(entries + rng.integers(20, 400, count), len(candles))
+    is_long = rng.random(count) < 0.5
+    prices = candles["open"][entries]
+    stop_pct = rng.uniform(0.01, 0.4, count)   # Geniş seviyeler: TIME_EXPIRED/INCOMPLETE da oluşur
+    target_pct = rng.uniform(0.02, 0.6, count)
+    trail_pct = stop_pct * rng.uniform(0.2, 1.0, count)
+    sign = np.where(is_long, 1, -1)
+    stops = prices * (1 - sign * stop_pct)
+    targets = prices * (1 + sign * target_pct)
+    trails = prices * (1 - sign * trail_pct)
+
+    index, price, reason = find_exits(high, low, close, entries, ends, prices, stops, targets, trails, is_long)
+
+    seen = set()
+    series = high.tolist(), low.tolist(), close.tolist()
+    for k in range(count):
+        expected = reference_exit(*series, int(entries[k]), int(ends[k]),
+                                  float(prices[k]), float(stops[k]), float(targets[k]), float(trails[k]),
+                                  bool(is_long[k]))
+        assert (int(index[k]), float(price[k]), EXIT_REASONS[reason[k]]) == expected
+        seen.add(expected[2])
+    assert seen == set(EXIT_REASONS)
+
+
+def test_compare_streams_progress_then_result(store):
+    store.append("BBB", "1h", make_hourly(24 * 120, seed=2))
+    engine = BacktestEngine()
+
+    async def collect():
+        return [event async for event in engine.compare_timeframes(
+            ["AAA", "BBB"], ["1d", "1w"], datetime(2025, 1, 25), datetime(2025, 3, 25)
+        )]
+
+    events = asyncio.run(collect())
+    progress, result = events[:-1], events[-1]
+
+    assert [e["done"] for e in progress] == [1, 2, 3, 4]
+    assert {(e["symbol"], e["timeframe"]) for e in progress} == {
+        ("AAA", "1d"), ("AAA", "1w"), ("BBB", "1d"), ("BBB", "1w")
+    }
+    assert store.syncs == 2
+    assert result["type"] == "result"
+    assert set(result["comparison"]) == {"1d", "1w"}
+    assert result["comparison"]["1d"]["total_signals"] == 2 * 59
+    assert result["best_timeframe"] in ("1d", "1w")
+
+
+def test_sweep_baseline_matches_run_summary(store, monkeypatch):
+    monkeypatch.setattr(exit_sweep, "candle_store", store)
+    start, end = datetime(2025, 1, 25), datetime(2025, 3, 25)
+    summary = asyncio.run(BacktestEngine().run_backtest(["AAA"], start, end))["summary"]
+
+    async def collect():
+        grid = exit_sweep.make_grid(include=(2.0, 2.2, 0.8))
+        return [event async for event in exit_sweep.stream_sweep(["AAA"], start, end, grid)]
+
+    result = asyncio.run(collect())[-1]
+    baseline = result["baseline"]
+
+    assert result["combos"] == 75
+    assert (baseline["trades"], baseline["win_rate"], baseline["profit_factor"],
+            baseline["max_drawdown"], baseline["total_return_pct"]) == (
+        summary["total_signals"], summary["success_rate"], summary["profit_factor"],
+        summary["max_drawdown"], summary["total_return_pct"])
+    factors = [row["profit_factor"] for row in result["table"]]
+    assert factors == sorted(factors, reverse=True)
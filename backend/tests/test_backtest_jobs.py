@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Backtest Jobs Tests
+==================================
+Aynı parametrelerle gelen işlerin tekilleştirilmesi ve sonuç cache'i
+"""
+
+import asyncio
+
+import numpy as np
+
+import services.exit_sweep as exit_sweep
+from services.backtest_jobs import RESULT_KEY_PREFIX, STATUS_DONE, BacktestJobQueue, data_version
+from services.candle_store import CANDLE_DTYPE, INTERVAL_MS
+
+HOUR_MS = INTERVAL_MS["1h"]
+
+
+class DictRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def fill(store, symbol, days, missing_hours=0):
+    """Bitişi son kapanmış saat olan düz mum serisi (missing_hours: sondan eksik)"""
+    end_ms = int(data_version().timestamp() * 1000) - HOUR_MS * (1 + missing_hours)
+    count = days * 24 + 1 - missing_hours
+    arr = np.zeros(count, dtype=CANDLE_DTYPE)
+    arr["open_time"] = end_ms - np.arange(count)[::-1] * HOUR_MS
+    arr["open"] = arr["high"] = arr["low"] = arr["close"] = 100.0
+    store.append(symbol, "1h", arr)
+
+
+def test_duplicate_submit_attaches_then_hits_cache(backtest_store):
+    fill(backtest_store, "AAA", 31)
+    fill(backtest_store, "BBB", 31)
+
+    async def scenario():
+        jobs = BacktestJobQueue(DictRedis())
+        first = jobs.submit(["aaa", "bbb"], 30)
+        second = jobs.submit(["AAA", "BBB"], 30)
+        other = jobs.submit(["AAA"], 30)
+        await jobs.wait(first)
+        await jobs.wait(other)
+        cached = jobs.submit(["AAA", "BBB"], 30)
+        return jobs, first, second, other, cached
+
+    jobs, first, second, other, cached = asyncio.run(scenario())
+
+    assert second is first
+    assert other.id != first.id
+    assert first.status == STATUS_DONE and not first.cached
+    assert first.done == first.total == 2
+    assert backtest_store.syncs == 3  # first: AAA + BBB, other: AAA
+    assert cached.id != first.id and cached.cached
+    assert cached.result == first.result
+    assert not jobs.inflight
+
+
+def test_incomplete_data_not_cached(backtest_store):
+    fill(backtest_store, "AAA", 31, missing_hours=5)  # Sync başarısız - son saatler yok
+
+    async def scenario():
+        redis = DictRedis()
+        jobs = BacktestJobQueue(redis)
+        job = jobs.submit(["AAA"], 30)
+        await jobs.wait(job)
+        return redis, job
+
+    redis, job = asyncio.run(scenario())
+    assert job.status == STATUS_DONE
+    assert not any(k.startswith(RESULT_KEY_PREFIX) for k in redis.data)
+
+
+def test_compare_job_progress_and_cache(backtest_store):
+    fill(backtest_store, "AAA", 31)
+
+    async def scenario():
+        jobs = BacktestJobQueue(DictRedis())
+        job = jobs.submit_compare(["aaa"], 30, ["1d", "1w"])
+        await jobs.wait(job)
+        return job, jobs.submit_compare(["AAA"], 30, ["1d", "1w"])
+
+    job, cached = asyncio.run(scenario())
+    assert job.status == STATUS_DONE
+    assert job.done == job.total == 2  # sembol x timeframe
+    assert set(job.result["by_symbol"]["AAA"]) == {"1d", "1w"}
+    assert cached.cached and cached.result == job.result
+
+
+def test_sweep_job_keyed_on_grid(backtest_store, monkeypatch):
+    monkeypatch.setattr(exit_sweep, "candle_store", backtest_store)
+    fill(backtest_store, "AAA", 31)
+    grid = exit_sweep.make_grid([2.0], [2.0, 2.5], [0.8])
+
+    async def scenario():
+        jobs = BacktestJobQueue(DictRedis())
+        job = jobs.submit_sweep(["AAA"], 30, grid)
+        await jobs.wait(job)
+        return job, jobs.submit_sweep(["AAA"], 30, grid), jobs.submit_sweep(["AAA"], 30, grid[:1])
+
+    job, cached, other = asyncio.run(scenario())
+    assert job.status == STATUS_DONE and job.result["combos"] == 2
+    assert cached.cached and cached.result == job.result
+    assert not other.cached
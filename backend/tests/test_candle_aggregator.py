@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Candle Aggregator Unit Tests
+===========================================
+Tick -> OHLC mum toplama ve ring buffer testleri (Redis bağımlılığı yok)
+"""
+
+from services.candle_aggregator import CandleAggregator, CandleRing, is_contiguous
+
+
+class TestCandleRing:
+    """Sabit boyutlu ring buffer"""
+
+    def test_keeps_last_n_in_order(self):
+        ring = CandleRing(3)
+        for i in range(5):
+            ring.append((i, 1.0, 1.0, 1.0, float(i)))
+        assert len(ring) == 3
+        assert [c[0] for c in ring.last()] == [2, 3, 4]
+        assert [c[4] for c in ring.last(2)] == [3.0, 4.0]
+
+    def test_partial_fill(self):
+        ring = CandleRing(10)
+        ring.append((1, 1.0, 2.0, 0.5, 1.5))
+        assert ring.last() == [(1, 1.0, 2.0, 0.5, 1.5)]
+
+
+class TestCandleAggregator:
+    """Tick'lerden mum üretimi"""
+
+    def test_ohlc_within_interval(self):
+        agg = CandleAggregator(intervals={"1m": 60})
+        for ts, price in [(0, 10), (10_000, 12), (20_000, 9), (30_000, 11)]:
+            agg.on_tick("BTC", price, ts)
+        candle = agg.get_candles("BTC", "1m", include_open=True)[-1]
+        assert (candle["open"], candle["high"], candle["low"], candle["close"]) == (10, 12, 9, 11)
+
+    def test_boundary_closes_candle(self):
+        agg = CandleAggregator(intervals={"1m": 60})
+        agg.on_tick("BTC", 10, 0)
+        agg.on_tick("BTC", 11, 59_000)
+        agg.on_tick("BTC", 12, 60_000)
+
+        closed = agg.drain_closed()
+        assert len(closed) == 1
+        symbol, interval, candle = closed[0]
+        assert (symbol, interval, candle[0], candle[4]) == ("BTC", "1m", 0, 11)
+        assert agg.drain_closed() == []
+        assert agg.get_open_candle("BTC", "1m")[0] == 60_000
+
+    def test_late_tick_ignored(self):
+        agg = CandleAggregator(intervals={"1m": 60})
+        agg.on_tick("BTC", 10, 60_000)
+        agg.on_tick("BTC", 99, 30_000)
+        assert agg.get_open_candle("BTC", "1m")[2] == 10
+
+    def test_candles_carry_no_volume(self):
+        # 24s rolling ticker hacmi mum hacmi değil - mumlar hacim taşımaz
+        agg = CandleAggregator(intervals={"1m": 60})
+        agg.on_tick("BTC", 10, 0)
+        assert "volume" not in agg.get_candles("BTC", "1m", include_open=True)[-1]
+
+    def test_partial_first_candle_dropped(self):
+        # Worker interval ortasında başladı - ilk mum yayınlanmaz
+        agg = CandleAggregator(intervals={"1m": 60})
+        agg.on_tick("BTC", 10, 30_000)
+        assert agg.get_open_candle("BTC", "1m") is None
+        agg.on_tick("BTC", 11, 60_000)
+        agg.on_tick("BTC", 12, 120_000)
+
+        closed = agg.drain_closed()
+        assert [c[2][0] for c in closed] == [60_000]
+        assert [c["timestamp"] for c in agg.get_candles("BTC", "1m", include_open=True)] == [60_000, 120_000]
+
+
+class TestContiguity:
+    """Yerel mum serisi kullanılabilir mi"""
+
+    HOUR = 3_600_000
+
+    def candles(self, times):
+        return [{"timestamp": t, "open": 1, "high": 1, "low": 1, "close": 1} for t in times]
+
+    def test_contiguous_and_fresh(self):
+        times = [0, self.HOUR, 2 * self.HOUR]
+        assert is_contiguous(self.candles(times), "1h", now_ms=2 * self.HOUR + 10)
+
+    def test_gap_rejected(self):
+        times = [0, self.HOUR, 3 * self.HOUR]
+        assert not is_contiguous(self.candles(times), "1h", now_ms=3 * self.HOUR + 10)
+
+    def test_stale_rejected(self):
+        times = [0, self.HOUR]
+        assert not is_contiguous(self.candles(times), "1h", now_ms=5 * self.HOUR)
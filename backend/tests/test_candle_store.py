@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Candle Store Unit Tests
+======================================
+Memory-mapped mum deposu okuma/yazma ve Binance sync testleri (ağ bağımlılığı yok)
+"""
+
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from services.candle_store import CANDLE_DTYPE, BinanceRateLimited, CandleStore
+
+
+def make_candles(times):
+    arr = np.zeros(len(times), dtype=CANDLE_DTYPE)
+    arr["open_time"] = times
+    arr["close"] = [float(t) for t in times]
+    return arr
+
+
+class TestCandleStore:
+    """Append-only dosya ve aralık okumaları"""
+
+    def test_append_skips_existing(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        assert store.append("BTC", "1d", make_candles([1, 2, 3])) == 3
+        assert store.append("BTC", "1d", make_candles([2, 3, 4, 5])) == 2
+        assert store.read("BTC", "1d")["open_time"].tolist() == [1, 2, 3, 4, 5]
+
+    def test_read_range_and_last(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        store.append("ETH", "1h", make_candles([10, 20, 30, 40]))
+        assert store.read_range("ETH", "1h", 20, 30)["close"].tolist() == [20.0, 30.0]
+        assert store.read_last("ETH", "1h", 2)["open_time"].tolist() == [30, 40]
+        assert (store.first_timestamp("ETH", "1h"), store.last_timestamp("ETH", "1h")) == (10, 40)
+
+    def test_prepend_older_history(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        store.append("SOL", "1d", make_candles([3, 4]))
+        assert store._prepend("SOL", "1d", make_candles([1, 2, 3])) == 2
+        assert store.read("SOL", "1d")["open_time"].tolist() == [1, 2, 3, 4]
+
+    def test_missing_file_is_empty(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        assert len(store.read("NOPE", "1d")) == 0
+        assert store.last_timestamp("NOPE", "1d") is None
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeClient:
+    """Sırayla verilen cevapları döndüren httpx.AsyncClient yerine"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    async def get(self, url, params=None):
+        return self.responses.pop(0)
+
+
+class TestBinanceSync:
+    """Sayfa hataları ve rate limit"""
+
+    DAY = 86_400_000
+
+    def test_failed_page_does_not_mark_history_missing(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        store.append("BTC", "1d", make_candles([100 * self.DAY]))
+        start = datetime.fromtimestamp(90 * self.DAY / 1000)
+
+        client = FakeClient([FakeResponse(500), FakeResponse(200, [])])
+        asyncio.run(store.sync_binance("BTC", "1d", start=start, client=client))
+        assert store._history_start == {}
+
+        client = FakeClient([FakeResponse(200, []), FakeResponse(200, [])])
+        asyncio.run(store.sync_binance("BTC", "1d", start=start, client=client))
+        assert list(store._history_start.values()) == [90 * self.DAY]
+
+    def test_rate_limit_raises_with_retry_after(self, tmp_path):
+        store = CandleStore(str(tmp_path))
+        client = FakeClient([FakeResponse(429, headers={"Retry-After": "7"})])
+        with pytest.raises(BinanceRateLimited) as exc:
+            asyncio.run(store.sync_binance("BTC", "1d", client=client))
+        assert exc.value.retry_after == 7
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Event Bus Tests
+==============================
+Tick sembollerinin biriktirilip aralıklı teslim edilmesi (Redis bağımlılığı yok)
+"""
+
+from services import event_bus
+from services.event_bus import EVENT_TICK, SymbolBatcher
+
+
+def tick(*symbols):
+    return {"id": "0-0", "type": EVENT_TICK, "version": 1, "symbols": list(symbols)}
+
+
+def test_batcher_coalesces_ticks_per_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(event_bus.time, "monotonic", lambda: now[0])
+    batcher = SymbolBatcher(5)
+
+    batcher.add([tick("BTC")])
+    assert batcher.take() == {"BTC"}  # İlk tur beklemez
+
+    now[0] = 101.0
+    batcher.add([tick("ETH"), tick("BTC")])
+    assert batcher.take() == set()
+    assert batcher.block_ms(5000) == 4000
+
+    now[0] = 105.0
+    batcher.add([tick("SOL")])
+    assert batcher.take() == {"BTC", "ETH", "SOL"}
+    assert batcher.block_ms(5000) == 5000
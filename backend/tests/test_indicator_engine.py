@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Vectorized Indicator Engine Tests
+================================================
+Batch engine (signal worker cold start / rebuild) çıktısının artımlı
+IndicatorState yolu (AnalysisService._calculate_indicators) ile aynı olduğunu doğrular
+"""
+
+import math
+import random
+
+import pytest
+
+from services.analysis_service import AnalysisService
+
+
+def _assert_same(batch, ref, path=""):
+    if isinstance(ref, dict):
+        assert set(batch) == set(ref), path
+        for key in ref:
+            _assert_same(batch[key], ref[key], f"{path}.{key}")
+    elif ref is None or isinstance(ref, str):
+        assert batch == ref, path
+    else:
+        assert batch is not None and math.isclose(batch, ref, rel_tol=1e-9, abs_tol=1e-9), path
+
+
+class TestIndicatorBatchParity:
+    """Farklı geçmiş uzunluklarında birebir aynı sonuç"""
+
+    def setup_method(self):
+        self.service = AnalysisService()
+
+    @pytest.mark.parametrize("length", [5, 14, 15, 20, 26, 30, 50, 91, 200, 366, 400])
+    def test_matches_scalar_implementation(self, length):
+        rng = random.Random(length)
+        universe = {}
+        for i in range(5):
+            price = rng.uniform(0.001, 50000)
+            series = []
+            for day in range(length + i):
+                price *= 1 + rng.gauss(0, 0.04)
+                series.append([day * 86_400_000, price])
+            universe[f"C{i}"] = series
+
+        batch = self.service.calculate_indicators_batch(universe)
+        for symbol, prices in universe.items():
+            _assert_same(batch[symbol], self.service._calculate_indicators(prices, []), symbol)
+
+    def test_zero_prices_and_flat_series(self):
+        universe = {
+            "ZERO": [[i, 0.0 if i == 10 else 1.0 + i] for i in range(40)],
+            "FLAT": [[i, 5.0] for i in range(40)],
+        }
+        batch = self.service.calculate_indicators_batch(universe)
+        for symbol, prices in universe.items():
+            _assert_same(batch[symbol], self.service._calculate_indicators(prices, []), symbol)
+
+    def test_empty_series_skipped(self):
+        assert self.service.calculate_indicators_batch({"EMPTY": []}) == {}
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Streaming Indicator State Tests
+==============================================
+Artımlı güncellenen durumun sıfırdan hesaplamayla aynı sonucu verdiği testler
+"""
+
+import json
+import math
+import random
+
+from services.indicator_state import IndicatorState
+
+
+def make_series(length, seed=1, start=0):
+    rng = random.Random(seed)
+    price = rng.uniform(1, 1000)
+    series = []
+    for day in range(start, start + length):
+        price *= 1 + rng.gauss(0, 0.04)
+        series.append([day * 86_400_000, price])
+    return series
+
+
+def assert_snapshots_equal(a, b):
+    assert set(a) == set(b)
+    for key in a:
+        if a[key] is None or b[key] is None:
+            assert a[key] == b[key], key
+        else:
+            assert math.isclose(a[key], b[key], rel_tol=1e-9, abs_tol=1e-9), key
+
+
+class TestIndicatorState:
+    """Kayan pencere üzerinde O(1) güncellemeler"""
+
+    def test_sliding_window_matches_rebuild(self):
+        series = make_series(400)
+        state = IndicatorState.from_prices(series[:90])
+        for ts, price in series[90:]:
+            state.update(ts, price)
+        assert_snapshots_equal(state.snapshot(), IndicatorState.from_prices(series[-90:]).snapshot())
+
+    def test_revise_open_candle(self):
+        series = make_series(120)
+        state = IndicatorState.from_prices(series[:90])
+        ts, price = series[90]
+        state.update(ts, price * 1.05)
+        state.update(ts, price)  # Açık mum güncellendi
+        assert len(state) == 90
+        assert_snapshots_equal(state.snapshot(), IndicatorState.from_prices(series[1:91]).snapshot())
+
+    def test_stale_timestamp_ignored(self):
+        series = make_series(30)
+        state = IndicatorState.from_prices(series)
+        assert state.update(series[0][0], 1.0) is False
+        assert state.closes[-1] == series[-1][1]
+
+    def test_serialization_roundtrip(self):
+        series = make_series(200)
+        state = IndicatorState.from_prices(series[:90])
+        restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+        for ts, price in series[90:]:
+            state.update(ts, price)
+            restored.update(ts, price)
+        assert_snapshots_equal(state.snapshot(), restored.snapshot())
+
+    def test_update_series_detects_gap(self):
+        state = IndicatorState.from_prices(make_series(90))
+        assert state.update_series(make_series(90, start=200)) is False
+
+    def test_update_series_applies_new_candles(self):
+        series = make_series(95)
+        state = IndicatorState.from_prices(series[:90])
+        assert state.update_series(series[5:]) is True
+        assert_snapshots_equal(state.snapshot(), IndicatorState.from_prices(series[5:]).snapshot())
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - News Index Tests
+===============================
+Ters indeksin sinyal sentiment'i ve zaman ağırlıklı skor testleri
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from services.news_index import NewsIndex
+
+NOW = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def news(hours_ago, coins, sentiment="neutral", score=0.0):
+    crawled = (NOW - timedelta(hours=hours_ago)).replace(tzinfo=None).isoformat()
+    return {"crawled_at": crawled, "coins": coins, "sentiment": sentiment, "sentiment_score": score}
+
+
+def make_index(news_db):
+    return NewsIndex(news_db, now=NOW.timestamp())
+
+
+def test_signal_sentiment_counts_general_once():
+    index = make_index({
+        "a": news(1, ["BTC"], "bullish", 0.8),
+        "b": news(2, ["GENERAL", "BTC"], "bearish", 0.4),
+        "c": news(3, ["GENERAL"], "bullish", 0.6),
+        "d": news(30, ["BTC"], "bullish", 1.0),   # 24 saatten eski
+        "e": {"crawled_at": "bad", "coins": ["BTC"]},
+    })
+
+    assert index.signal_sentiment("BTC") == {"score": round((0.8 - 0.4 + 0.6) / 3, 3), "news_count": 3}
+    assert index.signal_sentiment("ETH") == {"score": round((-0.4 + 0.6) / 2, 3), "news_count": 2}
+
+
+def test_signal_sentiment_none_without_recent_news():
+    index = make_index({"a": news(48, ["BTC"], "bullish", 0.5)})
+    assert index.signal_sentiment("BTC") is None
+
+
+def test_coin_news_newest_first():
+    index = make_index({
+        "old": news(10, ["ETH"]),
+        "new": news(1, ["ETH"]),
+        "mid": news(5, ["ETH", "BTC"]),
+    })
+    assert index.ids_for("ETH") == ["new", "mid", "old"]
+    assert index.ids_for("ETH", 2) == ["new", "mid"]
+
+
+def test_undated_news_listed_after_dated_but_not_in_window():
+    index = make_index({
+        "undated": {"crawled_at": "", "coins": ["ETH"], "sentiment": "bullish", "sentiment_score": 1.0},
+        "dated": news(1, ["ETH"], "bearish", 0.5),
+    })
+    assert index.ids_for("ETH") == ["dated", "undated"]
+    assert index.sentiment("eth")["news_count"] == 2
+    assert index.signal_sentiment("ETH") == {"score": -0.5, "news_count": 1}
+
+
+def test_sentiment_half_life_weights_recent_news():
+    index = make_index({
+        "a": news(0, ["SOL"], "bullish"),
+        "b": news(24, ["SOL"], "bearish"),
+    })
+    plain = index.sentiment("sol")
+    assert plain["score"] == 0
+    assert plain["bullish"] == 1 and plain["bearish"] == 1
+
+    decayed = index.sentiment("sol", half_life_hours=24)
+    assert abs(decayed["score"] - (1 - 0.5) / 1.5) < 1e-9
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Portfolio Simulator Tests
+========================================
+Eşzamanlı pozisyon limiti, sermaye tahsisi, piyasa değerli drawdown testleri
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import database
+from services.candle_store import CANDLE_DTYPE, CandleStore
+from services.portfolio_sim import (
+    PortfolioConfig, TradeTape, load_marks, load_tracking_tape, simulate_portfolio
+)
+
+HOUR_MS = 3_600_000
+
+
+def tape(*trades):
+    """(symbol, entry saat, exit saat, pnl %, confidence)"""
+    return TradeTape(
+        [t[0] for t in trades],
+        [t[1] * HOUR_MS for t in trades],
+        [t[2] * HOUR_MS for t in trades],
+        [t[3] for t in trades],
+        [t[4] for t in trades],
+    )
+
+
+def test_concurrent_positions_share_capital():
+    trades = tape(
+        ("AAA", 0, 10, 10.0, 70),
+        ("BBB", 0, 5, -20.0, 80),   # Aynı anda: yüksek confidence önce
+        ("CCC", 2, 8, 50.0, 90),    # max_positions dolu
+        ("AAA", 5, 9, 5.0, 70),     # AAA hâlâ açık
+        ("DDD", 5, 12, 0.0, 70),    # BBB'nin çıkışı aynı saatte yer açar
+    )
+    config = PortfolioConfig(initial_capital=1000, position_fraction=0.5, max_positions=2, fee_pct=0)
+    report = simulate_portfolio(trades, config)
+
+    # BBB 500 -> 400, AAA 500 -> 550, DDD: 900 x 0.5 = 450 ama nakit 400 ile sınırlı
+    assert report["trades_taken"] == 3
+    assert report["trades_skipped"] == {"max_positions": 1, "same_symbol": 1, "no_capital": 0}
+    assert report["final_equity"] == 950.0
+    assert report["max_drawdown_pct"] == 10.0
+    assert report["max_concurrent"] == 2
+    assert report["serial_return_pct"] != report["total_return_pct"]
+
+
+def test_exposure_cap_and_fees():
+    trades = tape(("AAA", 0, 4, 0.0, 70), ("BBB", 1, 4, 0.0, 70))
+    config = PortfolioConfig(initial_capital=1000, position_fraction=0.8, max_exposure=1.0, fee_pct=1.0)
+    report = simulate_portfolio(trades, config)
+
+    # BBB sadece kalan nakit kadar açılır, iki bacakta %1 komisyon
+    assert report["trades_taken"] == 2
+    assert report["final_equity"] < 1000
+    assert report["fees_paid"] == round(1000 - report["final_equity"], 2)
+    assert report["equity_curve"][0]["equity"] <= 1000
+
+
+def test_zero_duration_trade_closes_before_next_entry():
+    # from_tracking exit_ms == entry_ms üretebilir: A açılıp hemen kapanmalı
+    trades = tape(("AAA", 0, 0, 5.0, 70), ("BBB", 0, 5, 0.0, 60))
+    config = PortfolioConfig(initial_capital=10_000, position_fraction=0.1, max_positions=1, fee_pct=0)
+    report = simulate_portfolio(trades, config)
+
+    assert report["trades_taken"] == 2
+    assert report["trades_skipped"]["max_positions"] == 0
+    assert report["final_equity"] == 10_050.0
+    assert report["win_rate"] == 50.0
+    assert report["equity_curve"][-1]["positions"] == 0
+
+
+def test_tracking_tape_filters_symbols(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "test.db"))
+    database.init_db()
+    opened = datetime.utcnow() - timedelta(days=2)
+    with database.get_db() as conn:
+        for n, symbol in enumerate(("BTC", "ETH", "SOL")):
+            conn.execute("""
+                INSERT INTO signal_tracking
+                (id, symbol, signal, confidence, entry_price, timeframe, created_at, check_date,
+                 result, profit_loss_pct)
+                VALUES (?, ?, 'AL', 70, 100, '1d', ?, ?, 'SUCCESS', 2.0)
+            """, (str(n), symbol, (opened + timedelta(hours=n)).isoformat(),
+                  (opened + timedelta(days=1)).isoformat()))
+        conn.commit()
+
+    assert load_tracking_tape(7, "1d", ["SOL", "BTC"]).symbols == ["BTC", "SOL"]
+    assert len(load_tracking_tape(7, "1d")) == 3
+
+
+def test_open_positions_marked_to_market(tmp_path):
+    # 0. saatte 100'den long, 24. saatte 80, 72. saatte %5 kârla kapanış
+    trades = TradeTape(["AAA"], [0], [72 * HOUR_MS], [5.0], [70], [100.0], [1])
+    store = CandleStore(str(tmp_path))
+    candles = np.zeros(4, dtype=CANDLE_DTYPE)
+    candles["open_time"] = [0, 23 * HOUR_MS, 47 * HOUR_MS, 71 * HOUR_MS]
+    candles["close"] = [100.0, 80.0, 90.0, 105.0]
+    store.append("AAA", "1h", candles)
+    config = PortfolioConfig(initial_capital=1000, position_fraction=0.5, fee_pct=0)
+
+    at_cost = simulate_portfolio(trades, config)
+    marked = simulate_portfolio(trades, config, load_marks(trades, store))
+
+    assert at_cost["max_drawdown_pct"] == 0.0
+    assert marked["max_drawdown_pct"] == 10.0  # 500 x -%20
+    assert [p["equity"] for p in marked["equity_curve"]] == [1000.0, 900.0, 950.0, 1025.0]
+    assert marked["final_equity"] == at_cost["final_equity"] == 1025.0
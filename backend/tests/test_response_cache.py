@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Response Cache Tests
+===================================
+ETag/304, sıkıştırma ve versiyon değişiminde yeniden üretim testleri
+"""
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.response_cache import ResponseCache
+
+
+class DictClient:
+    def __init__(self, data):
+        self.data = data
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+
+def make_app():
+    client = DictClient({"data_version": "1"})
+    cache = ResponseCache(client)
+    builds = []
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(request: Request, n: int = 10):
+        def build():
+            builds.append(n)
+            return {"items": [{"id": i, "name": f"item-{i}"} for i in range(n)], "version": client.data["data_version"]}
+        return cache.respond(request, "items", cache.version("data_version"), (n,), build)
+
+    return TestClient(app), client, builds
+
+
+def test_body_is_built_once_per_version():
+    http, client, builds = make_app()
+    first = http.get("/items?n=100")
+    second = http.get("/items?n=100")
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert builds == [100]
+
+    client.data["data_version"] = "2"
+    third = http.get("/items?n=100")
+    assert third.json()["version"] == "2"
+    assert third.headers["etag"] != first.headers["etag"]
+    assert builds == [100, 100]
+
+
+def test_if_none_match_returns_304():
+    http, _, builds = make_app()
+    etag = http.get("/items").headers["etag"]
+    resp = http.get("/items", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert builds == [10]
+
+
+def test_gzip_variant():
+    http, _, _ = make_app()
+    resp = http.get("/items?n=200", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert len(resp.json()["items"]) == 200
+
+    plain = http.get("/items?n=5", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in plain.headers
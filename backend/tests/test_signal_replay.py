@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Signal Replay Tests
+==================================
+Look-ahead olmadan gün gün replay ve günlük top-N / açık pozisyon seçimi
+"""
+
+from datetime import datetime
+
+import pytest
+
+import services.signal_replay as signal_replay
+from services.candle_store import CandleStore
+from services.signal_replay import DAY_MS, replay_symbol, select_trades
+from tests.test_backtest_engine import make_hourly
+
+START_MS = int(datetime(2025, 1, 1).timestamp() * 1000)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = CandleStore(str(tmp_path))
+    monkeypatch.setattr(signal_replay, "candle_store", store)
+    return store
+
+
+def signals(store, candles, cutoff_ms):
+    store.append("AAA", "1h", candles)
+    candidates, _ = replay_symbol("AAA", START_MS, START_MS + 40 * DAY_MS, START_MS + 150 * DAY_MS,
+                                  START_MS + 160 * DAY_MS, {})
+    return [(c["day"], c["signal"], c["confidence"], c["entry_ms"])
+            for c in candidates if c["day"] + DAY_MS <= cutoff_ms]
+
+
+def test_replay_signals_ignore_future_candles(tmp_path, store, monkeypatch):
+    candles = make_hourly(24 * 160, seed=7)
+    cutoff_ms = START_MS + 100 * DAY_MS
+    baseline = signals(store, candles, cutoff_ms)
+
+    future = candles.copy()
+    after = future["open_time"] >= cutoff_ms
+    for column in ("open", "high", "low", "close"):
+        future[column][after] *= 3.0
+    monkeypatch.setattr(signal_replay, "candle_store", CandleStore(str(tmp_path / "future")))
+
+    assert baseline
+    assert signals(signal_replay.candle_store, future, cutoff_ms) == baseline
+
+
+def test_select_trades_ranks_per_day_and_skips_open_positions():
+    def candidate(day, confidence, entry_ms, exit_ms):
+        return {"signal": "BUY", "confidence": confidence, "confidence_details": {"factors_buy": 3},
+                "quality_gate": {"passed": True}, "day": day, "entry_ms": entry_ms, "exit_ms": exit_ms}
+
+    by_symbol = {
+        "AAA": [candidate(0, 90, 10, 50), candidate(1, 90, 30, 60), candidate(2, 90, 70, 80)],
+        "BBB": [candidate(0, 60, 10, 20)],
+    }
+    trades, counts = select_trades(by_symbol, max_signals=1)
+
+    assert [(t["day"], t["entry_ms"]) for t in trades] == [(0, 10), (2, 70)]
+    assert counts == {"filtered_top_n": 1, "skipped_open_position": 1}
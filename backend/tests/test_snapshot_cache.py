@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - Snapshot Cache Tests
+===================================
+Versiyon değişmedikçe yeniden parse edilmediği ve single-flight testleri
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from services.snapshot_cache import SnapshotCache
+
+
+class DictClient:
+    """GET'leri sayan minimal Redis yerine geçen sözlük"""
+
+    def __init__(self, data):
+        self.data = data
+        self.gets = []
+
+    def get(self, key):
+        self.gets.append(key)
+        return self.data.get(key)
+
+
+def test_reparses_only_when_version_changes():
+    client = DictClient({"fear_greed": json.dumps({"value": 40}), "sentiment_updated": "v1"})
+    cache = SnapshotCache(client)
+
+    first = cache.get("fear_greed")
+    assert cache.get("fear_greed") is first
+    assert client.gets.count("fear_greed") == 1
+
+    client.data.update(fear_greed=json.dumps({"value": 70}), sentiment_updated="v2")
+    assert cache.get("fear_greed")["value"] == 70
+    assert client.gets.count("fear_greed") == 2
+
+
+def test_snapshot_is_read_only():
+    client = DictClient({"fx_rates": json.dumps({"TRY": 34}), "sentiment_updated": "v1"})
+    with pytest.raises(TypeError):
+        SnapshotCache(client).get("fx_rates")["TRY"] = 1
+
+
+def test_missing_version_always_reloads():
+    client = DictClient({"futures_data": json.dumps({"BTC": {}})})
+    cache = SnapshotCache(client)
+    cache.get("futures_data")
+    cache.get("futures_data")
+    assert client.gets.count("futures_data") == 2
+
+
+def test_concurrent_loads_are_single_flight():
+    client = DictClient({"v": "1"})
+    cache = SnapshotCache(client)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("slow", "v", loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
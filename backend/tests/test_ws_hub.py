@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+CryptoSignal - WebSocket Hub Tests
+==================================
+Paylaşılan delta gövdesi, kuyruk taşmasında frame atma ve resync testleri
+"""
+
+import asyncio
+import json
+
+from services.ws_hub import CLOSE_SLOW_CLIENT, FanoutHub, QUEUE_MAX_FRAMES
+
+
+class SlowSocket:
+    """send_text hiç tamamlanmayan (okumayan) client"""
+
+    def __init__(self):
+        self.close_code = None
+
+    async def send_text(self, text):
+        await asyncio.Event().wait()
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def frames(client):
+    return [json.loads(frame) for _, frame in client.queue]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_delta_is_computed_once_and_filtered_per_client():
+    async def scenario():
+        hub = FanoutHub()
+        hub.top_coins = {"BTC"}
+        hub.apply_quotes({"BTC": {"price": 1}, "ETH": {"price": 1}})
+        top, eth = hub.add(SlowSocket()), hub.add(SlowSocket())
+        eth.subscribe(["eth"])
+
+        hub.publish_prices(hub.apply_quotes({"BTC": {"price": 2}, "ETH": {"price": 1}}))
+        hub.publish_prices(hub.apply_quotes({"ETH": {"price": 3}}))
+        return frames(top), frames(eth)
+
+    top, eth = run(scenario())
+    assert [(f["seq"], f["prices"]) for f in top] == [(1, {"BTC": {"price": 2}})]
+    assert [(f["seq"], f["prices"]) for f in eth] == [(1, {"ETH": {"price": 3}})]
+
+
+def test_overflow_drops_price_frames_keeps_control_and_resyncs():
+    async def scenario():
+        hub = FanoutHub()
+        hub.top_coins = {"BTC"}
+        client = hub.add(SlowSocket())
+        client.send({"type": "init"})
+        await asyncio.sleep(0)  # Writer init'te takılı kalır
+
+        client.send({"type": "pong"})
+        for i in range(QUEUE_MAX_FRAMES):
+            hub.publish_prices(hub.apply_quotes({"BTC": {"price": i}}))
+        assert client.needs_resync
+
+        hub.publish_prices(hub.apply_quotes({"BTC": {"price": 500}}))
+        return hub, client
+
+    hub, client = run(scenario())
+    queued = frames(client)
+    assert [f["type"] for f in queued] == ["pong", "snapshot"]
+    assert queued[1]["seq"] == 1
+    assert queued[1]["prices"] == {"BTC": {"price": 500, "change_24h": 0, "change_instant": 0}}
+    assert hub.stats()["price_frames_dropped"] == QUEUE_MAX_FRAMES
+    assert hub.stats()["queue_depth_max"] == 2
+
+
+def test_control_overflow_disconnects_client():
+    async def scenario():
+        hub = FanoutHub()
+        ws = SlowSocket()
+        client = hub.add(ws)
+        for _ in range(QUEUE_MAX_FRAMES + 2):
+            client.send({"type": "pong"})
+        await asyncio.sleep(0)  # Kapanış task'ı çalışsın
+        return hub, ws, client
+
+    hub, ws, client = run(scenario())
+    assert len(hub) == 0
+    assert client.closing
+    assert ws.close_code == CLOSE_SLOW_CLIENT
+    assert hub.stats()["slow_disconnects"] == 1
+
+
+def test_removed_symbols_leave_snapshots():
+    async def scenario():
+        hub = FanoutHub()
+        hub.top_coins = {"BTC", "LUNA"}
+        hub.apply_quotes({"BTC": {"price": 1}, "LUNA": {"price": 1}})
+        client = hub.add(SlowSocket())
+
+        hub.remove_symbols(["LUNA"])
+        hub.send_snapshot(client)
+        return hub, frames(client)
+
+    hub, (removed, snapshot) = run(scenario())
+    assert removed == {"type": "price_removed", "symbols": ["LUNA"]}
+    assert set(snapshot["prices"]) == {"BTC"}
+    assert hub.top_coins == {"BTC"}
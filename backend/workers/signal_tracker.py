@@ -10,27 +10,31 @@ v2.0 Changes:
 - Tracks highest_price / lowest_price for dynamic trailing
 - Better exit reason tracking
 
-Runs every 60 seconds:
-- Get current price from Redis (prices_data)
+Runs on price ticks (events:prices consumer group) for the changed symbols,
+coalesced to at most one pass every TICK_CHECK_INTERVAL seconds, plus a full
+pass every 60 seconds (time limit, missed events):
+- Load open signals of the changed symbols (symbol filter in SQL)
+- Get current price from Redis (prices_quotes - only open signal symbols)
 - Check Stop-Loss
 - Check Trailing Stop (NEW!)
 - Check Take-Profit
 - Check 7-day time limit
-- Calculate profit/loss and update DB
+- Calculate profit/loss and update DB (trailing updates: one transaction per pass)
 """
 
 import asyncio
-import json
 import redis
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional
 import sys
 import os
 
 # Parent path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db
+from database import get_db, sql_chunks
+from services.price_store import PriceStore
+from services.event_bus import EventBus, GroupReader, SymbolBatcher
 
 # Redis connection
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
@@ -41,9 +45,13 @@ redis_client = redis.Redis(
     decode_responses=True,
     password=REDIS_PASSWORD if REDIS_PASSWORD else None
 )
+price_store = PriceStore(redis_client)
 
 # Config
 MAX_HOLD_DAYS = 7
+FULL_CHECK_INTERVAL = 60
+TICK_CHECK_INTERVAL = 5  # Min seconds between tick-driven passes
+CONSUMER_GROUP = "signal_tracker"
 
 
 class SignalTracker:
@@ -119,10 +127,16 @@ class SignalTracker:
 
         return new_trailing, new_highest, new_lowest, should_exit
 
-    def process_signal(self, signal_row: Dict, prices_data: Dict) -> Optional[str]:
+    def process_signal(self, signal_row: Dict, prices_data: Dict,
+                       trailing_updates: Optional[List[tuple]] = None) -> Optional[str]:
         """
         Process a single signal with trailing stop support.
 
+        Args:
+            trailing_updates: Collect highest/lowest/trailing updates here
+                (written by the caller in one transaction) instead of
+                committing each one
+
         Returns:
             exit_reason or None (still open)
         """
@@ -179,18 +193,11 @@ class SignalTracker:
 
             # Update highest/lowest in DB even if not exiting
             if new_highest != highest_price or new_lowest != lowest_price or new_trailing != trailing_stop:
-                try:
-                    with get_db() as conn:
-                        conn.execute("""
-                            UPDATE signal_tracking
-                            SET highest_price = ?,
-                                lowest_price = ?,
-                                trailing_stop = ?
-                            WHERE id = ?
-                        """, (new_highest, new_lowest, new_trailing, signal_id))
-                        conn.commit()
-                except Exception as e:
-                    print(f"  [Tracker] Error updating trailing: {e}", flush=True)
+                update = (new_highest, new_lowest, new_trailing, signal_id)
+                if trailing_updates is not None:
+                    trailing_updates.append(update)
+                else:
+                    self.save_trailing_updates([update])
 
             trailing_stop = new_trailing
             highest_price = new_highest
@@ -278,10 +285,30 @@ class SignalTracker:
 
         return None
 
-    def process_all_signals(self) -> Dict:
+    def save_trailing_updates(self, updates: List[tuple]):
+        """Write (highest, lowest, trailing_stop, id) updates in one transaction"""
+        if not updates:
+            return
+        try:
+            with get_db() as conn:
+                conn.executemany("""
+                    UPDATE signal_tracking
+                    SET highest_price = ?,
+                        lowest_price = ?,
+                        trailing_stop = ?
+                    WHERE id = ?
+                """, updates)
+                conn.commit()
+        except Exception as e:
+            print(f"  [Tracker] Error updating trailing: {e}", flush=True)
+
+    def process_all_signals(self, symbols: Optional[Iterable[str]] = None) -> Dict:
         """
         Process all open signals.
 
+        Args:
+            symbols: Only open signals of these symbols (None = all)
+
         Returns:
             Dict with stats
         """
@@ -295,33 +322,45 @@ class SignalTracker:
         }
 
         try:
-            # Get current prices from Redis
-            prices_raw = redis_client.get("prices_data")
-            prices_data = json.loads(prices_raw) if prices_raw else {}
-
-            if not prices_data:
-                return {"closed": 0, "exits": self.exits, "open": 0, "error": "No price data"}
-
             with get_db() as conn:
                 # Get open signals
-                rows = conn.execute("""
-                    SELECT * FROM signal_tracking
-                    WHERE result IS NULL
-                    ORDER BY created_at DESC
-                """).fetchall()
+                if symbols is None:
+                    rows = conn.execute("""
+                        SELECT * FROM signal_tracking
+                        WHERE result IS NULL
+                        ORDER BY created_at DESC
+                    """).fetchall()
+                else:
+                    # idx_signal_tracking_symbol
+                    rows = []
+                    for chunk in sql_chunks(symbols):
+                        rows.extend(conn.execute(f"""
+                            SELECT * FROM signal_tracking
+                            WHERE symbol IN ({",".join("?" * len(chunk))})
+                              AND result IS NULL
+                        """, chunk).fetchall())
 
                 if not rows:
                     return {"closed": 0, "exits": self.exits, "open": 0}
 
+                # Get current prices from Redis - only symbols with open signals
+                prices_data = price_store.get_quotes(row["symbol"] for row in rows)
+
+                if not prices_data:
+                    return {"closed": 0, "exits": self.exits, "open": 0, "error": "No price data"}
+
                 open_count = len(rows)
+                trailing_updates: List[tuple] = []
 
                 for row in rows:
                     try:
-                        self.process_signal(dict(row), prices_data)
+                        self.process_signal(dict(row), prices_data, trailing_updates)
                     except Exception as e:
                         print(f"  [Tracker] Error processing signal: {e}", flush=True)
                         continue
 
+                self.save_trailing_updates(trailing_updates)
+
                 return {
                     "closed": self.closed_count,
                     "exits": self.exits,
@@ -337,30 +376,47 @@ class SignalTracker:
 signal_tracker = SignalTracker()
 
 
+def log_stats(stats: Dict):
+    if stats.get("closed", 0) > 0:
+        exits = stats['exits']
+        print(f"  [Tracker] Closed: {stats['closed']} | "
+              f"TP: {exits.get('TAKE_PROFIT', 0)} | "
+              f"SL: {exits.get('STOP_LOSS', 0)} | "
+              f"Trail: {exits.get('TRAILING_STOP', 0)} | "
+              f"Exp: {exits.get('TIME_EXPIRED', 0)}", flush=True)
+
+
 async def main():
-    """Main loop - runs every 60 seconds"""
+    """Main loop - price tick events + full pass every 60 seconds"""
     print("[Signal Tracker v2.0] Starting with Trailing Stop support...", flush=True)
-    print(f"  Check interval: 60 seconds", flush=True)
+    print(f"  Price ticks: events:prices (group: {CONSUMER_GROUP}), every {TICK_CHECK_INTERVAL}s at most", flush=True)
+    print(f"  Full check interval: {FULL_CHECK_INTERVAL} seconds", flush=True)
     print(f"  Max hold time: {MAX_HOLD_DAYS} days", flush=True)
     print(f"  Exit types: STOP_LOSS, TAKE_PROFIT, TRAILING_STOP, TIME_EXPIRED", flush=True)
 
+    reader = GroupReader(EventBus(redis_client), CONSUMER_GROUP)
+    batcher = SymbolBatcher(TICK_CHECK_INTERVAL)
+    last_full_check = 0.0
+
     while True:
         try:
-            stats = signal_tracker.process_all_signals()
+            now = asyncio.get_event_loop().time()
+            if now - last_full_check >= FULL_CHECK_INTERVAL:
+                log_stats(signal_tracker.process_all_signals())
+                last_full_check = now
 
-            if stats.get("closed", 0) > 0:
-                exits = stats['exits']
-                print(f"  [Tracker] Closed: {stats['closed']} | "
-                      f"TP: {exits.get('TAKE_PROFIT', 0)} | "
-                      f"SL: {exits.get('STOP_LOSS', 0)} | "
-                      f"Trail: {exits.get('TRAILING_STOP', 0)} | "
-                      f"Exp: {exits.get('TIME_EXPIRED', 0)}", flush=True)
+            # Tick gelene kadar bloklan (event loop'u bloklamadan); semboller biriktirilir
+            events = await asyncio.to_thread(reader.read, batcher.block_ms(5000))
+            batcher.add(events)
+            reader.ack(events)  # Missed ticks are covered by the 60s full pass
 
-            await asyncio.sleep(60)
+            symbols = batcher.take()
+            if symbols:
+                log_stats(signal_tracker.process_all_signals(symbols))
 
         except Exception as e:
             print(f"[Tracker] Error: {e}", flush=True)
-            await asyncio.sleep(60)
+            await asyncio.sleep(5)
 
 
 if __name__ == "__main__":
@@ -17,6 +17,12 @@ import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import sqlite3
+import sys
+
+# Parent path ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_context import load_market_context
 
 # Config
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
@@ -429,11 +435,12 @@ def run_daily_analysis():
     print(f"[AI Analyst] Günlük analiz başlıyor - {datetime.now()}")
     print(f"{'='*60}")
     
-    # Verileri yükle
+    # Verileri yükle (fear & greed, futures, haberler tek pipeline ile)
     prices = json.loads(r.get("prices_data") or "{}")
-    futures = json.loads(r.get("futures_data") or "{}")
-    fear_greed = json.loads(r.get("fear_greed") or "{}")
-    news_db = json.loads(r.get("news_db") or "{}")
+    context = load_market_context(r, btc=prices.get("BTC", {}))
+    futures = context.futures
+    fear_greed = context.fear_greed_dict()
+    news_db = context.news
     
     print(f"[AI] Veriler: {len(prices)} coin, {len(news_db)} haber")
     
@@ -497,9 +504,10 @@ def run_portfolio_analysis_all():
     print(f"\n[AI] Portföy analizleri başlıyor...")
     
     prices = json.loads(r.get("prices_data") or "{}")
-    futures = json.loads(r.get("futures_data") or "{}")
-    fear_greed = json.loads(r.get("fear_greed") or "{}")
-    news_db = json.loads(r.get("news_db") or "{}")
+    context = load_market_context(r, btc=prices.get("BTC", {}))
+    futures = context.futures
+    fear_greed = context.fear_greed_dict()
+    news_db = context.news
     
     conn = get_db()
     users = conn.execute("SELECT id FROM users").fetchall()
@@ -5,10 +5,15 @@ CryptoSignal - Price Alerts Worker
 ===================================
 Fiyat alarmlarını kontrol eden worker
 
-Her 5 dakikada bir çalışır:
-1. Tüm aktif alarmları getir
-2. Her alarm için mevcut fiyatı kontrol et
+Price worker'ın tick olaylarıyla (events:prices, consumer group) çalışır.
+Tick'ler saniyede bir gelir; değişen semboller biriktirilip en fazla
+TICK_CHECK_INTERVAL saniyede bir kontrol edilir:
+1. Fiyatı değişen sembollerin aktif alarmlarını getir (SQL'de sembol filtresi)
+2. Her alarm için price store'daki fiyatı kontrol et
 3. Koşul sağlanmışsa tetikle ve bildirim gönder
+
+Başlangıçta ve her 5 dakikada bir tüm alarmlar tam kontrol edilir
+(olay akışı kesilirse / stream kırpıldıysa güvence).
 """
 
 import sys
@@ -16,12 +21,21 @@ import os
 import time
 import requests
 from datetime import datetime
+from typing import Iterable, Optional
 
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import get_active_price_alerts, trigger_price_alert, redis_client
 from config import TELEGRAM_ADMIN_BOT_TOKEN, ADMIN_CHAT_ID
+from services.price_store import PriceStore
+from services.event_bus import EventBus, GroupReader, SymbolBatcher
+
+CONSUMER_GROUP = "price_alerts"
+FULL_CHECK_INTERVAL = 300  # 5 dakika
+TICK_CHECK_INTERVAL = 5    # Tick turları arası en az süre (saniye)
+
+price_store = PriceStore(redis_client)
 
 
 def get_current_price(symbol: str) -> float:
@@ -121,16 +135,27 @@ def send_telegram_notification(user_id: str, symbol: str, target_price: float, c
         print(f"[TELEGRAM] Error sending notification: {e}")
 
 
-def check_price_alerts():
-    """Tüm aktif fiyat alarmlarını kontrol et"""
+def check_price_alerts(symbols: Optional[Iterable[str]] = None):
+    """
+    Aktif fiyat alarmlarını kontrol et
+
+    Args:
+        symbols: Sadece bu sembollerin alarmları (None = tümü)
+    """
+    full_check = symbols is None
     try:
-        alerts = get_active_price_alerts()
+        alerts = get_active_price_alerts(symbols)
 
         if not alerts:
-            print(f"[ALERTS] No active alerts to check")
+            if full_check:
+                print(f"[ALERTS] No active alerts to check")
             return
 
-        print(f"[ALERTS] Checking {len(alerts)} active alerts...")
+        if full_check:
+            print(f"[ALERTS] Checking {len(alerts)} active alerts...")
+
+        # Price store'dan tek HMGET (bulunamazsa get_current_price)
+        quotes = price_store.get_quotes(a['symbol'] for a in alerts)
 
         triggered_count = 0
 
@@ -142,7 +167,7 @@ def check_price_alerts():
             user_id = alert['user_id']
 
             # Get current price
-            current_price = get_current_price(symbol)
+            current_price = (quotes.get(symbol) or {}).get("price") or get_current_price(symbol)
 
             if current_price == 0:
                 print(f"[ALERTS] Could not fetch price for {symbol}, skipping")
@@ -169,7 +194,7 @@ def check_price_alerts():
 
         if triggered_count > 0:
             print(f"[ALERTS] ✅ {triggered_count} alerts triggered")
-        else:
+        elif full_check:
             print(f"[ALERTS] No alerts triggered this round")
 
     except Exception as e:
@@ -179,21 +204,33 @@ def check_price_alerts():
 def main():
     """Ana worker loop"""
     print("[PRICE ALERTS WORKER] Starting...")
-    print(f"[PRICE ALERTS WORKER] Check interval: 5 minutes")
+    print(f"[PRICE ALERTS WORKER] Event-driven (events:prices), full check every {FULL_CHECK_INTERVAL // 60} minutes")
+
+    reader = GroupReader(EventBus(redis_client), CONSUMER_GROUP)
+    batcher = SymbolBatcher(TICK_CHECK_INTERVAL)
+    last_full_check = 0.0
 
     while True:
         try:
-            print(f"\n[PRICE ALERTS] {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC - Checking alerts...")
-            check_price_alerts()
+            if time.time() - last_full_check >= FULL_CHECK_INTERVAL:
+                print(f"\n[PRICE ALERTS] {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC - Checking alerts...")
+                check_price_alerts()
+                last_full_check = time.time()
+
+            # Tick gelene kadar bloklan (en fazla 5 saniye); semboller biriktirilir
+            events = reader.read(block_ms=batcher.block_ms(5000))
+            batcher.add(events)
+            reader.ack(events)  # Kaçan tick'ler 5 dakikalık tam kontrolle kapsanır
+
+            symbols = batcher.take()
+            if symbols:
+                check_price_alerts(symbols)
 
         except Exception as e:
             print(f"[PRICE ALERTS] Fatal error: {e}")
             import traceback
             traceback.print_exc()
-
-        # Sleep 5 minutes
-        print(f"[PRICE ALERTS] Sleeping for 5 minutes...")
-        time.sleep(300)
+            time.sleep(5)
 
 
 if __name__ == "__main__":
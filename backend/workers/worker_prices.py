@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """
-CryptoSignal - Price Worker v3.2
+CryptoSignal - Price Worker v3.3
 ================================
 - 1000 coin desteği
-- Top 100 Binance WebSocket real-time
+- Tüm Binance USDT pariteleri WebSocket real-time (shard'lı combined stream)
+- Tick'lerden 1m/5m/1h/1d OHLCV mumları (kapananlar Redis'e)
 - CoinGecko 5 dakika cache
 - FIX: Doğru CoinGecko ID eşleştirmesi
 """
@@ -14,23 +15,49 @@ import redis
 import httpx
 import websockets
 import os
+import random
+import sys
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Set
+from typing import Dict, List, Set
+
+# Parent path ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import FIAT_CURRENCIES, STABLECOINS, WRAPPED_TOKENS
+from services.price_store import PriceStore
+from services.event_bus import EventBus
+from services.candle_aggregator import (
+    CandleAggregator, publish_closed_candles, publish_open_candles
+)
 
 # Redis
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
 r = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True, password=REDIS_PASSWORD)
+price_store = PriceStore(r)
+event_bus = EventBus(r)
+candle_aggregator = CandleAggregator()
 
 # Ayarlar
 COINGECKO_INTERVAL = 300  # 5 dakika
 REDIS_SYNC_INTERVAL = 1   # 1 saniye
+LEGACY_BLOB_INTERVAL = 30  # prices_data tam blob (eski okuyucular için)
 CLEANUP_INTERVAL = 3600   # 1 saat
 
+# Binance WebSocket shard ayarları
+BINANCE_STREAMS_PER_SHARD = 200  # Combined stream bağlantısı başına stream (limit 1024)
+BINANCE_RECONNECT_BASE = 1       # Backoff başlangıç (saniye)
+BINANCE_RECONNECT_MAX = 60       # Backoff üst sınır (saniye)
+BINANCE_PAIRS_REFRESH = 3600     # exchangeInfo yenileme (delist / yeni listeleme)
+NON_COIN_BASES = STABLECOINS | WRAPPED_TOKENS | FIAT_CURRENCIES  # Fiyat listesine alınmaz
+
 # State
 prices_data: Dict[str, Dict] = {}
-ws_connected = False
+dirty_symbols: Set[str] = set()  # Son sync'ten beri değişen semboller
+connected_shards: Set[int] = set()
+binance_symbol_map: Dict[str, str] = {}  # "BTCUSDT" -> "BTC" (O(1) çözümleme)
 
-print("[Price Worker v3.2] Starting...")
+print("[Price Worker v3.3] Starting...")
 
 # Öncelikli CoinGecko ID -> Symbol eşleştirmesi (doğru coinler)
 PRIORITY_COINS = {
@@ -140,7 +167,7 @@ PRIORITY_COINS = {
 # Ters mapping: Symbol -> CoinGecko ID
 SYMBOL_TO_ID = {v: k for k, v in PRIORITY_COINS.items()}
 
-# Top 100 Binance symbols for WebSocket
+# Top 100 Binance symbols - exchangeInfo alınamazsa fallback, ayrıca sembol override'ları
 BINANCE_TOP100 = {
     "btcusdt": "BTC", "ethusdt": "ETH", "bnbusdt": "BNB", "xrpusdt": "XRP",
     "solusdt": "SOL", "adausdt": "ADA", "dogeusdt": "DOGE", "trxusdt": "TRX",
@@ -213,6 +240,7 @@ async def fetch_coingecko():
         if coin_id in PRIORITY_COINS:
             correct_symbol = PRIORITY_COINS[coin_id]
             processed_symbols.add(correct_symbol)
+            dirty_symbols.add(correct_symbol)
             
             # WS varsa sadece metadata güncelle
             if correct_symbol in prices_data and prices_data[correct_symbol].get("source") == "binance_ws":
@@ -277,6 +305,7 @@ async def fetch_coingecko():
                 "image": c.get("image", ""),
             })
             processed_symbols.add(symbol)
+            dirty_symbols.add(symbol)
         elif symbol not in prices_data:
             prices_data[symbol] = {
                 "id": coin_id,
@@ -300,6 +329,7 @@ async def fetch_coingecko():
                 "updated_at": datetime.utcnow().isoformat(),
             }
             processed_symbols.add(symbol)
+            dirty_symbols.add(symbol)
     
     print(f"[CoinGecko] Loaded {len(all_coins)} coins, total: {len(prices_data)}")
 
@@ -311,90 +341,234 @@ async def coingecko_loop():
         await asyncio.sleep(COINGECKO_INTERVAL)
 
 
-async def binance_ws():
-    """Binance WebSocket - Top 100 real-time"""
-    global prices_data, ws_connected
+async def load_binance_usdt_pairs() -> Dict[str, str]:
+    """
+    Binance exchangeInfo'dan tüm aktif USDT spot paritelerini çek
+    (stablecoin / wrapped / fiat base'ler hariç)
+    Returns: {"BTCUSDT": "BTC", ...} - hata durumunda boş
+    """
+    mapping: Dict[str, str] = {}
+    
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            resp = await client.get(
+                "https://api.binance.com/api/v3/exchangeInfo",
+                params={"permissions": "SPOT"}
+            )
+            if resp.status_code == 200:
+                for s in resp.json().get("symbols", []):
+                    if (s.get("quoteAsset") == "USDT"
+                            and s.get("status") == "TRADING"
+                            and s.get("isSpotTradingAllowed", True)
+                            and s.get("baseAsset", "").upper() not in NON_COIN_BASES):
+                        mapping[s["symbol"]] = s["baseAsset"].upper()
+    except Exception as e:
+        print(f"[Binance WS] exchangeInfo error: {e}")
     
-    streams = [f"{s}@ticker" for s in BINANCE_TOP100.keys()]
+    # Bilinen sembol düzeltmeleri (ör. MATICUSDT -> POL)
+    for pair, symbol in BINANCE_TOP100.items():
+        if pair.upper() in mapping:
+            mapping[pair.upper()] = symbol
+    
+    return mapping
+
+
+def fallback_binance_pairs() -> Dict[str, str]:
+    """exchangeInfo erişilemezse BINANCE_TOP100 listesi"""
+    overrides = {k.upper(): v for k, v in BINANCE_TOP100.items()}
+    print(f"[Binance WS] exchangeInfo unavailable, falling back to {len(overrides)} pairs")
+    return overrides
+
+
+def drop_symbols(symbols: Set[str]):
+    """Artık takip edilmeyen sembolleri bellekten ve price store'dan sil"""
+    if not symbols:
+        return
+    for symbol in symbols:
+        prices_data.pop(symbol, None)
+        dirty_symbols.discard(symbol)
+    try:
+        price_store.remove(symbols)
+        print(f"[Binance WS] Removed {len(symbols)} delisted symbols")
+    except Exception as e:
+        print(f"[Binance WS] Remove error: {e}")
+
+
+def stale_ws_symbols(symbols: Set[str]) -> Set[str]:
+    """Önceki çalışmadan kalan, artık Binance'te olmayan WS sembolleri (başlangıç)"""
+    try:
+        stored = price_store.get_all()
+    except Exception as e:
+        print(f"[Binance WS] Store read error: {e}")
+        return set()
+    return {
+        s for s, quote in stored.items()
+        if quote.get("source") == "binance_ws" and s not in symbols
+    }
+
+
+def handle_ticker(d: Dict):
+    """Tek bir 24hr ticker mesajını prices_data'ya uygula"""
+    symbol = binance_symbol_map.get(d.get("s", ""))
+    if not symbol:
+        return
+    
+    new_price = float(d.get("c", 0))
+    old_price = prices_data.get(symbol, {}).get("price", new_price)
+    
+    # Instant change calculation
+    change_instant = 0
+    if old_price > 0 and new_price > 0:
+        change_instant = ((new_price - old_price) / old_price * 100)
+    
+    # Mum toplayıcı (event time)
+    ts_ms = int(d.get("E") or time.time() * 1000)
+    candle_aggregator.on_tick(symbol, new_price, ts_ms)
+    
+    # Update or create
+    if symbol in prices_data:
+        prices_data[symbol].update({
+            "price": new_price,
+            "change_24h": float(d.get("P", 0)),
+            "change_instant": round(change_instant, 4),
+            "high_24h": float(d.get("h", 0)),
+            "low_24h": float(d.get("l", 0)),
+            "volume_24h": float(d.get("q", 0)),
+            "bid": float(d.get("b", 0)),
+            "ask": float(d.get("a", 0)),
+            "trades_24h": int(d.get("n", 0)),
+            "source": "binance_ws",
+            "updated_at": datetime.utcnow().isoformat(),
+        })
+    else:
+        prices_data[symbol] = {
+            "symbol": symbol,
+            "price": new_price,
+            "change_24h": float(d.get("P", 0)),
+            "change_instant": round(change_instant, 4),
+            "high_24h": float(d.get("h", 0)),
+            "low_24h": float(d.get("l", 0)),
+            "volume_24h": float(d.get("q", 0)),
+            "source": "binance_ws",
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+    dirty_symbols.add(symbol)
+
+
+async def binance_shard(shard_id: int, pairs: List[str]):
+    """Tek combined-stream bağlantısı - kendi backoff'u ile bağımsız reconnect"""
+    streams = [f"{p.lower()}@ticker" for p in pairs]
     url = f"wss://stream.binance.com:9443/stream?streams={'/'.join(streams)}"
+    attempt = 0
     
     while True:
         try:
             async with websockets.connect(url, ping_interval=20, ping_timeout=10) as ws:
-                ws_connected = True
-                print(f"[Binance WS] Connected - {len(BINANCE_TOP100)} coins real-time")
+                connected_shards.add(shard_id)
+                attempt = 0
+                print(f"[Binance WS] Shard {shard_id} connected - {len(pairs)} pairs")
                 
                 async for msg in ws:
                     try:
                         data = json.loads(msg)
                         if "data" in data:
-                            d = data["data"]
-                            ws_symbol = d.get("s", "").lower()
-                            
-                            # Find symbol
-                            symbol = None
-                            for k, v in BINANCE_TOP100.items():
-                                if k == ws_symbol or k.replace("usdt", "") == ws_symbol.replace("usdt", ""):
-                                    symbol = v
-                                    break
-                            
-                            if symbol:
-                                new_price = float(d.get("c", 0))
-                                old_price = prices_data.get(symbol, {}).get("price", new_price)
-                                
-                                # Instant change calculation
-                                change_instant = 0
-                                if old_price > 0 and new_price > 0:
-                                    change_instant = ((new_price - old_price) / old_price * 100)
-                                
-                                # Update or create
-                                if symbol in prices_data:
-                                    prices_data[symbol].update({
-                                        "price": new_price,
-                                        "change_24h": float(d.get("P", 0)),
-                                        "change_instant": round(change_instant, 4),
-                                        "high_24h": float(d.get("h", 0)),
-                                        "low_24h": float(d.get("l", 0)),
-                                        "volume_24h": float(d.get("q", 0)),
-                                        "bid": float(d.get("b", 0)),
-                                        "ask": float(d.get("a", 0)),
-                                        "trades_24h": int(d.get("n", 0)),
-                                        "source": "binance_ws",
-                                        "updated_at": datetime.utcnow().isoformat(),
-                                    })
-                                else:
-                                    prices_data[symbol] = {
-                                        "symbol": symbol,
-                                        "price": new_price,
-                                        "change_24h": float(d.get("P", 0)),
-                                        "change_instant": round(change_instant, 4),
-                                        "high_24h": float(d.get("h", 0)),
-                                        "low_24h": float(d.get("l", 0)),
-                                        "volume_24h": float(d.get("q", 0)),
-                                        "source": "binance_ws",
-                                        "updated_at": datetime.utcnow().isoformat(),
-                                    }
-                    except:
+                            handle_ticker(data["data"])
+                    except Exception:
                         pass
                         
         except Exception as e:
-            ws_connected = False
-            print(f"[Binance WS] Error: {e}, reconnecting in 5s...")
-            await asyncio.sleep(5)
+            print(f"[Binance WS] Shard {shard_id} error: {e}")
+        
+        connected_shards.discard(shard_id)
+        delay = min(BINANCE_RECONNECT_BASE * (2 ** attempt), BINANCE_RECONNECT_MAX)
+        delay += random.uniform(0, delay / 2)  # Jitter - shard'lar aynı anda bağlanmasın
+        attempt += 1
+        print(f"[Binance WS] Shard {shard_id} reconnecting in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+
+async def binance_ws():
+    """
+    Binance WebSocket - tüm USDT pariteleri, shard'lara bölünmüş.
+    Pair listesi saatlik yenilenir; değişirse shard'lar yeniden kurulur,
+    listeden çıkan semboller silinir.
+    """
+    shard_tasks: List[asyncio.Task] = []
+    pairs = await load_binance_usdt_pairs()
+    removed = stale_ws_symbols(set(pairs.values())) if pairs else set()
+    pairs = pairs or fallback_binance_pairs()
+    
+    while True:
+        if pairs and pairs.keys() != binance_symbol_map.keys():
+            if binance_symbol_map:
+                removed = set(binance_symbol_map.values()) - set(pairs.values())
+            binance_symbol_map.clear()
+            binance_symbol_map.update(pairs)
+            drop_symbols(removed)
+            
+            for task in shard_tasks:
+                task.cancel()
+            connected_shards.clear()
+            
+            pair_list = sorted(pairs.keys())
+            shards = [
+                pair_list[i:i + BINANCE_STREAMS_PER_SHARD]
+                for i in range(0, len(pair_list), BINANCE_STREAMS_PER_SHARD)
+            ]
+            print(f"[Binance WS] {len(pair_list)} USDT pairs across {len(shards)} shards")
+            shard_tasks = [
+                asyncio.create_task(binance_shard(i, shard)) for i, shard in enumerate(shards)
+            ]
+        
+        await asyncio.sleep(BINANCE_PAIRS_REFRESH)
+        # Yenilemede fallback yok: exchangeInfo hatasında mevcut liste korunur
+        pairs = await load_binance_usdt_pairs()
 
 
 async def redis_sync():
-    """Redis'e her saniye sync"""
+    """Redis'e her saniye sync - sadece değişen semboller"""
+    last_blob_write = 0.0
+    last_blob_version = 0
+    
     while True:
         try:
-            if prices_data:
-                r.set("prices_data", json.dumps(prices_data))
+            if dirty_symbols:
+                changed = {s: prices_data[s] for s in dirty_symbols if s in prices_data}
+                dirty_symbols.clear()
+                try:
+                    version = price_store.publish(changed)
+                except Exception:
+                    # Yazılamayanlar bir sonraki sync'te tekrar denensin
+                    dirty_symbols.update(changed)
+                    raise
+                
+                publish_open_candles(r, candle_aggregator, changed.keys())
+                
                 r.set("prices_updated", datetime.utcnow().isoformat())
+                
+                # Okuyucuları uyandır (API broadcaster, alerts, tracker)
+                try:
+                    event_bus.publish_tick(version, changed.keys())
+                except Exception as e:
+                    print(f"[EventBus] Tick publish error: {e}")
                 r.set("prices_count", len(prices_data))
                 
                 # WS status
                 ws_coins = sum(1 for p in prices_data.values() if p.get("source") == "binance_ws")
                 r.set("prices_ws_count", ws_coins)
+            
+            # Kapanan mumlar
+            publish_closed_candles(r, candle_aggregator.drain_closed())
+            
+            # Legacy tam blob - seyrek ve sadece versiyon değiştiyse
+            now = asyncio.get_event_loop().time()
+            version = price_store.published_version
+            if version != last_blob_version and now - last_blob_write >= LEGACY_BLOB_INTERVAL:
+                r.set("prices_data", json.dumps(prices_data))
+                r.set("prices_data_updated", str(version))  # API snapshot cache versiyonu (blob'dan sonra)
+                event_bus.publish_snapshot("prices_data", version)
+                last_blob_write = now
+                last_blob_version = version
                 
         except Exception as e:
             print(f"[Redis] Error: {e}")
@@ -418,7 +592,12 @@ async def cleanup():
                 
                 removed = len(news) - len(cleaned)
                 if removed > 0:
-                    r.set("news_db", json.dumps(cleaned))
+                    # news_updated aynı transaction'da: API snapshot cache'i yenilensin
+                    pipe = r.pipeline(transaction=True)
+                    pipe.set("news_db", json.dumps(cleaned))
+                    pipe.set("news_count", str(len(cleaned)))
+                    pipe.set("news_updated", datetime.utcnow().isoformat())
+                    pipe.execute()
                     print(f"[Cleanup] Removed {removed} old news, kept {len(cleaned)}")
         except Exception as e:
             print(f"[Cleanup] Error: {e}")
@@ -437,14 +616,15 @@ async def status_printer():
         rndr = prices_data.get("RNDR", {})
         
         print(f"[Status] Total: {len(prices_data)} | WS: {ws_coins} | CG: {cg_coins} | "
+              f"Shards: {len(connected_shards)} | "
               f"BTC: ${btc.get('price', 0):,.0f} ({btc.get('change_24h', 0):+.1f}%) | "
               f"ETH: ${eth.get('price', 0):,.0f} | RNDR: ${rndr.get('price', 0):.2f}")
 
 
 async def main():
     print(f"[Prices] CoinGecko interval: {COINGECKO_INTERVAL}s")
-    print(f"[Prices] Redis sync: {REDIS_SYNC_INTERVAL}s")
-    print(f"[Prices] WebSocket coins: {len(BINANCE_TOP100)}")
+    print(f"[Prices] Redis sync: {REDIS_SYNC_INTERVAL}s (delta), full blob: {LEGACY_BLOB_INTERVAL}s")
+    print(f"[Prices] WebSocket: all USDT pairs, {BINANCE_STREAMS_PER_SHARD} streams/shard")
     print(f"[Prices] Priority coins: {len(PRIORITY_COINS)}")
     
     # Initial load
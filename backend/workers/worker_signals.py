@@ -23,16 +23,28 @@ import json
 import redis
 import httpx
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 import sys
 
 # Parent path ekle
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.analysis_service import AnalysisService, get_market_regime
+from services.candle_aggregator import get_contiguous_candles
+from services.candle_store import BinanceRateLimited, candle_store
+from services.indicator_state import IndicatorState, IndicatorStateStore
+from services.market_context import MarketContext, load_market_context
+from services.signal_store import SignalStore, join_timeframe
+from services.signal_quality import (
+    BUY_SIGNALS, SELL_SIGNALS, MAX_ACTIVE_SIGNALS, MIN_CONFIDENCE_FOR_TRADE, MIN_FACTOR_ALIGNMENT,
+    filter_top_signals, should_emit_signal
+)
 from database import save_signal_track
-from config import SKIP_SIGNAL_COINS, STABLECOINS, WRAPPED_TOKENS
+from config import SKIP_SIGNAL_COINS, STABLECOINS, WRAPPED_TOKENS, SIGNAL_SCORING_WORKERS
 
 # Redis connection
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
@@ -87,9 +99,23 @@ WRAPPED_TOKEN_MAP = {
     "WFTM": "FTM",
 }
 
-# CoinGecko rate limiting
-COINGECKO_SEMAPHORE = asyncio.Semaphore(10)  # Increased for better throughput
-COINGECKO_BACKOFF = 1.0  # Reduced backoff time
+# Historical data fetch - provider bazlı eşzamanlılık limitleri
+PROVIDER_CONCURRENCY = {
+    "binance": 20,    # Weight limiti yüksek
+    "coingecko": 5,   # Free tier ~30 req/dk
+    "cmc": 2,
+}
+PROVIDER_SEMAPHORES = {name: asyncio.Semaphore(n) for name, n in PROVIDER_CONCURRENCY.items()}
+PROVIDER_MAX_RETRIES = 3
+PROVIDER_BACKOFF_BASE = 1.0   # saniye (Retry-After yoksa üstel)
+PROVIDER_BACKOFF_MAX = 60.0
+RATE_LIMIT_STATUSES = {418, 429, 503}
+
+# Provider -> bu zamana kadar istek atma (loop.time())
+provider_cooldown_until: Dict[str, float] = {}
+
+# Tüm provider'lar için paylaşılan keep-alive HTTP client
+http_client: Optional[httpx.AsyncClient] = None
 
 # AI/Yapay Zeka Coinleri - Her zaman işlenecek
 AI_COINS = {
@@ -116,10 +142,14 @@ HISTORICAL_DATA_LIMIT = 400      # İlk 400'e historical data (expanded Binance
 # Analysis Service instance
 analysis_service = AnalysisService()
 
-# Quality Gate settings
-MIN_CONFIDENCE_FOR_TRADE = 60
-MIN_FACTOR_ALIGNMENT = 2
-HIGH_RISK_CONFIDENCE_PENALTY = 10
+# Sembol başına streaming indikatör durumu (restart'ta Redis'ten yüklenir)
+indicator_states = IndicatorStateStore(r, "1d")
+signal_store = SignalStore(r)
+
+# Process pool skorlama (SIGNAL_SCORING_WORKERS > 1 ise)
+SCORING_CHUNK_SIZE = 25          # Pool'a gönderilen coin grubu boyutu
+scoring_pool: Optional[ProcessPoolExecutor] = None
+
 
 def get_fear_greed_value() -> int:
     """Redis'ten Fear & Greed degerini al"""
@@ -133,191 +163,6 @@ def get_fear_greed_value() -> int:
     return 50
 
 
-BUY_SIGNALS = {"BUY", "AL", "STRONG_BUY", "GÜÇLÜ AL"}
-SELL_SIGNALS = {"SELL", "SAT", "STRONG_SELL", "GÜÇLÜ SAT"}
-HOLD_SIGNALS = {"HOLD", "BEKLE"}
-
-# Top 50 signal filter
-MAX_ACTIVE_SIGNALS = 50
-
-
-def filter_top_signals(signals: dict, max_count: int = MAX_ACTIVE_SIGNALS) -> dict:
-    """
-    En kaliteli sinyalleri filtrele - sadece AL/SAT sinyallerini say
-    Sıralama: confidence * (1 + alignment/10) * quality_bonus
-    """
-    active_signals = []
-    hold_signals = []
-
-    for symbol, sig in signals.items():
-        signal_type = sig.get("signal", "HOLD")
-        if signal_type in BUY_SIGNALS or signal_type in SELL_SIGNALS:
-            conf = sig.get("confidence", 0)
-            details = sig.get("confidence_details", {})
-            alignment = _extract_alignment(details)
-
-            # Quality score hesapla
-            quality_bonus = 1.0
-            qg = sig.get("quality_gate", {})
-            if qg.get("passed"):
-                quality_bonus = 1.2
-
-            # R:R bonus
-            rr = sig.get("risk_reward_ratio", 0)
-            try:
-                if rr and float(rr) >= 2.0:
-                    quality_bonus *= 1.1
-            except (TypeError, ValueError):
-                pass
-
-            score = conf * (1 + alignment / 10) * quality_bonus
-            active_signals.append((symbol, sig, score))
-        else:
-            hold_signals.append((symbol, sig))
-
-    # En yüksek skorlu sinyalleri al
-    active_signals.sort(key=lambda x: x[2], reverse=True)
-    top_active = active_signals[:max_count]
-
-    # Sonucu oluştur
-    result = {}
-    for symbol, sig, _ in top_active:
-        result[symbol] = sig
-
-    # HOLD sinyallerini de ekle (bunlar zaten işlem önermiyor)
-    for symbol, sig in hold_signals:
-        result[symbol] = sig
-
-    return result
-
-
-def _norm_risk(risk_level: str) -> str:
-    """Risk seviyesini normalize et"""
-    if not risk_level:
-        return "UNKNOWN"
-    r = risk_level.strip().upper()
-    if r in {"HIGH", "YÜKSEK"}:
-        return "HIGH"
-    if r in {"MEDIUM", "ORTA"}:
-        return "MEDIUM"
-    if r in {"LOW", "DÜŞÜK", "DUSUK"}:
-        return "LOW"
-    return r
-
-
-def _extract_alignment(details: dict) -> int:
-    """confidence_details içinden factor uyum sayısını çıkarır"""
-    if not isinstance(details, dict):
-        return 0
-
-    fb = details.get("factors_buy")
-    fs = details.get("factors_sell")
-
-    if isinstance(fb, (int, float)) or isinstance(fs, (int, float)):
-        try:
-            fb = int(fb or 0)
-            fs = int(fs or 0)
-            return max(fb, fs)
-        except Exception:
-            return 0
-
-    if isinstance(fb, list) or isinstance(fs, list):
-        fb_n = len(fb or [])
-        fs_n = len(fs or [])
-        return max(fb_n, fs_n)
-
-    return 0
-
-
-def _has_indicators(technical: dict) -> bool:
-    """İndikatör verisi var mı kontrol et"""
-    if not technical:
-        return False
-
-    rsi = technical.get("rsi")
-    has_rsi = rsi is not None and rsi not in ("N/A", "na", "NA", "") and isinstance(rsi, (int, float))
-
-    macd = technical.get("macd")
-    if macd is not None:
-        if isinstance(macd, dict):
-            has_macd = macd.get("histogram") is not None
-        elif isinstance(macd, (int, float)):
-            has_macd = True
-        else:
-            has_macd = macd not in ("N/A", "na", "NA", "")
-    else:
-        has_macd = False
-
-    ma = technical.get("ma")
-    if ma is not None and isinstance(ma, dict):
-        has_ma = ma.get("ma_20") is not None or ma.get("ma_50") is not None
-    else:
-        has_ma = False
-
-    return has_rsi or has_macd or has_ma
-
-
-def should_emit_signal(analysis: dict, risk_level: str, technical: dict = None, market_data: dict = None, futures_data: dict = None) -> tuple:
-    """Geliştirilmiş Quality Gate v3 - Market Regime + Crowding Protection"""
-    signal = (analysis.get("signal") or "BEKLE").strip()
-    confidence = float(analysis.get("confidence") or 0)
-    details = analysis.get("confidence_details") or {}
-
-    if signal in HOLD_SIGNALS:
-        return "HOLD", confidence, "already_hold"
-
-    if signal not in BUY_SIGNALS and signal not in SELL_SIGNALS:
-        return "HOLD", confidence, f"unknown_signal_{signal}"
-
-    if not _has_indicators(technical):
-        return "HOLD", confidence, "missing_indicators"
-
-    # MARKET REGIME FILTRESI
-    if market_data:
-        btc_change = market_data.get("btc_change_24h", 0) or 0
-        fear_greed = market_data.get("fear_greed", 50) or 50
-
-        # BTC düşüşteyken AL verme
-        if signal in BUY_SIGNALS and btc_change < -3:
-            return "HOLD", confidence, f"btc_downtrend_{btc_change:.1f}%"
-
-        # Bear market'te AL için ekstra kontrol
-        if signal in BUY_SIGNALS and btc_change < -5 and fear_greed < 30:
-            if confidence < 90:
-                return "HOLD", confidence, "bear_market_blocks_buy"
-
-    # CROWDING PROTECTION
-    if futures_data:
-        ls_ratio = futures_data.get("long_short_ratio", 1.0) or 1.0
-        funding_rate = futures_data.get("funding_rate", 0.0) or 0.0
-
-        # Herkes long'dayken AL verme
-        if signal in BUY_SIGNALS and ls_ratio > 2.5:
-            return "HOLD", confidence, f"crowded_long_{ls_ratio:.2f}"
-
-        # Herkes short'dayken SAT verme
-        if signal in SELL_SIGNALS and ls_ratio < 0.5:
-            return "HOLD", confidence, f"crowded_short_{ls_ratio:.2f}"
-
-        # Yüksek funding rate'de long açma
-        if signal in BUY_SIGNALS and funding_rate > 0.1:
-            return "HOLD", confidence, f"high_funding_{funding_rate:.4f}"
-
-    # CONFIDENCE THRESHOLD
-    risk = _norm_risk(risk_level)
-    threshold = MIN_CONFIDENCE_FOR_TRADE + (HIGH_RISK_CONFIDENCE_PENALTY if risk == "HIGH" else 0)
-
-    if confidence < threshold:
-        return "HOLD", confidence, f"low_confidence_{confidence:.1f}<{threshold}"
-
-    # FAKTÖR UYUMU
-    alignment = _extract_alignment(details)
-    if alignment < MIN_FACTOR_ALIGNMENT:
-        return "HOLD", confidence, f"low_alignment_{alignment}<{MIN_FACTOR_ALIGNMENT}"
-
-    return signal, confidence, "passed"
-
-
 print("[Signal Worker v2.0] Starting with ATR-based Exit Strategy...")
 print(f"  Update interval: {UPDATE_INTERVAL}s")
 print(f"  Signal check interval: {SIGNAL_CHECK_INTERVAL}s")
@@ -326,6 +171,7 @@ print(f"  Quality Gate: min_conf={MIN_CONFIDENCE_FOR_TRADE}, min_align={MIN_FACT
 print(f"  Skip filters: {len(SKIP_SIGNAL_COINS)} coins")
 print(f"  AI Coins: {len(AI_COINS)} tracked")
 print(f"  Limits: TOP {COIN_PROCESS_LIMIT} + Historical {HISTORICAL_DATA_LIMIT}")
+print(f"  Scoring workers: {SIGNAL_SCORING_WORKERS if SIGNAL_SCORING_WORKERS > 1 else 'serial'}")
 
 
 # ============================================
@@ -454,27 +300,100 @@ SYMBOL_TO_COINGECKO = {
 CMC_API_KEY = os.getenv("CMC_API_KEY", "")
 
 
+# ============================================
+# SHARED HTTP CLIENT & RATE LIMITING
+# ============================================
+
+def get_http_client() -> httpx.AsyncClient:
+    """Paylaşılan, connection pool'lu HTTP client (lazy)"""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(
+                max_connections=sum(PROVIDER_CONCURRENCY.values()),
+                max_keepalive_connections=sum(PROVIDER_CONCURRENCY.values())
+            )
+        )
+    return http_client
+
+
+def _retry_after(resp: httpx.Response, attempt: int) -> float:
+    """Retry-After header'ı veya üstel backoff (saniye)"""
+    try:
+        delay = float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        delay = PROVIDER_BACKOFF_BASE * (2 ** attempt)
+    return min(max(delay, 0.0), PROVIDER_BACKOFF_MAX)
+
+
+def _cooldown_remaining(provider: str) -> float:
+    """Provider cooldown'ının kalan süresi (saniye)"""
+    return provider_cooldown_until.get(provider, 0) - asyncio.get_event_loop().time()
+
+
+def _set_cooldown(provider: str, delay: float, reason: str):
+    """Tüm task'lar aynı cooldown'a uyar (thundering herd engeli)"""
+    provider_cooldown_until[provider] = max(
+        provider_cooldown_until.get(provider, 0), asyncio.get_event_loop().time() + delay
+    )
+    print(f"[{provider}] Rate limited ({reason}), backing off {delay:.1f}s")
+
+
+async def _wait_cooldown(provider: str):
+    """Provider rate limit'e girdiyse cooldown bitene kadar bekle"""
+    remaining = _cooldown_remaining(provider)
+    if remaining > 0:
+        await asyncio.sleep(remaining)
+
+
+async def provider_get(provider: str, url: str, **kwargs) -> Optional[httpx.Response]:
+    """
+    Rate-limit farkında GET.
+    - Provider semaphore'u ile eşzamanlılık sınırı
+    - 429/418/503'te Retry-After kadar provider genelinde bekleme
+    Returns: 200 cevabı veya None
+    """
+    client = get_http_client()
+
+    for attempt in range(PROVIDER_MAX_RETRIES + 1):
+        await _wait_cooldown(provider)
+        async with PROVIDER_SEMAPHORES[provider]:
+            resp = await client.get(url, **kwargs)
+
+        if resp.status_code == 200:
+            return resp
+        if resp.status_code not in RATE_LIMIT_STATUSES or attempt == PROVIDER_MAX_RETRIES:
+            return None
+
+        _set_cooldown(provider, _retry_after(resp, attempt), str(resp.status_code))
+    return None
+
+
 async def fetch_from_binance(symbol: str, days: int) -> List:
-    """Binance Klines API"""
+    """Binance Klines (price worker mumları veya yerel candle store üzerinden)"""
+    local = get_contiguous_candles(r, symbol, "1d", min(days, 365), include_open=True)
+    if len(local) >= min(days, 365):
+        return [[c["timestamp"], c["close"]] for c in local]
+
     if symbol not in BINANCE_SYMBOLS:
         return []
 
-    try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(
-                "https://api.binance.com/api/v3/klines",
-                params={
-                    "symbol": f"{symbol}USDT",
-                    "interval": "1d",
-                    "limit": min(days, 365)
-                }
-            )
-            if resp.status_code == 200:
-                klines = resp.json()
-                prices = [[int(k[0]), float(k[4])] for k in klines]
-                return prices
-    except Exception as e:
-        print(f"[Binance] {symbol} error: {e}")
+    for attempt in range(PROVIDER_MAX_RETRIES + 1):
+        if _cooldown_remaining("binance") > PROVIDER_BACKOFF_MAX:
+            return []  # Uzun ban (418) - bu turda fallback provider'lar kullanılır
+        await _wait_cooldown("binance")
+        try:
+            # Sadece son kayıttan sonraki mumlar ağdan çekilir
+            async with PROVIDER_SEMAPHORES["binance"]:
+                klines = await candle_store.get_klines(symbol, "1d", min(days, 365), client=get_http_client())
+            return [[int(t), float(c)] for t, c in zip(klines["open_time"], klines["close"])]
+        except BinanceRateLimited as e:
+            # Retry-After kısaltılmaz: ban süresince Binance'e istek atılmaz
+            _set_cooldown("binance", e.retry_after, "429/418")
+        except Exception as e:
+            print(f"[Binance] {symbol} error: {e}")
+            return []
     return []
 
 
@@ -485,21 +404,17 @@ async def fetch_from_coingecko(symbol: str, days: int) -> List:
         return []
 
     try:
-        async with COINGECKO_SEMAPHORE:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.get(
-                    f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart",
-                    params={
-                        "vs_currency": "usd",
-                        "days": str(days),
-                        "interval": "daily"
-                    }
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    return data.get("prices", [])
-                elif resp.status_code == 429:
-                    await asyncio.sleep(COINGECKO_BACKOFF)
+        resp = await provider_get(
+            "coingecko",
+            f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart",
+            params={
+                "vs_currency": "usd",
+                "days": str(days),
+                "interval": "daily"
+            }
+        )
+        if resp is not None:
+            return resp.json().get("prices", [])
     except Exception as e:
         print(f"[CoinGecko] {symbol} error: {e}")
     return []
@@ -511,47 +426,47 @@ async def fetch_from_cmc(symbol: str, days: int) -> List:
         return []
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            # First get CMC ID for the symbol
-            resp = await client.get(
-                "https://pro-api.coinmarketcap.com/v1/cryptocurrency/map",
-                headers={"X-CMC_PRO_API_KEY": CMC_API_KEY},
-                params={"symbol": symbol, "limit": 1}
-            )
-            if resp.status_code != 200:
-                return []
-
+        # First get CMC ID for the symbol
+        resp = await provider_get(
+            "cmc",
+            "https://pro-api.coinmarketcap.com/v1/cryptocurrency/map",
+            headers={"X-CMC_PRO_API_KEY": CMC_API_KEY},
+            params={"symbol": symbol, "limit": 1}
+        )
+        if resp is None:
+            return []
+
+        data = resp.json()
+        if not data.get("data"):
+            return []
+
+        cmc_id = data["data"][0]["id"]
+
+        # Get historical quotes
+        resp = await provider_get(
+            "cmc",
+            "https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/historical",
+            headers={"X-CMC_PRO_API_KEY": CMC_API_KEY},
+            params={
+                "id": cmc_id,
+                "interval": "daily",
+                "count": min(days, 90)
+            }
+        )
+        if resp is not None:
             data = resp.json()
-            if not data.get("data"):
-                return []
-
-            cmc_id = data["data"][0]["id"]
-
-            # Get historical quotes
-            resp = await client.get(
-                "https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/historical",
-                headers={"X-CMC_PRO_API_KEY": CMC_API_KEY},
-                params={
-                    "id": cmc_id,
-                    "interval": "daily",
-                    "count": min(days, 90)
-                }
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                quotes = data.get("data", {}).get("quotes", [])
-                prices = []
-                for q in quotes:
-                    try:
-                        price = q.get("quote", {}).get("USD", {}).get("price")
-                        ts = q.get("timestamp", "")
-                        if price and ts:
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                            prices.append([int(dt.timestamp() * 1000), float(price)])
-                    except:
-                        continue
-                return prices
+            quotes = data.get("data", {}).get("quotes", [])
+            prices = []
+            for q in quotes:
+                try:
+                    price = q.get("quote", {}).get("USD", {}).get("price")
+                    ts = q.get("timestamp", "")
+                    if price and ts:
+                        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+                        prices.append([int(dt.timestamp() * 1000), float(price)])
+                except:
+                    continue
+            return prices
     except Exception as e:
         pass  # Silent fail for CMC
     return []
@@ -610,74 +525,102 @@ async def fetch_historical_prices(symbol: str, days: int = 90) -> List:
     return await get_cached_historical(symbol, days)
 
 
-def get_news_sentiment_for_coin(symbol: str, news_db: Dict) -> Optional[Dict]:
-    """Coin için news sentiment hesapla"""
-    if not news_db:
-        return None
+async def prefetch_historical_prices(symbols: List[str], days: int = 90) -> Dict[str, List]:
+    """
+    Tüm coin evreni için historical data'yı sinyal döngüsünden önce çek.
+    - Redis cache tek MGET ile okunur
+    - Eksikler provider limitleri dahilinde eşzamanlı çekilir
+    Returns: {symbol: prices}
+    """
+    # Wrapped token'lar underlying asset'in verisini paylaşır
+    sources = {s: WRAPPED_TOKEN_MAP.get(s, s) for s in symbols}
+    unique = list(dict.fromkeys(sources.values()))
 
-    cutoff_dt = datetime.utcnow() - timedelta(hours=24)
-    relevant_news = []
-    
-    for news in news_db.values():
-        crawled_str = news.get("crawled_at", "")
-        if not crawled_str:
-            continue
-        try:
-            crawled_dt = datetime.fromisoformat(crawled_str.replace("Z", "+00:00"))
-            if crawled_dt.tzinfo:
-                crawled_dt = crawled_dt.replace(tzinfo=None)
-            if crawled_dt < cutoff_dt:
+    fetched: Dict[str, List] = {}
+    try:
+        cached = r.mget([f"hist:{s}:{days}" for s in unique])
+        for s, raw in zip(unique, cached):
+            if raw:
+                fetched[s] = json.loads(raw)
+    except Exception as e:
+        print(f"[Prefetch] Cache read error: {e}")
+
+    missing = [s for s in unique if s not in fetched]
+    if missing:
+        results = await asyncio.gather(
+            *(get_cached_historical(s, days) for s in missing),
+            return_exceptions=True
+        )
+        for s, prices in zip(missing, results):
+            if isinstance(prices, Exception):
+                print(f"[Prefetch] {s} error: {prices}")
                 continue
-        except (ValueError, TypeError):
-            continue
+            fetched[s] = prices
 
-        coins = news.get("coins", [])
-        if symbol in coins or "GENERAL" in coins:
-            relevant_news.append(news)
+    print(f"  [Prefetch] {len(unique)} coins | cache: {len(unique) - len(missing)} | fetched: {len(missing)}")
+    return {s: fetched.get(src, []) for s, src in sources.items()}
 
-    if not relevant_news:
-        return None
 
-    total_score = 0
-    for news in relevant_news:
-        sentiment = news.get("sentiment", "neutral")
-        score = news.get("sentiment_score", 0)
+def update_indicator_states(historical_map: Dict[str, List]) -> Dict[str, Dict]:
+    """
+    Kayıtlı IndicatorState'leri yeni mumlarla artımlı güncelle.
+    Durumu olmayan veya seriyle hizası bozulan coinler için durum yeniden
+    oluşturulur; bu coinlerin indikatörleri (cold start'ta tüm evren) tek
+    vektörel geçişte indicator_engine ile hesaplanır.
+    Returns: {symbol: technical dict}
+    """
+    series = {s: prices for s, prices in historical_map.items() if prices}
+    states = indicator_states.load(series)
 
-        if sentiment == "bullish":
-            total_score += abs(score)
-        elif sentiment == "bearish":
-            total_score -= abs(score)
+    technical_map = {}
+    rebuild: Dict[str, List] = {}
+    for symbol, prices in series.items():
+        try:
+            state = states.get(symbol)
+            if state is None or state.window != len(prices) or not state.update_series(prices):
+                states[symbol] = IndicatorState.from_prices(prices)
+                rebuild[symbol] = prices
+            else:
+                technical_map[symbol] = analysis_service.calculate_indicators_from_state(state)
+        except Exception as e:
+            print(f"  [Indicators] {symbol} error: {e}")
 
-    avg_score = total_score / len(relevant_news) if relevant_news else 0
+    if rebuild:
+        try:
+            technical_map.update(analysis_service.calculate_indicators_batch(rebuild))
+        except Exception as e:
+            print(f"  [Indicators] Batch error: {e}")
 
-    return {
-        "score": round(avg_score, 3),
-        "news_count": len(relevant_news)
-    }
+    indicator_states.save({s: states[s] for s in technical_map})
+    print(f"  [Indicators] {len(technical_map)} coins | incremental: {len(technical_map) - len(rebuild)} | rebuilt: {len(rebuild)}")
+    return technical_map
 
 
 # ============================================
 # SIGNAL GENERATION WITH EXIT STRATEGY
 # ============================================
 
-def generate_signals_for_coin(
+def score_coin(
     symbol: str,
     price_data: Dict,
     futures_data: Dict,
     news_sentiment: Optional[Dict],
     historical_prices: List,
-    prices_data: Dict = None
-) -> Dict:
+    prices_data: Dict = None,
+    technical: Optional[Dict] = None,
+    context: Optional[MarketContext] = None
+) -> Tuple[Dict, Dict[str, Dict]]:
     """
-    Tek coin için tüm timeframe'lerde sinyal üret
-    + EXIT STRATEGY HESAPLAMA (v2.0)
+    Tek coin için sinyal + her timeframe'in exit strategy'si (saf CPU işi)
+    technical: önceden hesaplanmış indikatörler
+    context: döngü başına MarketContext (yoksa fear & greed Redis'ten okunur)
+    Returns: (base_result, {timeframe: exit_strategy})
     """
-    results = {}
 
-    # Technical indicators
-    if historical_prices:
+    # Technical indicators (batch engine'den gelmediyse)
+    if technical is None and historical_prices:
         technical = analysis_service.calculate_indicators(historical_prices)
-    else:
+    elif technical is None:
         technical = {
             "current_price": price_data.get("price", 0),
             "change_24h": price_data.get("change_24h", 0),
@@ -694,9 +637,12 @@ def generate_signals_for_coin(
     futures = futures_data.get(symbol, {}) if futures_data else None
 
     # Market Regime hesapla (v3.0)
-    btc_7d_change = prices_data.get("BTC", {}).get("change_7d", 0) if prices_data else 0
-    fear_greed = get_fear_greed_value()
-    market_regime = get_market_regime(btc_7d_change, fear_greed)
+    if context is None:
+        context = MarketContext.build(
+            fear_greed={"value": get_fear_greed_value()},
+            btc=prices_data.get("BTC") if prices_data else None
+        )
+    market_regime = context.market_regime
 
     # Sinyal üret
     signal_result = analysis_service.generate_signal(
@@ -715,10 +661,7 @@ def generate_signals_for_coin(
     risk_level = risk_result["level"]
 
     # Market Regime data for Quality Gate v3
-    market_data = {
-        "btc_change_24h": prices_data.get("BTC", {}).get("change_24h", 0) if prices_data else 0,
-        "fear_greed": get_fear_greed_value()
-    }
+    market_data = context.market_data()
     coin_futures = futures_data.get(symbol, {}) if futures_data else None
 
     final_signal, final_conf, gate_reason = should_emit_signal(signal_result, risk_level, technical, market_data, coin_futures)
@@ -789,13 +732,8 @@ def generate_signals_for_coin(
     }
 
     # Her timeframe için AYRI exit strategy
-    for tf in TIMEFRAMES:
-        tf_result = base_result.copy()
-        tf_result["timeframe"] = tf
-        tf_result["timeframe_label"] = TIMEFRAME_LABELS.get(tf, tf)
-        
-        # Bu timeframe için exit strategy hesapla
-        exit_strategy = analysis_service.calculate_exit_strategy(
+    exits = {
+        tf: analysis_service.calculate_exit_strategy(
             current_price=current_price,
             signal=final_signal,
             confidence=signal_result["confidence"],
@@ -803,18 +741,102 @@ def generate_signals_for_coin(
             category=category,
             timeframe=tf
         )
-        
-        tf_result["exit_strategy"] = exit_strategy
-        tf_result["stop_loss"] = exit_strategy.get("stop_loss")
-        tf_result["take_profit"] = exit_strategy.get("take_profit")
-        tf_result["trailing_stop"] = exit_strategy.get("trailing_stop")
-        tf_result["risk_reward_ratio"] = exit_strategy.get("risk_reward_ratio")
-        tf_result["stop_loss_pct"] = exit_strategy.get("stop_loss_pct")
-        tf_result["take_profit_pct"] = exit_strategy.get("take_profit_pct")
-        
-        results[tf] = tf_result
+        for tf in TIMEFRAMES
+    }
+
+    return base_result, exits
+
 
-    return results
+def expand_timeframes(base_result: Dict, exits: Dict[str, Dict]) -> Dict[str, Dict]:
+    """score_coin çıktısını timeframe başına tam sinyal dict'lerine aç"""
+    return {
+        tf: join_timeframe(base_result, tf, exit_strategy, TIMEFRAME_LABELS.get(tf, tf))
+        for tf, exit_strategy in exits.items()
+    }
+
+
+def generate_signals_for_coin(
+    symbol: str,
+    price_data: Dict,
+    futures_data: Dict,
+    news_sentiment: Optional[Dict],
+    historical_prices: List,
+    prices_data: Dict = None,
+    technical: Optional[Dict] = None,
+    context: Optional[MarketContext] = None
+) -> Dict:
+    """
+    Tek coin için tüm timeframe'lerde sinyal üret
+    + EXIT STRATEGY HESAPLAMA (v2.0)
+    """
+    return expand_timeframes(*score_coin(
+        symbol, price_data, futures_data, news_sentiment, historical_prices,
+        prices_data=prices_data, technical=technical, context=context
+    ))
+
+
+# ============================================
+# PROCESS POOL SCORING
+# ============================================
+
+def score_chunk(items: List[Tuple], context: MarketContext) -> List[Tuple[str, Optional[Dict], Optional[Dict], Optional[str]]]:
+    """
+    Bir coin grubunu skorla (process pool worker'ında çalışır, Redis'e dokunmaz).
+    items: (symbol, price_data, futures, news_sentiment, technical, historical_prices)
+    Returns: (symbol, base_result, exits, error)
+    """
+    out = []
+    for symbol, price_data, futures, news_sentiment, technical, historical_prices in items:
+        try:
+            base_result, exits = score_coin(
+                symbol=symbol,
+                price_data=price_data,
+                futures_data={symbol: futures} if futures is not None else {},
+                news_sentiment=news_sentiment,
+                historical_prices=historical_prices,
+                technical=technical,
+                context=context
+            )
+            out.append((symbol, base_result, exits, None))
+        except Exception as e:
+            out.append((symbol, None, None, str(e)))
+    return out
+
+
+def get_scoring_pool() -> Optional[ProcessPoolExecutor]:
+    """SIGNAL_SCORING_WORKERS > 1 ise lazy oluşturulan process pool"""
+    global scoring_pool
+    if SIGNAL_SCORING_WORKERS <= 1:
+        return None
+    if scoring_pool is None:
+        # spawn: worker'ın event loop'u, Redis ve httpx bağlantıları fork edilmez
+        scoring_pool = ProcessPoolExecutor(
+            max_workers=SIGNAL_SCORING_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return scoring_pool
+
+
+async def score_all_coins(items: List[Tuple], context: MarketContext) -> List[Tuple]:
+    """Coin evrenini chunk'lara bölüp process pool'da skorla (pool yoksa seri)"""
+    global scoring_pool
+    pool = get_scoring_pool()
+    if pool is None or len(items) < SCORING_CHUNK_SIZE:
+        return score_chunk(items, context)
+
+    # Futures/haber coin başına items içinde - pool'a sadece skaler bağlam
+    market = context.compact()
+
+    loop = asyncio.get_running_loop()
+    chunks = [items[i:i + SCORING_CHUNK_SIZE] for i in range(0, len(items), SCORING_CHUNK_SIZE)]
+    try:
+        chunk_results = await asyncio.gather(
+            *(loop.run_in_executor(pool, score_chunk, chunk, market) for chunk in chunks)
+        )
+    except BrokenProcessPool as e:
+        print(f"  [Scoring] Process pool broken, falling back to serial: {e}")
+        scoring_pool = None
+        return score_chunk(items, context)
+    return [result for chunk in chunk_results for result in chunk]
 
 
 async def generate_all_signals():
@@ -822,18 +844,16 @@ async def generate_all_signals():
     print(f"\n[Signals] Generating at {datetime.utcnow().strftime('%H:%M:%S')}")
 
     prices_raw = r.get("prices_data")
-    futures_raw = r.get("futures_data")
-    news_raw = r.get("news_db")
-
     prices_data = json.loads(prices_raw) if prices_raw else {}
-    futures_data = json.loads(futures_raw) if futures_raw else {}
-    news_db = json.loads(news_raw) if news_raw else {}
 
     if not prices_data:
         print("[Signals] No price data available")
         return
 
-    print(f"  Coins: {len(prices_data)} | News: {len(news_db)} | Futures: {len(futures_data)}")
+    # Döngü boyunca değişmeyen bağlam - coin başına Redis okuması yok
+    context = load_market_context(r, btc=prices_data.get("BTC", {}))
+
+    print(f"  Coins: {len(prices_data)} | News: {len(context.news)} | Futures: {len(context.futures)} | Regime: {context.market_regime}")
 
     sorted_coins = sorted(
         prices_data.items(),
@@ -842,6 +862,8 @@ async def generate_all_signals():
     )
 
     all_signals = {tf: {"signals": {}, "stats": {}, "risk_stats": {}, "count": 0} for tf in TIMEFRAMES}
+    bases: Dict[str, Dict] = {}
+    exits_by_tf: Dict[str, Dict[str, Dict]] = {tf: {} for tf in TIMEFRAMES}
     processed = 0
     skipped_coins = {"stablecoin": 0, "wrapped": 0, "other": 0, "low_mcap": 0}
     quality_gate_stats = {"passed": 0, "blocked": 0, "reasons": {}}
@@ -863,41 +885,58 @@ async def generate_all_signals():
 
     print(f"  Processing: {len(filtered_coins)} coins (TOP {COIN_PROCESS_LIMIT} + {len(AI_COINS)} AI coins)")
 
+    # Stablecoin/wrapped/düşük mcap filtresi (historical prefetch'ten önce)
+    eligible_coins = []
     for symbol, price_data in filtered_coins:
-        try:
-            if symbol in SKIP_SIGNAL_COINS:
-                if symbol in STABLECOINS:
-                    skipped_coins["stablecoin"] += 1
-                elif symbol in WRAPPED_TOKENS:
-                    skipped_coins["wrapped"] += 1
-                else:
-                    skipped_coins["other"] += 1
+        if symbol in SKIP_SIGNAL_COINS:
+            if symbol in STABLECOINS:
+                skipped_coins["stablecoin"] += 1
+            elif symbol in WRAPPED_TOKENS:
+                skipped_coins["wrapped"] += 1
+            else:
+                skipped_coins["other"] += 1
+            continue
+
+        # Minimum market cap/volume filtresi (AI coinleri hariç)
+        if symbol not in AI_COINS:
+            mcap = price_data.get("market_cap", 0) or 0
+            vol = price_data.get("volume_24h", 0) or 0
+            if mcap < MIN_MARKET_CAP or vol < MIN_VOLUME_24H:
+                skipped_coins["low_mcap"] += 1
                 continue
 
-            # Minimum market cap/volume filtresi (AI coinleri hariç)
-            if symbol not in AI_COINS:
-                mcap = price_data.get("market_cap", 0) or 0
-                vol = price_data.get("volume_24h", 0) or 0
-                if mcap < MIN_MARKET_CAP or vol < MIN_VOLUME_24H:
-                    skipped_coins["low_mcap"] += 1
-                    continue
+        eligible_coins.append((symbol, price_data))
 
-            news_sentiment = get_news_sentiment_for_coin(symbol, news_db)
+    # Historical data - ilk HISTORICAL_DATA_LIMIT coin için eşzamanlı prefetch
+    historical_map = await prefetch_historical_prices(
+        [symbol for symbol, _ in eligible_coins[:HISTORICAL_DATA_LIMIT]], days=90
+    )
 
-            historical_prices = []
-            if processed < HISTORICAL_DATA_LIMIT:
-                historical_prices = await fetch_historical_prices(symbol, days=90)
-                if historical_prices and processed % 20 == 0:
-                    await asyncio.sleep(0.2)
+    # İndikatörler artımlı durumdan (event loop'u bloklamadan)
+    technical_map = await asyncio.to_thread(update_indicator_states, historical_map)
+
+    # Skorlama girdileri - kompakt (indikatörler hazır, sadece coin'in futures kaydı)
+    items = [
+        (
+            symbol,
+            price_data,
+            context.futures_for(symbol),
+            context.news_sentiment_for(symbol),
+            technical_map.get(symbol),
+            [] if symbol in technical_map else historical_map.get(symbol, [])
+        )
+        for symbol, price_data in eligible_coins
+    ]
+    scored = await score_all_coins(items, context)
 
-            coin_signals = generate_signals_for_coin(
-                symbol=symbol,
-                price_data=price_data,
-                futures_data=futures_data,
-                news_sentiment=news_sentiment,
-                historical_prices=historical_prices,
-                prices_data=prices_data
-            )
+    for symbol, base_result, exits, error in scored:
+        try:
+            if error:
+                raise RuntimeError(error)
+            coin_signals = expand_timeframes(base_result, exits)
+            bases[symbol] = base_result
+            for tf, exit_strategy in exits.items():
+                exits_by_tf[tf][symbol] = exit_strategy
 
             for tf, signal_data in coin_signals.items():
                 all_signals[tf]["signals"][symbol] = signal_data
@@ -946,12 +985,22 @@ async def generate_all_signals():
         if tf == "1d":
             print(f"  [Filter] Active signals: {original_count} -> Top {filtered_count} (max {MAX_ACTIVE_SIGNALS})")
 
-    r.set("signals_all_timeframes", json.dumps(all_signals))
-    r.set("signals_data", json.dumps(all_signals["1d"]["signals"]))
-    r.set("signals_stats", json.dumps(all_signals["1d"]["stats"]))
-    r.set("signals_risk_stats", json.dumps(all_signals["1d"]["risk_stats"]))
-    r.set("signals_updated", datetime.utcnow().isoformat())
-    r.set("signals_count", str(processed))
+    # Normalize kayıt: coin başına tek base, timeframe başına sadece exit strategy
+    signal_store.publish(
+        bases={s: bases[s] for s in set().union(*(all_signals[tf]["signals"] for tf in TIMEFRAMES))},
+        exits={tf: {s: exits_by_tf[tf][s] for s in all_signals[tf]["signals"]} for tf in TIMEFRAMES},
+        timeframes={
+            tf: {
+                "label": TIMEFRAME_LABELS.get(tf, tf),
+                "stats": all_signals[tf]["stats"],
+                "risk_stats": all_signals[tf]["risk_stats"],
+                "count": all_signals[tf]["count"],
+            }
+            for tf in TIMEFRAMES
+        },
+        updated_at=datetime.utcnow().isoformat(),
+        count=processed
+    )
 
     stats_1d = all_signals["1d"]["stats"]
     buy_count = stats_1d.get("BUY", 0) + stats_1d.get("STRONG_BUY", 0)
@@ -1095,8 +1144,10 @@ async def main():
                 await check_exit_conditions()
                 last_exit_check = now
 
-            # Kısa uyku
-            await asyncio.sleep(10)
+            # Sıradaki zamanlayıcıya kadar uyu (sabit aralıklı uyanma yok)
+            now = asyncio.get_event_loop().time()
+            next_due = min(last_signal_gen + UPDATE_INTERVAL, last_exit_check + SIGNAL_CHECK_INTERVAL)
+            await asyncio.sleep(max(1.0, next_due - now))
 
         except Exception as e:
             print(f"[Signal Worker] Error: {e}")
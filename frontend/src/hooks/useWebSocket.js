@@ -5,18 +5,24 @@ const WS_URL = window.location.hostname === 'localhost'
   ? 'ws://localhost:8000/ws'
   : `${window.location.protocol === 'https:' ? 'wss:' : 'ws:'}//${window.location.host}/ws`
 
-export const useWebSocket = (onMessage) => {
+// coins: subscribe on connect and receive a reduced init (only these symbols)
+export const useWebSocket = (onMessage, { coins } = {}) => {
   const ws = useRef(null)
   const [isConnected, setIsConnected] = useState(false)
   const reconnectTimeout = useRef(null)
   const reconnectAttempts = useRef(0)
+  const lastSeq = useRef(null)
 
   const connect = () => {
     try {
-      ws.current = new WebSocket(WS_URL)
+      const url = coins && coins.length
+        ? `${WS_URL}?coins=${encodeURIComponent(coins.join(','))}`
+        : WS_URL
+      ws.current = new WebSocket(url)
 
       ws.current.onopen = () => {
         console.log('[WS] Connected')
+        lastSeq.current = null
         setIsConnected(true)
         reconnectAttempts.current = 0
       }
@@ -24,6 +30,22 @@ export const useWebSocket = (onMessage) => {
       ws.current.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data)
+
+          // Sequenced price frames: init/snapshot reset, a gap requests a resync
+          if (typeof data.seq === 'number') {
+            if (data.type === 'init' || data.type === 'snapshot') {
+              lastSeq.current = data.seq
+            } else if (lastSeq.current !== null && data.seq !== lastSeq.current + 1) {
+              lastSeq.current = null
+              ws.current.send(JSON.stringify({ type: 'resync' }))
+              return
+            } else if (lastSeq.current !== null) {
+              lastSeq.current = data.seq
+            } else {
+              return // Waiting for the resync snapshot
+            }
+          }
+
           if (onMessage) {
             onMessage(data)
           }
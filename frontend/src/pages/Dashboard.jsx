@@ -34,12 +34,15 @@ const Dashboard = ({ t, lang, user }) => {
       // Initial data from WebSocket
       setPrices(data.prices)
       if (data.fear_greed) setFearGreed(data.fear_greed)
-    } else if (data.type === 'price_update' && data.prices) {
-      // Real-time price updates
-      setPrices(prevPrices => ({
-        ...prevPrices,
-        ...data.prices
-      }))
+    } else if ((data.type === 'price_update' || data.type === 'snapshot') && data.prices) {
+      // Real-time updates only carry the fields that changed
+      setPrices(prevPrices => {
+        const next = { ...prevPrices }
+        for (const [symbol, fields] of Object.entries(data.prices)) {
+          next[symbol] = { ...prevPrices[symbol], ...fields }
+        }
+        return next
+      })
     }
   })
 